@@ -1,5 +1,6 @@
 import os
 from celery import Celery
+from celery.signals import worker_process_init
 from django.conf import settings
 
 # Django settings 모듈 설정
@@ -14,6 +15,14 @@ app.config_from_object('django.conf:settings', namespace='CELERY')
 # 등록된 Django 앱에서 tasks.py 모듈 자동 탐색
 app.autodiscover_tasks()
 
+
+@worker_process_init.connect
+def preload_worker_models(**kwargs):
+    """워커 프로세스 시작 시 ML 모델을 미리 로드하여 첫 요청 지연 제거"""
+    from calls.model_registry import preload_models
+    preload_models()
+
+
 @app.task(bind=True, ignore_result=True)
 def debug_task(self):
     print(f'Request: {self.request!r}') 
\ No newline at end of file
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 from dotenv import load_dotenv
+from celery.schedules import crontab
 
 # Load environment variables
 load_dotenv()
@@ -96,6 +97,23 @@ DATABASES = {
     }
 }
 
+# Cache
+# 서킷 브레이커 등 워커 간 공유 상태에 사용 - 웹 서버와 모든 Celery 워커가 같은 캐시를 봐야 하므로
+# 기본값은 브로커와 같은 Redis 서버의 1번 DB입니다. 프로세스별 캐시(LocMemCache 등)로 바꾸면
+# 시스템 체크(calls.E001)가 실패하므로, 단일 프로세스 개발 환경에서만 SILENCED_SYSTEM_CHECKS로 끄세요.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.redis.RedisCache'),
+        "LOCATION": os.getenv('DJANGO_CACHE_LOCATION', 'redis://localhost:6379/1'),
+    }
+}
+
+# 대시보드 개요 캐시 (통화 처리가 끝나면 워커가 버전을 바꿔 무효화하고, TTL은 업로드 등 그 외 변경을 반영하는 상한)
+# 웹 서버와 워커가 공유하는 캐시여야 합니다 (프로세스별 캐시이면 시스템 체크 calls.E002 실패).
+DASHBOARD_CACHE_ALIAS = os.getenv('DASHBOARD_CACHE_ALIAS', 'default')
+DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', '60'))  # 초
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -155,6 +173,9 @@ REST_FRAMEWORK = {
     ],
 }
 
+# 커서 페이지네이션(통화/전사/분석 목록)에서 page_size 파라미터로 요청할 수 있는 최대값
+API_MAX_PAGE_SIZE = int(os.getenv('API_MAX_PAGE_SIZE', '100'))
+
 # Celery settings
 CELERY_BROKER_URL = os.getenv('CELERY_BROKER_URL', 'redis://localhost:6379/0')
 CELERY_RESULT_BACKEND = os.getenv('CELERY_RESULT_BACKEND', 'redis://localhost:6379/0')
@@ -163,11 +184,165 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = TIME_ZONE
 
+# 통화 처리 파이프라인 전용 큐
+# 분석 단계(calls.stages)는 각 단계에 선언된 큐(transcription, audio, scoring, llm)로 전달됩니다.
+# CPU 중심(오디오) 워커와 I/O 중심(LLM) 워커를 큐 단위로 분리하여 확장할 수 있습니다.
+# 예) celery -A backend worker -Q audio,scoring -c 4
+#     celery -A backend worker -Q llm --pool=threads -c 32
+CELERY_TASK_ROUTES = {
+    'calls.tasks.reevaluate_calls': {'queue': 'llm'},
+    'calls.tasks.reevaluate_fallback_calls': {'queue': 'llm'},
+    'calls.tasks.daily_coaching': {'queue': 'llm'},
+    'calls.tasks.daily_coaching_batch': {'queue': 'llm'},
+    'calls.tasks.finalize_call': {'queue': 'finalize'},
+}
+
+# 통화 분석 단계 설정
+# 단계를 등록하는 모듈 목록 - 새 분석기는 register_stage로 등록한 모듈을 추가하면 됩니다.
+PIPELINE_STAGE_MODULES = [
+    module for module in os.getenv('PIPELINE_STAGE_MODULES', 'calls.stages').split(',') if module
+]
+# 'celery': 단계별 큐로 분산 실행, 'local': process_call 워커 안에서 스레드로 실행
+PIPELINE_EXECUTOR = os.getenv('PIPELINE_EXECUTOR', 'celery')
+PIPELINE_LOCAL_MAX_WORKERS = int(os.getenv('PIPELINE_LOCAL_MAX_WORKERS', '4'))
+
+# 우선순위 등급별 큐 레인 (live는 기본 큐, 나머지는 접미사가 붙은 큐 사용 예: transcription.backfill)
+# 등급별로 워커를 따로 띄워 실시간 통화 처리 용량을 예약합니다.
+PRIORITY_QUEUE_SUFFIXES = {
+    'live': '',
+    'reprocess': '.reprocess',
+    'backfill': '.backfill',
+}
+
+# 업로드 승인 제어 (백프레셔)
+# 브로커 큐 적체량 또는 대기/처리 중인 작업 수가 DEFER 임계값 이상이면 백필 등급으로 지연하고,
+# REJECT 임계값 이상이면 429 응답(Retry-After: ADMISSION_RETRY_AFTER초)으로 업로드를 거절합니다.
+ADMISSION_CONTROL_ENABLED = os.getenv('ADMISSION_CONTROL_ENABLED', 'True') == 'True'
+ADMISSION_QUEUES = ['celery', 'transcription', 'audio']
+ADMISSION_DEFER_QUEUE_DEPTH = int(os.getenv('ADMISSION_DEFER_QUEUE_DEPTH', '200'))
+ADMISSION_REJECT_QUEUE_DEPTH = int(os.getenv('ADMISSION_REJECT_QUEUE_DEPTH', '1000'))
+ADMISSION_DEFER_IN_FLIGHT = int(os.getenv('ADMISSION_DEFER_IN_FLIGHT', '500'))
+ADMISSION_REJECT_IN_FLIGHT = int(os.getenv('ADMISSION_REJECT_IN_FLIGHT', '2000'))
+ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', '60'))  # 초
+ADMISSION_BROKER_TIMEOUT = float(os.getenv('ADMISSION_BROKER_TIMEOUT', '1'))  # 초
+
+# 단계별 재시도 정책 (일시적 오류만 재시도, 대기 시간은 backoff * 2^시도횟수 초, 최대 backoff_max 초)
+# 재시도를 모두 소진한 통화는 'dead_letter' 상태가 되며 API로 조회/일괄 재처리할 수 있습니다.
+PIPELINE_RETRY_DEFAULT = {
+    'max_retries': int(os.getenv('PIPELINE_MAX_RETRIES', '3')),
+    'backoff': float(os.getenv('PIPELINE_RETRY_BACKOFF', '10')),
+    'backoff_max': float(os.getenv('PIPELINE_RETRY_BACKOFF_MAX', '600')),
+}
+PIPELINE_RETRY_POLICIES = {
+    'transcription': {'max_retries': 2, 'backoff': 30},
+    'llm_evaluation': {'max_retries': 5, 'backoff': 15},
+}
+# 로컬 실행(PIPELINE_EXECUTOR=local) 시 재시도 대기 상한 - 스레드가 잠든 동안 워커/요청이 함께 멈추므로 짧게 제한
+PIPELINE_LOCAL_RETRY_BACKOFF_MAX = float(os.getenv('PIPELINE_LOCAL_RETRY_BACKOFF_MAX', '5'))  # 초
+
+# ML 모델 설정
+# 파일이 교체되면(mtime/해시 변경) 워커가 다음 예측 시 자동으로 새 모델을 로드합니다.
+LIGHTGBM_MODEL_PATH = os.getenv(
+    'LIGHTGBM_MODEL_PATH',
+    os.path.join(BASE_DIR, 'calls', 'models', 'lightgbm_model.pkl')
+)
+
+# 만족도 예측 마이크로 배치 (같은 프로세스에서 동시에 들어온 요청을 묶어 한 번에 예측)
+# 스레드/gevent 풀 워커처럼 한 프로세스가 여러 통화를 동시에 처리할 때 효과가 있습니다.
+LIGHTGBM_BATCH_ENABLED = os.getenv('LIGHTGBM_BATCH_ENABLED', 'False') == 'True'
+LIGHTGBM_BATCH_MAX_SIZE = int(os.getenv('LIGHTGBM_BATCH_MAX_SIZE', '64'))
+LIGHTGBM_BATCH_MAX_WAIT_MS = int(os.getenv('LIGHTGBM_BATCH_MAX_WAIT_MS', '10'))
+LIGHTGBM_BATCH_TIMEOUT = int(os.getenv('LIGHTGBM_BATCH_TIMEOUT', '30'))  # 초
+
+# 오디오 특성 추출 설정
+# 이 길이(초) 이상인 통화는 전체 디코딩 대신 블록 단위 스트리밍으로 특성을 계산합니다.
+AUDIO_STREAMING_MIN_DURATION = int(os.getenv('AUDIO_STREAMING_MIN_DURATION', '600'))
+AUDIO_STREAM_BLOCK_SECONDS = int(os.getenv('AUDIO_STREAM_BLOCK_SECONDS', '30'))
+
+# callanalysis(STT/화자 분리) 실행 설정
+# 'dummy': 테스트용 더미 결과 반환, 'pool': 모델을 메모리에 유지하는 상주 워커 풀 사용
+# 풀은 Celery 워커 프로세스마다 생성되므로 전사 큐 워커는 --pool=threads로 실행하고
+# CALLANALYSIS_POOL_SIZE를 워커 동시성과 맞추는 것을 권장합니다.
+CALLANALYSIS_BACKEND = os.getenv('CALLANALYSIS_BACKEND', 'dummy')
+CALLANALYSIS_PATH = os.getenv('CALLANALYSIS_PATH', os.path.join(BASE_DIR.parent, 'callanalysis'))
+CALLANALYSIS_POOL_SIZE = int(os.getenv('CALLANALYSIS_POOL_SIZE', '1'))
+CALLANALYSIS_JOB_TIMEOUT = int(os.getenv('CALLANALYSIS_JOB_TIMEOUT', '1800'))  # 초
+CALLANALYSIS_STARTUP_TIMEOUT = int(os.getenv('CALLANALYSIS_STARTUP_TIMEOUT', '600'))  # 초 (모델 로딩 포함)
+CALLANALYSIS_WORKER_STUB = os.getenv('CALLANALYSIS_WORKER_STUB', 'False') == 'True'
+
+# callanalysis(STT/화자 분리) 결과 캐시
+# 오디오 내용 해시 + callanalysis 버전을 키로 사용하며, 모델이 바뀌면 버전을 올려 캐시를 무효화합니다.
+CALLANALYSIS_VERSION = os.getenv('CALLANALYSIS_VERSION', '1')
+CALLANALYSIS_CACHE_ENABLED = os.getenv('CALLANALYSIS_CACHE_ENABLED', 'True') == 'True'
+CALLANALYSIS_CACHE_DIR = os.getenv('CALLANALYSIS_CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'callanalysis'))
+CALLANALYSIS_CACHE_MAX_BYTES = int(os.getenv('CALLANALYSIS_CACHE_MAX_BYTES', str(1024 * 1024 * 1024)))  # 1GB
+
+# OpenAI 클라이언트 설정 (워커 프로세스 단위 한도)
+OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4')  # 코칭 및 기본 평가 모델
+OPENAI_TIMEOUT = float(os.getenv('OPENAI_TIMEOUT', '60'))  # 초
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '16'))  # asyncio 경로 동시 요청 수
+LLM_REQUESTS_PER_MINUTE = int(os.getenv('LLM_REQUESTS_PER_MINUTE', '500'))  # 0이면 제한 없음
+LLM_TOKENS_PER_MINUTE = int(os.getenv('LLM_TOKENS_PER_MINUTE', '150000'))  # 0이면 제한 없음
+LLM_EXPECTED_OUTPUT_TOKENS = int(os.getenv('LLM_EXPECTED_OUTPUT_TOKENS', '500'))
+# 통화 평가 프롬프트의 대화 토큰 예산 - 넘는 통화는 겹치는 구간으로 나눠 동시에 평가 후 병합
+LLM_EVALUATION_TOKEN_BUDGET = int(os.getenv('LLM_EVALUATION_TOKEN_BUDGET', '6000'))
+LLM_EVALUATION_WINDOW_OVERLAP = int(os.getenv('LLM_EVALUATION_WINDOW_OVERLAP', '300'))
+LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '5'))
+LLM_RETRY_BASE_DELAY = float(os.getenv('LLM_RETRY_BASE_DELAY', '1'))  # 초
+LLM_RETRY_MAX_DELAY = float(os.getenv('LLM_RETRY_MAX_DELAY', '60'))  # 초
+
+# OpenAI 서킷 브레이커 (상태는 CACHES의 default 캐시로 웹 서버/워커 간 공유)
+# 연속 실패(429/5xx/연결 오류/타임아웃)가 임계값에 이르면 회로를 열고 바로 기본 평가로 대체하며,
+# 복구 대기 시간이 지나면 시험 요청 하나로 회복 여부를 확인합니다.
+LLM_CIRCUIT_ENABLED = os.getenv('LLM_CIRCUIT_ENABLED', 'True') == 'True'
+LLM_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('LLM_CIRCUIT_FAILURE_THRESHOLD', '5'))
+LLM_CIRCUIT_RECOVERY_TIMEOUT = float(os.getenv('LLM_CIRCUIT_RECOVERY_TIMEOUT', '30'))  # 초
+LLM_FALLBACK_REEVALUATION_CHUNK_SIZE = int(os.getenv('LLM_FALLBACK_REEVALUATION_CHUNK_SIZE', '50'))
+
+# LLM 평가 모델 라우팅
+# 규칙을 위에서부터 확인하여 조건(min_/max_ tokens, utterances, satisfaction)을 모두 만족하는
+# 첫 규칙의 모델을 사용하고, 없으면 기본 모델을 사용합니다. 만족도 조건은 LightGBM 점수(1-5) 기준입니다.
+LLM_ROUTING_DEFAULT_MODEL = os.getenv('LLM_ROUTING_DEFAULT_MODEL', OPENAI_MODEL)
+LLM_ROUTING_SMALL_MODEL = os.getenv('LLM_ROUTING_SMALL_MODEL', 'gpt-4o-mini')
+LLM_ROUTING_RULES = [
+    # 짧은 통화 (잘못 걸린 전화, 단순 문의)
+    {'name': 'short', 'model': LLM_ROUTING_SMALL_MODEL,
+     'max_tokens': int(os.getenv('LLM_ROUTING_SHORT_MAX_TOKENS', '800')),
+     'max_utterances': int(os.getenv('LLM_ROUTING_SHORT_MAX_UTTERANCES', '20'))},
+    # 중간 길이이면서 만족도가 높은 통화
+    {'name': 'routine', 'model': LLM_ROUTING_SMALL_MODEL,
+     'max_tokens': int(os.getenv('LLM_ROUTING_ROUTINE_MAX_TOKENS', '3000')),
+     'min_satisfaction': float(os.getenv('LLM_ROUTING_ROUTINE_MIN_SATISFACTION', '4.0'))},
+]
+
+# LLM 응답 캐시 (모델 + 메시지 + 응답 형식 해시 기준)
+LLM_CACHE_ENABLED = os.getenv('LLM_CACHE_ENABLED', 'True') == 'True'
+LLM_CACHE_DIR = os.getenv('LLM_CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'llm'))
+LLM_CACHE_TTL = int(os.getenv('LLM_CACHE_TTL', str(7 * 24 * 3600)))  # 초 (기본 7일)
+LLM_CACHE_MAX_BYTES = int(os.getenv('LLM_CACHE_MAX_BYTES', str(256 * 1024 * 1024)))  # 256MB
+
+# 오프라인 배치 LLM 평가 (백필용)
+# submit_evaluation_batch / ingest_evaluation_batch 관리 명령에서 사용하며,
+# 'local' 공급자는 외부 호출 없이 전체 흐름을 테스트할 수 있습니다.
+LLM_BATCH_PROVIDER = os.getenv('LLM_BATCH_PROVIDER', 'openai')
+LLM_BATCH_DIR = os.getenv('LLM_BATCH_DIR', os.path.join(BASE_DIR, 'batch_jobs'))
+
+# 일일 코칭 설정
+# 일괄 생성 시 동시에 실행할 상담원 묶음(작업) 수
+COACHING_MAX_CONCURRENCY = int(os.getenv('COACHING_MAX_CONCURRENCY', '8'))
+# 코칭 요청에 넣을 통화 요약의 토큰 예산 - 넘으면 이 크기의 묶음으로 나눠 중간 요약 후 합침
+COACHING_SUMMARY_TOKEN_BUDGET = int(os.getenv('COACHING_SUMMARY_TOKEN_BUDGET', '6000'))
+COACHING_SUMMARY_MAX_LEVELS = int(os.getenv('COACHING_SUMMARY_MAX_LEVELS', '3'))
+
 # Celery Beat settings
 CELERY_BEAT_SCHEDULE = {
     'daily_coaching': {
-        'task': 'calls.tasks.daily_coaching',
-        'schedule': 86400,  # 24시간마다 실행 (초 단위)
+        'task': 'calls.tasks.daily_coaching_all',
+        'schedule': crontab(hour=23, minute=30),  # 매일 23:30 (당일 통화 기준)
+    },
+    'reevaluate_fallback_calls': {
+        'task': 'calls.tasks.reevaluate_fallback_calls',
+        'schedule': crontab(minute=15),  # 매시 15분 (회로가 열려 있으면 건너뜀)
     },
 }
 
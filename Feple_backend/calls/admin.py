@@ -1,8 +1,10 @@
 from django.contrib import admin
+from django.db import transaction
 from .models import (
     Agent, CallRawData, CallTranscript, 
-    CallAnalysis, AgentCoaching, ProcessingTask
+    CallAnalysis, AgentCoaching, ProcessingTask, AgentDailyStats
 )
+from .rollup import refresh_call_daily_stats, remove_call_daily_stats
 
 
 @admin.register(Agent)
@@ -18,11 +20,31 @@ class AgentAdmin(admin.ModelAdmin):
 
 @admin.register(CallRawData)
 class CallRawDataAdmin(admin.ModelAdmin):
-    list_display = ('id', 'agent', 'call_date', 'duration', 'status', 'created_at')
-    list_filter = ('status', 'call_date', 'created_at')
+    list_display = ('id', 'agent', 'call_date', 'duration', 'status', 'priority', 'created_at')
+    list_filter = ('status', 'priority', 'call_date', 'created_at')
     search_fields = ('agent__user__first_name', 'agent__user__last_name', 'caller_number')
     date_hierarchy = 'call_date'
 
+    def save_model(self, request, obj, form, change):
+        # 수정한 필드만 저장한 뒤 일별 통계에 변경분 반영
+        with transaction.atomic():
+            if change:
+                obj.save(update_fields=[*form.changed_data, 'updated_at'])
+            else:
+                obj.save()
+            refresh_call_daily_stats(obj)
+
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            remove_call_daily_stats(obj)
+            obj.delete()
+
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            for obj in queryset:
+                remove_call_daily_stats(obj)
+            queryset.delete()
+
 
 @admin.register(CallTranscript)
 class CallTranscriptAdmin(admin.ModelAdmin):
@@ -33,8 +55,8 @@ class CallTranscriptAdmin(admin.ModelAdmin):
 
 @admin.register(CallAnalysis)
 class CallAnalysisAdmin(admin.ModelAdmin):
-    list_display = ('id', 'call', 'satisfaction_score', 'satisfaction_category', 'llm_score')
-    list_filter = ('satisfaction_category', 'created_at')
+    list_display = ('id', 'call', 'satisfaction_score', 'satisfaction_category', 'llm_score', 'model_version')
+    list_filter = ('satisfaction_category', 'model_version', 'created_at')
     search_fields = ('call__id', 'summary', 'llm_evaluation')
 
 
@@ -46,10 +68,18 @@ class AgentCoachingAdmin(admin.ModelAdmin):
     date_hierarchy = 'date'
 
 
+@admin.register(AgentDailyStats)
+class AgentDailyStatsAdmin(admin.ModelAdmin):
+    list_display = ('id', 'agent', 'date', 'call_count', 'completed_count', 'failed_count', 'updated_at')
+    list_filter = ('date',)
+    search_fields = ('agent__user__first_name', 'agent__user__last_name')
+    date_hierarchy = 'date'
+
+
 @admin.register(ProcessingTask)
 class ProcessingTaskAdmin(admin.ModelAdmin):
-    list_display = ('id', 'task_type', 'status', 'get_entity', 'created_at')
-    list_filter = ('task_type', 'status', 'created_at')
+    list_display = ('id', 'task_type', 'stage', 'status', 'priority', 'queue_wait', 'get_entity', 'created_at')
+    list_filter = ('task_type', 'status', 'priority', 'created_at')
     search_fields = ('call__id', 'agent__employee_id', 'error_message')
     
     def get_entity(self, obj):
@@ -0,0 +1,94 @@
+import logging
+from django.conf import settings
+
+from .models import ProcessingTask
+
+logger = logging.getLogger('calls')
+
+ACCEPT = 'accept'
+DEFER = 'defer'
+REJECT = 'reject'
+
+
+def get_message_count(connection, queue_name):
+    """
+    큐 하나의 메시지 수
+
+    Redis 브로커는 비어 있는 큐(리스트)를 삭제하므로 passive 선언이 NOT_FOUND로 실패하며,
+    이 경우 0으로 봅니다. AMQP는 채널 오류 시 채널을 닫으므로 큐마다 채널을 따로 엽니다.
+    """
+    from amqp.exceptions import NotFound
+    from kombu.exceptions import ChannelError
+
+    channel = connection.channel()
+    try:
+        return channel.queue_declare(queue=queue_name, passive=True).message_count
+    except ChannelError as e:
+        if isinstance(e, NotFound) or str(getattr(e, 'reply_text', '')).startswith('NOT_FOUND'):
+            return 0
+        raise
+    finally:
+        try:
+            channel.close()
+        except Exception:
+            pass
+
+
+def get_queue_depth(queue_names):
+    """
+    브로커 큐에 쌓여 있는 메시지 수 합계
+
+    브로커에 연결할 수 없으면 None을 반환하며, 이 경우 처리 중 작업 수만으로 판단합니다.
+    """
+    from backend.celery import app
+
+    try:
+        # 업로드 요청을 오래 붙잡지 않도록 연결 재시도 없이 짧은 시간만 기다림
+        with app.connection_for_read(connect_timeout=settings.ADMISSION_BROKER_TIMEOUT) as connection:
+            connection.ensure_connection(max_retries=0)
+            return sum(get_message_count(connection, name) for name in queue_names)
+    except Exception as e:
+        logger.warning(f"Could not read broker queue depth: {str(e)}")
+        return None
+
+
+def get_in_flight_count():
+    """대기/처리 중인 통화 처리 작업 수"""
+    return ProcessingTask.objects.filter(
+        call__isnull=False,
+        status__in=('pending', 'processing')
+    ).count()
+
+
+def check_admission():
+    """
+    업로드된 통화를 바로 처리할지 결정
+
+    Returns
+    -------
+    str
+        ACCEPT, DEFER(백필 큐로 지연), REJECT(429 응답) 중 하나
+    """
+    if not settings.ADMISSION_CONTROL_ENABLED:
+        return ACCEPT
+
+    queue_depth = get_queue_depth(settings.ADMISSION_QUEUES)
+    in_flight = get_in_flight_count()
+
+    def exceeds(value, limit):
+        return value is not None and limit is not None and value >= limit
+
+    if exceeds(queue_depth, settings.ADMISSION_REJECT_QUEUE_DEPTH) or \
+            exceeds(in_flight, settings.ADMISSION_REJECT_IN_FLIGHT):
+        decision = REJECT
+    elif exceeds(queue_depth, settings.ADMISSION_DEFER_QUEUE_DEPTH) or \
+            exceeds(in_flight, settings.ADMISSION_DEFER_IN_FLIGHT):
+        decision = DEFER
+    else:
+        decision = ACCEPT
+
+    if decision != ACCEPT:
+        logger.warning(
+            f"Admission control: {decision} upload (queue depth {queue_depth}, in flight {in_flight})"
+        )
+    return decision
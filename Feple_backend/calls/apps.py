@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class CallsConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "calls"
+
+    def ready(self):
+        from health_check.plugins import plugin_dir
+        from .health import OpenAICircuitHealthCheck
+        from . import checks  # 시스템 체크 등록
+
+        plugin_dir.register(OpenAICircuitHealthCheck)
@@ -0,0 +1,277 @@
+import logging
+
+logger = logging.getLogger('calls')
+
+# 특성 추출에 사용하는 샘플링 레이트 (librosa 기본값)
+FEATURE_SAMPLE_RATE = 22050
+
+
+class DecodedAudio:
+    """
+    디코딩된 오디오 데이터
+
+    파이프라인 실행마다 한 번만 디코딩하여 길이 계산, 특성 추출 등 여러 단계에서
+    공유합니다.
+    """
+
+    def __init__(self, samples, sample_rate):
+        self.samples = samples
+        self.sample_rate = sample_rate
+
+    @property
+    def duration(self):
+        """재생 시간 (초)"""
+        return len(self.samples) / float(self.sample_rate)
+
+    def __repr__(self):
+        return f"<DecodedAudio sr={self.sample_rate} duration={self.duration:.2f}s>"
+
+
+def probe_audio_duration(file_path):
+    """
+    컨테이너 헤더만 읽어 재생 시간(초)을 반환
+
+    전체 디코딩 없이 헤더/메타데이터에서 길이를 얻습니다. 길이를 알 수 없는 형식이면
+    None을 반환합니다.
+    """
+    try:
+        import soundfile as sf
+        info = sf.info(file_path)
+        if info.frames > 0 and info.samplerate > 0:
+            return info.frames / float(info.samplerate)
+    except Exception as e:
+        logger.debug(f"soundfile could not read header of {file_path}: {str(e)}")
+
+    try:
+        # ffmpeg 백엔드는 스트림 정보에서 길이를 읽음 (디코딩 없이 종료)
+        import audioread
+        with audioread.audio_open(file_path) as f:
+            if f.duration:
+                return float(f.duration)
+    except Exception as e:
+        logger.debug(f"audioread could not read header of {file_path}: {str(e)}")
+
+    return None
+
+
+def decode_audio(file_path, sample_rate=FEATURE_SAMPLE_RATE):
+    """
+    오디오 파일을 모노 float32 샘플로 한 번에 디코딩
+
+    임시 WAV 파일 없이 librosa가 원본 파일을 직접 읽어 리샘플링합니다.
+    """
+    import librosa
+    samples, sr = librosa.load(file_path, sr=sample_rate, mono=True)
+    return DecodedAudio(samples, sr)
+
+
+# 스트리밍 특성 추출 파라미터 (librosa 기본값과 동일)
+FRAME_LENGTH = 2048
+HOP_LENGTH = 512
+N_MELS = 128
+N_MFCC = 13
+SILENCE_TOP_DB = 20
+MFCC_TOP_DB = 80.0
+
+
+class _DecibelHistogram:
+    """
+    dB 값의 고정 크기 히스토그램
+
+    전역 최댓값을 알아야 하는 통계(침묵 판정, MFCC의 top_db 클리핑)를 전체 프레임을
+    보관하지 않고 계산하기 위해 사용합니다. 메모리는 구간 수에만 비례합니다.
+    """
+
+    def __init__(self, low, high, bin_width, channels=1):
+        import numpy as np
+
+        self.low = low
+        self.bin_width = bin_width
+        self.n_bins = int(np.ceil((high - low) / bin_width))
+        self.channels = channels
+        self.counts = np.zeros((channels, self.n_bins), dtype=np.int64)
+        self.sums = np.zeros((channels, self.n_bins), dtype=np.float64)
+
+    def add(self, values):
+        """values: (channels, n_frames) 형태의 dB 값"""
+        import numpy as np
+
+        idx = np.clip(((values - self.low) / self.bin_width).astype(np.int64), 0, self.n_bins - 1)
+        flat = (idx + np.arange(self.channels)[:, None] * self.n_bins).ravel()
+        size = self.channels * self.n_bins
+        self.counts += np.bincount(flat, minlength=size).reshape(self.channels, self.n_bins)
+        self.sums += np.bincount(flat, weights=values.ravel(), minlength=size).reshape(self.channels, self.n_bins)
+
+    def _split(self, threshold):
+        # threshold가 속한 구간 (이 구간만 근사치로 처리)
+        return min(max(int((threshold - self.low) // self.bin_width), 0), self.n_bins - 1)
+
+    def count_above(self, threshold):
+        """threshold보다 큰 값의 개수 (채널별)"""
+        import numpy as np
+
+        edge = self._split(threshold)
+        counts = self.counts[:, edge + 1:].sum(axis=1).astype(np.float64)
+        # 경계 구간은 구간 내 평균값 기준으로 판정
+        edge_counts = self.counts[:, edge]
+        edge_means = np.divide(self.sums[:, edge], edge_counts, out=np.zeros(self.channels), where=edge_counts > 0)
+        return counts + np.where(edge_means > threshold, edge_counts, 0)
+
+    def clipped_sum(self, threshold):
+        """max(value, threshold)의 합 (채널별)"""
+        import numpy as np
+
+        edge = self._split(threshold)
+        above = self.sums[:, edge + 1:].sum(axis=1)
+        below = self.counts[:, :edge].sum(axis=1) * threshold
+        edge_counts = self.counts[:, edge]
+        edge_sums = np.maximum(self.sums[:, edge], edge_counts * threshold)
+        return above + below + edge_sums
+
+
+class StreamingFeatureExtractor:
+    """
+    블록 단위 스트리밍 오디오 특성 추출기
+
+    ``extract_audio_features`` 와 같은 통계(RMS, ZCR, 스펙트럼 중심, MFCC 평균,
+    침묵 비율)를 고정 크기 블록을 읽으면서 누적 계산합니다. 프레임 분할은 librosa의
+    center=True 동작(양 끝 frame_length // 2 패딩)을 그대로 재현하며, 메모리 사용량은
+    블록 크기와 히스토그램 크기에만 비례하므로 통화 길이와 무관하게 일정합니다.
+
+    허용 오차 (전체 디코딩 방식 대비)
+        - rms_mean, zcr_mean, spectral_centroid_mean: 상대 오차 0.1% 이내
+        - mfccs: 계수별 절대 오차 0.05 이내
+        - silence_ratio: 절대 오차 0.5%p 이내
+    스트리밍 리샘플링의 경계 처리와 히스토그램 구간(0.25dB/0.05dB) 근사에서
+    발생하는 차이입니다.
+    """
+
+    def __init__(self, sample_rate=FEATURE_SAMPLE_RATE):
+        import numpy as np
+        import librosa
+
+        self.sample_rate = sample_rate
+        self._pad = FRAME_LENGTH // 2
+        # rms/STFT 계열은 0으로, ZCR은 가장자리 값으로 패딩 (librosa와 동일)
+        self._buffer = np.zeros(self._pad, dtype=np.float32)
+        self._zcr_buffer = None
+        self._total_samples = 0
+        self._frames = 0
+        self._rms_sum = 0.0
+        self._zcr_sum = 0.0
+        self._centroid_sum = 0.0
+        self._max_rms_db = -np.inf
+        self._max_mel_db = -np.inf
+        self._rms_hist = _DecibelHistogram(-100.0, 20.0, 0.05)
+        self._mel_hist = _DecibelHistogram(-100.0, 100.0, 0.25, channels=N_MELS)
+        self._mel_basis = librosa.filters.mel(sr=sample_rate, n_fft=FRAME_LENGTH, n_mels=N_MELS)
+
+    def update(self, samples):
+        """리샘플링된 모노 샘플 블록 추가"""
+        import numpy as np
+
+        if len(samples) == 0:
+            return
+        samples = np.asarray(samples, dtype=np.float32)
+        if self._zcr_buffer is None:
+            self._zcr_buffer = np.full(self._pad, samples[0], dtype=np.float32)
+        self._total_samples += len(samples)
+        self._buffer = np.concatenate([self._buffer, samples])
+        self._zcr_buffer = np.concatenate([self._zcr_buffer, samples])
+        self._process()
+
+    def _process(self):
+        import numpy as np
+        import librosa
+
+        if len(self._buffer) < FRAME_LENGTH:
+            return
+        n_frames = 1 + (len(self._buffer) - FRAME_LENGTH) // HOP_LENGTH
+        usable = FRAME_LENGTH + (n_frames - 1) * HOP_LENGTH
+        y = self._buffer[:usable]
+
+        rms = librosa.feature.rms(y=y, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False)[0]
+        zcr = librosa.feature.zero_crossing_rate(
+            self._zcr_buffer[:usable], frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False
+        )[0]
+        S = np.abs(librosa.stft(y, n_fft=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False))
+        centroid = librosa.feature.spectral_centroid(S=S, sr=self.sample_rate, n_fft=FRAME_LENGTH)[0]
+        mel_db = librosa.power_to_db(np.dot(self._mel_basis, S ** 2), ref=1.0, top_db=None)
+        rms_db = 20.0 * np.log10(np.maximum(1e-5, rms))
+
+        self._frames += n_frames
+        self._rms_sum += float(rms.sum())
+        self._zcr_sum += float(zcr.sum())
+        self._centroid_sum += float(centroid.sum())
+        self._max_rms_db = max(self._max_rms_db, float(rms_db.max()))
+        self._max_mel_db = max(self._max_mel_db, float(mel_db.max()))
+        self._rms_hist.add(rms_db[None, :])
+        self._mel_hist.add(mel_db)
+
+        consumed = n_frames * HOP_LENGTH
+        self._buffer = self._buffer[consumed:]
+        self._zcr_buffer = self._zcr_buffer[consumed:]
+
+    def finalize(self):
+        """남은 샘플을 처리하고 특성 딕셔너리 반환"""
+        import numpy as np
+        import scipy.fft
+
+        if self._total_samples == 0:
+            raise ValueError("No audio samples to extract features from")
+
+        last = self._zcr_buffer[-1]
+        self._buffer = np.concatenate([self._buffer, np.zeros(self._pad, dtype=np.float32)])
+        self._zcr_buffer = np.concatenate([self._zcr_buffer, np.full(self._pad, last, dtype=np.float32)])
+        self._process()
+
+        frames = self._frames
+
+        # MFCC: 클리핑된 로그 멜 스펙트럼의 프레임 평균에 DCT 적용 (DCT는 선형)
+        mel_threshold = self._max_mel_db - MFCC_TOP_DB
+        mean_mel_db = self._mel_hist.clipped_sum(mel_threshold) / frames
+        mfccs = scipy.fft.dct(mean_mel_db, type=2, norm='ortho')[:N_MFCC]
+
+        # 침묵 감지: 최대 RMS 대비 SILENCE_TOP_DB 이상 작은 프레임
+        non_silent_frames = float(self._rms_hist.count_above(self._max_rms_db - SILENCE_TOP_DB)[0])
+        non_silent_samples = min(non_silent_frames * HOP_LENGTH, self._total_samples)
+        silence_ratio = (1.0 - non_silent_samples / self._total_samples) * 100
+
+        return {
+            'rms_mean': self._rms_sum / frames,
+            'zcr_mean': self._zcr_sum / frames,
+            'spectral_centroid_mean': self._centroid_sum / frames,
+            'mfccs': [float(value) for value in mfccs],
+            'silence_ratio': float(silence_ratio)
+        }
+
+
+def extract_audio_features_streaming(file_path, block_seconds=30):
+    """
+    오디오 파일을 고정 크기 블록으로 읽으며 특성 추출
+
+    긴 녹음도 전체를 메모리에 올리지 않으며, 원본 샘플링 레이트가 다르면 블록 단위로
+    스트리밍 리샘플링합니다. soundfile(libsndfile)이 읽을 수 있는 형식만 지원합니다.
+    """
+    import numpy as np
+    import soundfile as sf
+
+    extractor = StreamingFeatureExtractor(FEATURE_SAMPLE_RATE)
+
+    with sf.SoundFile(file_path) as f:
+        resampler = None
+        if f.samplerate != FEATURE_SAMPLE_RATE:
+            import soxr
+            resampler = soxr.ResampleStream(f.samplerate, FEATURE_SAMPLE_RATE, 1, dtype='float32')
+
+        block_frames = int(block_seconds * f.samplerate)
+        for block in f.blocks(blocksize=block_frames, dtype='float32', always_2d=True):
+            mono = block.mean(axis=1)
+            if resampler is not None:
+                mono = resampler.resample_chunk(mono)
+            extractor.update(mono)
+
+        if resampler is not None:
+            extractor.update(resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True))
+
+    return extractor.finalize()
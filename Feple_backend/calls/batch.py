@@ -0,0 +1,393 @@
+import os
+import json
+import logging
+from abc import ABC, abstractmethod
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import CallRawData, CallAnalysis
+from .rollup import refresh_call_daily_stats
+from .utils import ensure_directory_exists, get_local_day_range
+
+logger = logging.getLogger('calls')
+
+BATCH_ENDPOINT = '/v1/chat/completions'
+CUSTOM_ID_PREFIX = 'call-'
+# 더 이상 상태가 바뀌지 않는 작업 상태 (다시 반영하지 않음)
+TERMINAL_STATUSES = ('ingested', 'empty', 'failed', 'expired', 'cancelled')
+
+
+class BatchProvider(ABC):
+    """배치 작업 공급자 인터페이스"""
+    name = None
+
+    @abstractmethod
+    def submit(self, requests_path):
+        """요청 JSONL 파일을 제출하고 공급자 배치 ID 반환"""
+
+    @abstractmethod
+    def status(self, batch_id):
+        """배치 상태 반환 ('completed', 'failed', 'expired', 'cancelled' 또는 진행 중 상태)"""
+
+    @abstractmethod
+    def download_results(self, batch_id, output_path):
+        """완료된 배치의 결과 JSONL을 output_path에 저장"""
+
+
+class OpenAIBatchProvider(BatchProvider):
+    """OpenAI Batch API 공급자"""
+    name = 'openai'
+
+    def __init__(self, client=None):
+        from .llm import get_openai_client
+        self.client = client or get_openai_client()
+
+    def submit(self, requests_path):
+        with open(requests_path, 'rb') as f:
+            input_file = self.client.files.create(file=f, purpose='batch')
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint=BATCH_ENDPOINT,
+            completion_window='24h'
+        )
+        return batch.id
+
+    def status(self, batch_id):
+        return self.client.batches.retrieve(batch_id).status
+
+    def download_results(self, batch_id, output_path):
+        batch = self.client.batches.retrieve(batch_id)
+        if not batch.output_file_id:
+            raise ValueError(f"Batch {batch_id} has no output file (status: {batch.status})")
+        content = self.client.files.content(batch.output_file_id)
+        with open(output_path, 'wb') as f:
+            f.write(content.read())
+
+
+class LocalBatchProvider(BatchProvider):
+    """
+    오프라인 테스트용 로컬 파일 기반 공급자
+
+    제출 즉시 요청 파일을 읽어 공급자 출력과 같은 형식의 결과 파일을 작성합니다.
+    응답 본문은 요청 내용에 관계없이 고정된 평가 JSON입니다.
+    """
+    name = 'local'
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.path.join(settings.LLM_BATCH_DIR, '_local_provider')
+
+    def _output_path(self, batch_id):
+        return os.path.join(self.directory, f"{batch_id}.output.jsonl")
+
+    def submit(self, requests_path):
+        ensure_directory_exists(self.directory)
+        batch_id = f"local_batch_{timezone.now().strftime('%Y%m%d%H%M%S%f')}"
+
+        with open(requests_path, 'r', encoding='utf-8') as src, \
+                open(self._output_path(batch_id), 'w', encoding='utf-8') as dst:
+            for line in src:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                dst.write(json.dumps(self._respond(request), ensure_ascii=False) + '\n')
+
+        return batch_id
+
+    def _respond(self, request):
+        content = json.dumps({
+            "evaluation": "로컬 배치 공급자 평가 결과입니다.",
+            "score": 3.0,
+            "topics": ["기타"],
+            "emotions": {"agent": "중립", "customer": "중립"},
+            "summary": "로컬 배치 공급자 요약입니다."
+        }, ensure_ascii=False)
+        return {
+            "id": f"batch_req_{request['custom_id']}",
+            "custom_id": request['custom_id'],
+            "response": {
+                "status_code": 200,
+                "body": {
+                    "model": request['body'].get('model'),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]
+                }
+            },
+            "error": None
+        }
+
+    def status(self, batch_id):
+        return 'completed' if os.path.exists(self._output_path(batch_id)) else 'failed'
+
+    def download_results(self, batch_id, output_path):
+        with open(self._output_path(batch_id), 'rb') as src, open(output_path, 'wb') as dst:
+            dst.write(src.read())
+
+
+BATCH_PROVIDERS = {
+    OpenAIBatchProvider.name: OpenAIBatchProvider,
+    LocalBatchProvider.name: LocalBatchProvider,
+}
+
+
+def get_batch_provider(name=None):
+    """이름으로 배치 공급자 생성"""
+    name = name or settings.LLM_BATCH_PROVIDER
+    if name not in BATCH_PROVIDERS:
+        raise ValueError(f"Unknown batch provider: {name}")
+    return BATCH_PROVIDERS[name]()
+
+
+def get_batch_job_dir(job_id):
+    """배치 작업 디렉토리 경로"""
+    return os.path.join(settings.LLM_BATCH_DIR, job_id)
+
+
+def load_manifest(job_id):
+    with open(os.path.join(get_batch_job_dir(job_id), 'manifest.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(job_id, manifest):
+    with open(os.path.join(get_batch_job_dir(job_id), 'manifest.json'), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+
+def get_calls_for_evaluation(start_date, end_date):
+    """기간 내 전사 및 분석 결과가 있는 통화 조회 (종료일 포함)"""
+    start, end = get_local_day_range(start_date, end_date)
+    return CallRawData.objects.filter(
+        call_date__gte=start,
+        call_date__lt=end,
+        transcript__isnull=False,
+        analysis__isnull=False
+    ).select_related('transcript', 'analysis', 'agent__user').order_by('id')
+
+
+def build_custom_id(call_id, index=1, total=1):
+    """배치 요청 custom_id 생성 (여러 구간으로 나눈 통화는 'call-<ID>:<구간>/<전체>')"""
+    if total > 1:
+        return f"{CUSTOM_ID_PREFIX}{call_id}:{index}/{total}"
+    return f"{CUSTOM_ID_PREFIX}{call_id}"
+
+
+def parse_custom_id(custom_id):
+    """custom_id를 (통화 ID, 구간 번호, 전체 구간 수)로 해석"""
+    call_part, _, window = custom_id[len(CUSTOM_ID_PREFIX):].partition(':')
+    if not window:
+        return int(call_part), 1, 1
+    index, total = window.split('/')
+    return int(call_part), int(index), int(total)
+
+
+def write_evaluation_requests(calls, requests_path):
+    """
+    평가 요청을 배치 입력 JSONL로 기록
+
+    동기 평가 경로와 마찬가지로 LLM_EVALUATION_TOKEN_BUDGET을 넘는 통화는 겹치는 구간으로
+    나눠 구간마다 요청을 기록합니다.
+
+    Returns
+    -------
+    tuple
+        (요청 수, 여러 구간으로 나눈 통화의 구간별 토큰 수 {통화 ID: [토큰 수, ...]})
+    """
+    from .integration import build_evaluation_messages, get_evaluation_windows
+    from .routing import route_evaluation_model
+    from .tokens import count_tokens
+    from .utils import format_conversation_for_llm
+
+    count = 0
+    window_weights = {}
+    with open(requests_path, 'w', encoding='utf-8') as f:
+        for call in calls.iterator():
+            speakers_data = call.transcript.speakers_json
+            model = route_evaluation_model(
+                speakers_data,
+                call.analysis.satisfaction_score,
+                call_id=call.id
+            )[0]
+            windows = get_evaluation_windows(speakers_data)
+            total = len(windows)
+            if total > 1:
+                # 병합 시 점수 가중치 (동기 경로와 같은 구간 토큰 수)
+                window_weights[str(call.id)] = [
+                    count_tokens(format_conversation_for_llm(window), model) for window in windows
+                ]
+            for index, window in enumerate(windows, start=1):
+                request = {
+                    "custom_id": build_custom_id(call.id, index, total),
+                    "method": "POST",
+                    "url": BATCH_ENDPOINT,
+                    "body": {
+                        "model": model,
+                        "messages": build_evaluation_messages(
+                            window,
+                            call.agent.user.get_full_name(),
+                            (index, total) if total > 1 else None
+                        ),
+                        "response_format": {"type": "json_object"}
+                    }
+                }
+                f.write(json.dumps(request, ensure_ascii=False) + '\n')
+                count += 1
+    return count, window_weights
+
+
+def submit_evaluation_batch(start_date, end_date, provider_name=None):
+    """
+    기간 내 통화의 평가 요청 파일을 만들어 배치 작업으로 제출
+
+    Returns
+    -------
+    dict
+        작업 매니페스트 (job_id, batch_id, 요청 수 등)
+    """
+    provider = get_batch_provider(provider_name)
+    job_id = f"eval_{start_date:%Y%m%d}_{end_date:%Y%m%d}_{timezone.now():%Y%m%d%H%M%S}"
+    job_dir = get_batch_job_dir(job_id)
+    ensure_directory_exists(job_dir)
+
+    requests_path = os.path.join(job_dir, 'requests.jsonl')
+    request_count, window_weights = write_evaluation_requests(
+        get_calls_for_evaluation(start_date, end_date), requests_path
+    )
+
+    manifest = {
+        'job_id': job_id,
+        'provider': provider.name,
+        'start_date': start_date.isoformat(),
+        'end_date': end_date.isoformat(),
+        'request_count': request_count,
+        'window_weights': window_weights,
+        'batch_id': None,
+        'status': 'empty',
+        'created_at': timezone.now().isoformat(),
+    }
+    if request_count:
+        manifest['batch_id'] = provider.submit(requests_path)
+        manifest['status'] = 'submitted'
+
+    save_manifest(job_id, manifest)
+    logger.info(f"Submitted evaluation batch {job_id} with {request_count} requests")
+    return manifest
+
+
+def ingest_evaluation_batch(job_id, chunk_size=500):
+    """
+    완료된 배치 결과를 CallAnalysis에 일괄 반영
+
+    여러 구간으로 나눠 요청한 통화는 구간 결과를 merge_window_evaluations로 병합합니다.
+    오류 응답, 파싱할 수 없는 응답, 평가나 점수가 빠진 응답은 기존 평가를 덮어쓰지 않고
+    건너뛰며 (구간 중 하나라도 해당하면 통화 전체), 건너뛴 통화 ID를 매니페스트의
+    failed_call_ids에 기록합니다.
+
+    Returns
+    -------
+    dict
+        작업 매니페스트 (상태, 반영/실패 건수 포함)
+    """
+    from .integration import parse_evaluation_result, is_fallback_evaluation, merge_window_evaluations
+
+    manifest = load_manifest(job_id)
+    if not manifest.get('batch_id') or manifest['status'] in TERMINAL_STATUSES:
+        return manifest
+
+    provider = get_batch_provider(manifest['provider'])
+    status = provider.status(manifest['batch_id'])
+    if status != 'completed':
+        manifest['status'] = status
+        save_manifest(job_id, manifest)
+        return manifest
+
+    results_path = os.path.join(get_batch_job_dir(job_id), 'results.jsonl')
+    provider.download_results(manifest['batch_id'], results_path)
+
+    windows = {}
+    failed = 0
+    failed_call_ids = []
+    with open(results_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            call_id = None
+            try:
+                item = json.loads(line)
+                call_id, index, total = parse_custom_id(item['custom_id'])
+                response = item.get('response') or {}
+                if item.get('error') or response.get('status_code') != 200:
+                    raise ValueError(item.get('error') or f"status {response.get('status_code')}")
+                content = response['body']['choices'][0]['message']['content']
+                usage = response['body'].get('usage') or {}
+                result = parse_evaluation_result(content)
+                if is_fallback_evaluation(result):
+                    raise ValueError("response is missing evaluation or score")
+                windows.setdefault(call_id, (total, {}))[1][index] = (result, response['body'].get('model', ''), usage)
+            except Exception as e:
+                logger.warning(f"Skipping batch result for call {call_id} in {job_id}: {str(e)}")
+                failed += 1
+                if call_id is not None and call_id not in failed_call_ids:
+                    failed_call_ids.append(call_id)
+
+    # 구간별 결과를 통화 단위로 병합 (구간 중 하나라도 실패한 통화는 건너뜀)
+    parsed = {}
+    window_weights = manifest.get('window_weights') or {}
+    for call_id, (total, results) in windows.items():
+        if call_id in failed_call_ids:
+            continue
+        if len(results) != total:
+            logger.warning(f"Skipping batch result for call {call_id} in {job_id}: {len(results)}/{total} windows")
+            failed_call_ids.append(call_id)
+            continue
+        if total == 1:
+            parsed[call_id] = results[1]
+            continue
+        ordered = [results[index] for index in range(1, total + 1)]
+        weights = window_weights.get(str(call_id)) or [1] * total
+        parsed[call_id] = (
+            merge_window_evaluations([result for result, _, _ in ordered], weights),
+            ordered[0][1],
+            {
+                key: sum(usage.get(key) or 0 for _, _, usage in ordered)
+                for key in ('prompt_tokens', 'completion_tokens')
+            }
+        )
+
+    updated = 0
+    fields = [
+        'llm_evaluation', 'llm_score', 'key_topics', 'emotions', 'summary', 'llm_model', 'llm_fallback',
+        'llm_input_tokens', 'llm_output_tokens', 'updated_at'
+    ]
+    call_ids = list(parsed)
+    for offset in range(0, len(call_ids), chunk_size):
+        analyses = list(CallAnalysis.objects.filter(call_id__in=call_ids[offset:offset + chunk_size]))
+        now = timezone.now()
+        for analysis in analyses:
+            result, model, usage = parsed[analysis.call_id]
+            evaluation, score, topics, emotions, summary = result
+            analysis.llm_evaluation = evaluation
+            analysis.llm_score = score
+            analysis.key_topics = topics
+            analysis.emotions = emotions
+            analysis.summary = summary
+            # 기본 평가였던 통화도 정상 평가로 바뀌었으므로 재평가 대상에서 제외
+            analysis.llm_fallback = False
+            analysis.llm_model = model
+            analysis.llm_input_tokens = usage.get('prompt_tokens')
+            analysis.llm_output_tokens = usage.get('completion_tokens')
+            analysis.updated_at = now
+        with transaction.atomic():
+            CallAnalysis.objects.bulk_update(analyses, fields)
+            for analysis in analyses:
+                refresh_call_daily_stats(analysis.call_id)
+        updated += len(analyses)
+
+    manifest.update({
+        'status': 'ingested',
+        'ingested_count': updated,
+        'failed_count': failed,
+        'failed_call_ids': failed_call_ids,
+        'ingested_at': timezone.now().isoformat(),
+    })
+    save_manifest(job_id, manifest)
+    logger.info(f"Ingested evaluation batch {job_id}: {updated} updated, {failed} failed")
+    return manifest
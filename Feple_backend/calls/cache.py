@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from .utils import ensure_directory_exists
+
+logger = logging.getLogger('calls')
+
+# 정리 시 max_bytes의 이 비율까지 줄여, 가득 찬 상태에서도 쓰기마다 스캔하지 않도록 함
+EVICT_TARGET_RATIO = 0.9
+
+
+class FileResultCache:
+    """
+    디스크 기반 JSON 결과 캐시
+
+    키(해시 문자열)마다 JSON 파일 하나를 저장합니다. 조회 시 파일의 mtime을 갱신하여
+    최근 사용 시각으로 쓰고, 전체 크기가 ``max_bytes`` 를 넘으면 가장 오래 사용하지
+    않은 항목부터 삭제합니다(LRU). ``ttl`` (초)을 지정하면 기록 후 그 시간이 지난
+    항목은 만료된 것으로 처리합니다. 여러 워커 프로세스가 같은 디렉토리를 공유할 수
+    있도록 쓰기는 임시 파일 작성 후 교체하는 방식으로 수행합니다.
+
+    전체 크기는 프로세스 안에서 누적 추정치로 관리하여 쓰기마다 디렉토리를 훑지 않습니다.
+    추정치가 ``max_bytes`` 를 넘을 때와, 다른 프로세스의 쓰기를 반영하기 위해
+    ``rescan_interval`` 회 쓰기마다 한 번씩만 전체를 스캔합니다.
+    """
+
+    def __init__(self, directory, max_bytes, ttl=None, rescan_interval=1000):
+        self.directory = str(directory)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.rescan_interval = rescan_interval
+        self._lock = threading.Lock()
+        self._total_bytes = None  # 아직 스캔하지 않음
+        self._writes_since_scan = 0
+
+    def _path(self, key):
+        # 한 디렉토리에 파일이 너무 많아지지 않도록 앞 두 글자로 분산
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key):
+        """캐시된 값 반환 (없거나 만료된 경우 None)"""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Discarding unreadable cache entry {path}: {str(e)}")
+            self.delete(key)
+            return None
+
+        if self.ttl is not None and time.time() - entry.get('stored_at', 0) > self.ttl:
+            self.delete(key)
+            return None
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry.get('value')
+
+    def set(self, key, value):
+        """값 저장 후 크기 제한 초과 시 오래된 항목 삭제"""
+        path = self._path(key)
+        ensure_directory_exists(os.path.dirname(path))
+        old_size = self._file_size(path)
+
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'stored_at': time.time(), 'value': value}, f, ensure_ascii=False)
+            new_size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._writes_since_scan += 1
+            if self._total_bytes is not None:
+                self._total_bytes += new_size - old_size
+            needs_scan = (
+                self._total_bytes is None
+                or self._total_bytes > self.max_bytes
+                or self._writes_since_scan >= self.rescan_interval
+            )
+        if needs_scan:
+            self.evict()
+
+    def delete(self, key):
+        path = self._path(key)
+        size = self._file_size(path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes = max(self._total_bytes - size, 0)
+
+    @staticmethod
+    def _file_size(path):
+        try:
+            return os.path.getsize(path)
+        except OSError:
+            return 0
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.json'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, stat.st_mtime, stat.st_size
+
+    def evict(self):
+        """디렉토리를 스캔하여 max_bytes를 넘으면 그 90%가 될 때까지 최근 사용 시각이 오래된 항목 삭제"""
+        with self._lock:
+            entries = list(self._entries())
+            total = sum(size for _, _, size in entries)
+            self._writes_since_scan = 0
+            if total <= self.max_bytes:
+                self._total_bytes = total
+                return 0
+
+            removed = 0
+            target = self.max_bytes * EVICT_TARGET_RATIO
+            for path, _, size in sorted(entries, key=lambda entry: entry[1]):
+                if total <= target:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+                removed += 1
+
+            self._total_bytes = total
+            logger.info(f"Evicted {removed} entries from cache {self.directory}")
+            return removed
+
+
+def record_cache_access(cache_stats, name, hit):
+    """실행 단위 캐시 적중/미스 횟수 기록"""
+    if cache_stats is None:
+        return
+    counts = cache_stats.setdefault(name, {'hits': 0, 'misses': 0})
+    counts['hits' if hit else 'misses'] += 1
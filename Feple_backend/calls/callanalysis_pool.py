@@ -0,0 +1,213 @@
+import os
+import sys
+import json
+import queue
+import atexit
+import select
+import logging
+import itertools
+import threading
+import subprocess
+from django.conf import settings
+
+logger = logging.getLogger('calls')
+
+
+class WorkerCrashed(Exception):
+    """워커 프로세스가 종료되었거나 응답하지 않음"""
+
+
+class CallanalysisWorker:
+    """
+    상주 callanalysis 워커 프로세스 하나
+
+    stdin/stdout 파이프로 한 줄짜리 JSON 요청/응답을 주고받습니다
+    (프로토콜은 callanalysis_worker 모듈 참고).
+    """
+
+    def __init__(self, command, cwd=None):
+        self.command = command
+        self.cwd = cwd
+        self.process = None
+        self._buffer = b''
+
+    def start(self, timeout):
+        self.process = subprocess.Popen(
+            self.command,
+            cwd=self.cwd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            bufsize=0
+        )
+        ready = self._read_message(timeout)
+        if not ready.get('ready'):
+            raise WorkerCrashed(f"Unexpected startup message: {ready}")
+        logger.info(f"Started callanalysis worker (pid {self.process.pid})")
+
+    def alive(self):
+        return self.process is not None and self.process.poll() is None
+
+    def stop(self):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def kill(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+
+    def request(self, message, timeout):
+        """요청을 보내고 응답 메시지 반환"""
+        try:
+            self.process.stdin.write((json.dumps(message, ensure_ascii=False) + '\n').encode('utf-8'))
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise WorkerCrashed(f"Could not send job to worker: {str(e)}")
+        return self._read_message(timeout)
+
+    def _read_message(self, timeout):
+        fd = self.process.stdout.fileno()
+        while b'\n' not in self._buffer:
+            readable, _, _ = select.select([fd], [], [], timeout)
+            if not readable:
+                raise WorkerCrashed(f"Worker did not respond within {timeout}s")
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise WorkerCrashed(f"Worker exited with code {self.process.poll()}")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b'\n', 1)
+        return json.loads(line.decode('utf-8'))
+
+
+class CallanalysisWorkerPool:
+    """
+    callanalysis 상주 워커 풀
+
+    STT/화자 분리 모델을 메모리에 유지하는 워커 프로세스를 최대 ``size`` 개 띄워 두고
+    작업을 나눠 줍니다. 워커는 처음 필요할 때 시작되며, 비정상 종료되거나 시간 안에
+    응답하지 않은 워커는 종료 후 다음 작업에서 새로 시작됩니다. 결과 JSON은 파이프로
+    직접 받으므로 공유 임시 파일을 사용하지 않습니다.
+    """
+
+    def __init__(self, command, size=1, cwd=None, job_timeout=1800, startup_timeout=600):
+        self.command = command
+        self.size = size
+        self.cwd = cwd
+        self.job_timeout = job_timeout
+        self.startup_timeout = startup_timeout
+        self._job_ids = itertools.count(1)
+        self._workers = []
+        self._lock = threading.Lock()
+        # 빈 슬롯(None)은 아직 시작하지 않았거나 재시작이 필요한 워커 자리
+        self._idle = queue.Queue()
+        for _ in range(size):
+            self._idle.put(None)
+
+    def _acquire(self):
+        worker = self._idle.get()
+        if worker is not None and worker.alive():
+            return worker
+
+        if worker is not None:
+            logger.warning("callanalysis worker exited unexpectedly, restarting")
+            self._forget(worker)
+
+        worker = CallanalysisWorker(self.command, cwd=self.cwd)
+        try:
+            worker.start(self.startup_timeout)
+        except Exception:
+            worker.kill()
+            self._idle.put(None)
+            raise
+        with self._lock:
+            self._workers.append(worker)
+        return worker
+
+    def _forget(self, worker):
+        with self._lock:
+            if worker in self._workers:
+                self._workers.remove(worker)
+
+    def process(self, audio_file_path):
+        """
+        오디오 파일 처리
+
+        Returns
+        -------
+        dict or None
+            처리 결과 데이터 (성공 시) 또는 None (실패 시)
+        """
+        try:
+            worker = self._acquire()
+        except Exception as e:
+            logger.exception(f"Could not start callanalysis worker: {str(e)}")
+            return None
+
+        job_id = next(self._job_ids)
+        try:
+            response = worker.request(
+                {'id': job_id, 'audio_path': os.path.abspath(audio_file_path)},
+                self.job_timeout
+            )
+        except WorkerCrashed as e:
+            logger.error(f"callanalysis worker failed on {audio_file_path}: {str(e)}")
+            worker.kill()
+            self._forget(worker)
+            self._idle.put(None)
+            return None
+
+        self._idle.put(worker)
+
+        if response.get('id') != job_id or 'error' in response:
+            logger.error(f"Error running callanalysis on {audio_file_path}: {response.get('error')}")
+            return None
+        return response.get('result')
+
+    def shutdown(self):
+        """모든 워커 종료"""
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.stop()
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_callanalysis_worker_command():
+    """워커 실행 명령"""
+    command = [sys.executable, '-m', 'calls.callanalysis_worker']
+    if settings.CALLANALYSIS_WORKER_STUB:
+        return command + ['--stub']
+    return command + ['--callanalysis-path', str(settings.CALLANALYSIS_PATH)]
+
+
+def get_callanalysis_pool():
+    """프로세스 공용 callanalysis 워커 풀 반환 (fork 이후에는 새로 생성)"""
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                _pool = CallanalysisWorkerPool(
+                    get_callanalysis_worker_command(),
+                    size=settings.CALLANALYSIS_POOL_SIZE,
+                    cwd=str(settings.BASE_DIR),
+                    job_timeout=settings.CALLANALYSIS_JOB_TIMEOUT,
+                    startup_timeout=settings.CALLANALYSIS_STARTUP_TIMEOUT
+                )
+                _pool_pid = os.getpid()
+                atexit.register(_pool.shutdown)
+    return _pool
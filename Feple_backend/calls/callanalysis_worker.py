@@ -0,0 +1,112 @@
+"""
+callanalysis 상주 워커 프로세스
+
+표준 입력으로 한 줄에 하나씩 JSON 작업({"id": ..., "audio_path": ...})을 받아 처리하고,
+표준 출력으로 한 줄에 하나씩 JSON 응답({"id": ..., "result": ...} 또는
+{"id": ..., "error": ...})을 돌려줍니다. STT/화자 분리 모델은 프로세스 시작 시 한 번만
+로드되어 이후 작업에서 계속 재사용됩니다.
+
+Django에 의존하지 않으므로 다음과 같이 단독으로 실행됩니다.
+
+    python -m calls.callanalysis_worker --callanalysis-path ../callanalysis
+    python -m calls.callanalysis_worker --stub   # 테스트용
+"""
+import os
+import sys
+import copy
+import json
+import argparse
+import traceback
+
+STUB_RESULT = {
+    "transcript": "안녕하세요. 무엇을 도와드릴까요? 저는 기타 관련해서 문의가 있어요. 싼 기타와 비싼 기타의 차이점이 궁금합니다. 네, 비싼 기타는 소리 품질이 더 좋고 내구성이 뛰어납니다. 또한 목재의 품질과 제작 기술이 다릅니다. 그렇군요. 초보자에게는 어떤 기타가 좋을까요? 초보자에게는 중저가 기타를 추천해 드립니다. 연습용으로 충분하고 나중에 실력이 늘면 업그레이드할 수 있어요. 알겠습니다. 감사합니다. 다른 문의사항 있으신가요? 아니요, 충분히 도움이 되었습니다. 감사합니다. 감사합니다. 좋은 하루 되세요.",
+    "speaker_timestamps": {
+        "speakers": [
+            {"id": "AGENT", "utterances": [
+                {"start": 0.0, "end": 4.5, "text": "안녕하세요. 무엇을 도와드릴까요?"},
+                {"start": 13.2, "end": 29.8, "text": "네, 비싼 기타는 소리 품질이 더 좋고 내구성이 뛰어납니다. 또한 목재의 품질과 제작 기술이 다릅니다."},
+                {"start": 38.0, "end": 55.3, "text": "초보자에게는 중저가 기타를 추천해 드립니다. 연습용으로 충분하고 나중에 실력이 늘면 업그레이드할 수 있어요."},
+                {"start": 63.8, "end": 68.2, "text": "다른 문의사항 있으신가요?"},
+                {"start": 75.0, "end": 78.5, "text": "감사합니다. 좋은 하루 되세요."}
+            ]},
+            {"id": "CUSTOMER", "utterances": [
+                {"start": 5.0, "end": 12.7, "text": "저는 기타 관련해서 문의가 있어요. 싼 기타와 비싼 기타의 차이점이 궁금합니다."},
+                {"start": 30.5, "end": 37.5, "text": "그렇군요. 초보자에게는 어떤 기타가 좋을까요?"},
+                {"start": 56.0, "end": 62.3, "text": "알겠습니다. 감사합니다."},
+                {"start": 69.0, "end": 74.5, "text": "아니요, 충분히 도움이 되었습니다. 감사합니다."}
+            ]}
+        ]
+    },
+    "audio_stats": {
+        "duration": 80.0,
+        "silence_rate": 0.15,
+        "agent_talk_ratio": 0.65,
+        "customer_talk_ratio": 0.35,
+        "interruption_count": 0
+    },
+    "sentiment": {
+        "agent": {"positive": 0.8, "neutral": 0.15, "negative": 0.05},
+        "customer": {"positive": 0.7, "neutral": 0.25, "negative": 0.05}
+    }
+}
+
+
+def load_stub_processor():
+    """테스트용 처리 함수 (고정된 결과 반환)"""
+    def process(audio_path):
+        return copy.deepcopy(STUB_RESULT)
+    return process
+
+
+def load_callanalysis_processor(callanalysis_path):
+    """callanalysis의 main.process를 로드 (모델 로딩은 여기서 한 번만 수행)"""
+    callanalysis_path = os.path.abspath(callanalysis_path)
+    sys.path.insert(0, callanalysis_path)
+    os.chdir(callanalysis_path)
+    from main import process
+    return process
+
+
+def serve(process, input_stream, output_stream):
+    """작업 루프: 입력 스트림이 닫힐 때까지 작업을 처리"""
+    for line in input_stream:
+        if not line.strip():
+            continue
+        job_id = None
+        try:
+            job = json.loads(line)
+            job_id = job.get('id')
+            response = {'id': job_id, 'result': process(job['audio_path'])}
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            response = {'id': job_id, 'error': f"{type(e).__name__}: {e}"}
+        output_stream.write(json.dumps(response, ensure_ascii=False) + '\n')
+        output_stream.flush()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='callanalysis persistent worker')
+    parser.add_argument('--callanalysis-path', help='callanalysis 프로젝트 경로')
+    parser.add_argument('--stub', action='store_true', help='모델 없이 고정된 결과 반환')
+    args = parser.parse_args(argv)
+
+    # 프로토콜 출력은 원래 stdout으로만 보내고, 모델/라이브러리의 print 출력은 stderr로 보냄
+    protocol_output = sys.stdout
+    sys.stdout = sys.stderr
+
+    if args.stub:
+        process = load_stub_processor()
+    elif args.callanalysis_path:
+        process = load_callanalysis_processor(args.callanalysis_path)
+    else:
+        parser.error('--callanalysis-path 또는 --stub 중 하나가 필요합니다.')
+
+    # 준비 완료 신호
+    protocol_output.write(json.dumps({'ready': True}) + '\n')
+    protocol_output.flush()
+
+    serve(process, sys.stdin, protocol_output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+from django.conf import settings
+from django.core import checks
+
+# 프로세스마다 따로 저장되어 웹 서버와 워커가 상태를 공유하지 못하는 캐시 백엔드
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def is_process_local_cache(alias):
+    """캐시가 프로세스 안에서만 유지되는지 여부"""
+    return settings.CACHES.get(alias, {}).get('BACKEND') in PROCESS_LOCAL_CACHE_BACKENDS
+
+
+@checks.register(checks.Tags.caches)
+def check_circuit_cache(app_configs, **kwargs):
+    """서킷 브레이커 상태를 저장하는 default 캐시가 프로세스 간에 공유되는지 확인"""
+    if not settings.LLM_CIRCUIT_ENABLED or not is_process_local_cache('default'):
+        return []
+    return [checks.Error(
+        "The default cache is process-local, so each web and Celery worker process keeps its own "
+        "OpenAI circuit breaker state.",
+        hint="Set DJANGO_CACHE_BACKEND/DJANGO_CACHE_LOCATION to a shared cache such as Redis.",
+        id='calls.E001',
+    )]
+
+
+@checks.register(checks.Tags.caches)
+def check_dashboard_cache(app_configs, **kwargs):
+    """
+    대시보드 캐시가 프로세스 간에 공유되는지 확인
+
+    개요 캐시는 Celery 워커의 finalize_call에서 무효화하므로, 프로세스별 캐시이면 웹 서버는
+    TTL이 지날 때까지 이전 데이터(와 같은 ETag)를 계속 응답합니다.
+    """
+    if not is_process_local_cache(settings.DASHBOARD_CACHE_ALIAS):
+        return []
+    return [checks.Error(
+        f"DASHBOARD_CACHE_ALIAS '{settings.DASHBOARD_CACHE_ALIAS}' is a process-local cache, so overview "
+        "invalidation from Celery workers never reaches the web process.",
+        hint="Point DASHBOARD_CACHE_ALIAS at a cache shared by the web and worker processes, such as Redis.",
+        id='calls.E002',
+    )]
@@ -0,0 +1,107 @@
+import logging
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger('calls')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(Exception):
+    """회로가 열려 있어 외부 서비스 요청을 보내지 않음"""
+
+
+class CircuitBreaker:
+    """
+    외부 서비스용 서킷 브레이커
+
+    상태를 Django default 캐시(기본값 Redis)에 저장하므로 웹 서버와 모든 워커 프로세스가
+    공유합니다 (프로세스별 캐시이면 시스템 체크 calls.E001 실패).
+    연속 실패가 ``failure_threshold`` 회에 이르면 회로가 열리고, 열린 동안에는 요청을
+    보내지 않고 바로 CircuitOpenError를 발생시킵니다. ``recovery_timeout`` 초가 지나면
+    반열림(half-open) 상태가 되어 한 번에 하나의 시험 요청만 통과시키며, 시험 요청이
+    성공하면 회로가 닫히고 실패하면 다시 열립니다.
+    """
+
+    def __init__(self, name, failure_threshold, recovery_timeout, probe_timeout):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.probe_timeout = probe_timeout
+        self.failures_key = f'circuit:{name}:failures'
+        self.opened_at_key = f'circuit:{name}:opened_at'
+        self.probe_key = f'circuit:{name}:probe'
+
+    def _state(self, opened_at):
+        if opened_at is None:
+            return CLOSED
+        if time.time() - opened_at < self.recovery_timeout:
+            return OPEN
+        return HALF_OPEN
+
+    @property
+    def state(self):
+        return self._state(cache.get(self.opened_at_key))
+
+    def allow_request(self):
+        """요청을 보내도 되는지 확인 (반열림 상태에서는 시험 요청 하나만 허용)"""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return False
+        # add는 키가 없을 때만 성공하므로 여러 워커 중 하나만 시험 요청을 보냄
+        return cache.add(self.probe_key, 1, timeout=self.probe_timeout)
+
+    def record_success(self):
+        """요청 성공 기록 (열려 있거나 실패가 누적된 경우에만 초기화)"""
+        values = cache.get_many([self.failures_key, self.opened_at_key])
+        if not values:
+            return
+        if self.opened_at_key in values:
+            logger.info(f"Circuit {self.name} closed after successful probe")
+        cache.delete_many([self.failures_key, self.opened_at_key, self.probe_key])
+
+    def record_failure(self):
+        """요청 실패 기록 (연속 실패가 임계값에 이르거나 시험 요청이 실패하면 회로를 엶)"""
+        if self.state == HALF_OPEN:
+            cache.set(self.opened_at_key, time.time(), timeout=None)
+            cache.delete(self.probe_key)
+            logger.warning(f"Circuit {self.name} re-opened after failed probe")
+            return
+
+        cache.add(self.failures_key, 0, timeout=None)
+        try:
+            failures = cache.incr(self.failures_key)
+        except ValueError:
+            # add와 incr 사이에 다른 워커가 초기화한 경우
+            cache.set(self.failures_key, 1, timeout=None)
+            failures = 1
+
+        if failures >= self.failure_threshold and cache.add(self.opened_at_key, time.time(), timeout=None):
+            logger.warning(f"Circuit {self.name} opened after {failures} consecutive failures")
+
+    def get_status(self):
+        """현재 상태, 연속 실패 수, 열린 시각"""
+        values = cache.get_many([self.failures_key, self.opened_at_key])
+        opened_at = values.get(self.opened_at_key)
+        return {
+            'state': self._state(opened_at),
+            'failures': values.get(self.failures_key, 0),
+            'opened_at': opened_at,
+        }
+
+
+def get_llm_circuit():
+    """OpenAI 요청용 서킷 브레이커 (비활성화 시 None)"""
+    if not settings.LLM_CIRCUIT_ENABLED:
+        return None
+    return CircuitBreaker(
+        'openai',
+        failure_threshold=settings.LLM_CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout=settings.LLM_CIRCUIT_RECOVERY_TIMEOUT,
+        probe_timeout=settings.OPENAI_TIMEOUT * 2
+    )
@@ -0,0 +1,77 @@
+import json
+import time
+import hashlib
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils.http import parse_http_date_safe
+
+OVERVIEW_VERSION_KEY = 'dashboard:overview:version'
+
+
+def get_dashboard_cache():
+    """대시보드 캐시 (DASHBOARD_CACHE_ALIAS - 워커와 웹 서버가 공유해야 하며 시스템 체크 calls.E002로 확인)"""
+    return caches[settings.DASHBOARD_CACHE_ALIAS]
+
+
+def get_overview_version():
+    """개요 캐시 버전 (마지막 무효화 시각)"""
+    cache = get_dashboard_cache()
+    version = cache.get(OVERVIEW_VERSION_KEY)
+    if version is None:
+        cache.add(OVERVIEW_VERSION_KEY, time.time(), timeout=None)
+        version = cache.get(OVERVIEW_VERSION_KEY)
+    return version
+
+
+def invalidate_overview_cache():
+    """
+    개요 캐시 무효화
+
+    버전을 바꾸면 이전 버전 키의 항목은 더 이상 조회되지 않고 TTL이 지나면 사라지므로
+    항목을 하나씩 지울 필요가 없습니다.
+    """
+    get_dashboard_cache().set(OVERVIEW_VERSION_KEY, time.time(), timeout=None)
+
+
+def get_cached_overview(params, build):
+    """
+    파라미터별 개요 데이터를 캐시에서 조회하고, 없으면 build()로 만들어 저장
+
+    Parameters
+    ----------
+    params : dict
+        캐시 키에 포함할 필터 파라미터 (days, department 등)
+    build : callable
+        개요 데이터를 만드는 함수
+
+    Returns
+    -------
+    dict
+        data(응답 본문), etag, last_modified(epoch 초)
+    """
+    cache = get_dashboard_cache()
+    key = f"dashboard:overview:{get_overview_version()}:{urlencode(sorted(params.items()))}"
+    entry = cache.get(key)
+    if entry is None:
+        # JSON으로 한 번 직렬화하여 캐시에는 순수 데이터만 저장하고, 같은 본문으로 ETag 계산
+        body = json.dumps(build(), cls=DjangoJSONEncoder, sort_keys=True)
+        entry = {
+            'data': json.loads(body),
+            'etag': f'"{hashlib.md5(body.encode("utf-8")).hexdigest()}"',
+            'last_modified': int(time.time()),
+        }
+        cache.set(key, entry, timeout=settings.DASHBOARD_CACHE_TTL)
+    return entry
+
+
+def is_not_modified(request, etag, last_modified):
+    """If-None-Match/If-Modified-Since 조건부 요청에 304로 응답할 수 있는지 여부"""
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+        return '*' in tags or etag in tags
+
+    if_modified_since = parse_http_date_safe(request.headers.get('If-Modified-Since', ''))
+    return if_modified_since is not None and last_modified <= if_modified_since
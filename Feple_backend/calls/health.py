@@ -0,0 +1,29 @@
+from health_check.backends import BaseHealthCheckBackend
+from health_check.exceptions import ServiceUnavailable, ServiceWarning
+
+from .checks import is_process_local_cache
+from .circuit import OPEN, HALF_OPEN, get_llm_circuit
+
+
+class OpenAICircuitHealthCheck(BaseHealthCheckBackend):
+    """OpenAI 서킷 브레이커 상태 (열려 있어도 기본 평가로 처리되므로 필수 서비스는 아님)"""
+    critical_service = False
+
+    def check_status(self):
+        circuit = get_llm_circuit()
+        if circuit is None:
+            return
+        # 웹 서버는 OpenAI를 호출하지 않으므로 공유 캐시가 아니면 워커의 회로 상태를 알 수 없음
+        if is_process_local_cache('default'):
+            raise ServiceWarning("circuit state is process-local, worker circuit state is not visible here")
+
+        status = circuit.get_status()
+        if status['state'] == OPEN:
+            raise ServiceUnavailable(
+                f"circuit open after {status['failures']} consecutive failures, using fallback evaluations"
+            )
+        if status['state'] == HALF_OPEN:
+            raise ServiceWarning("circuit half-open, probing OpenAI")
+
+    def identifier(self):
+        return 'OpenAICircuit'
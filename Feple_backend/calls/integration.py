@@ -1,112 +1,120 @@
 import os
-import sys
+import copy
 import json
-import subprocess
 import logging
-from pathlib import Path
 from django.conf import settings
 
+from .callanalysis_worker import STUB_RESULT
+from .circuit import CircuitOpenError
+
 logger = logging.getLogger('calls')
 
 
 def get_callanalysis_path():
     """callanalysis 프로젝트 경로 반환"""
-    # 상대 경로 사용 (백엔드와 callanalysis가 같은 디렉토리에 있다고 가정)
-    callanalysis_path = os.path.join(settings.BASE_DIR.parent, 'callanalysis')
-    return callanalysis_path
+    return str(settings.CALLANALYSIS_PATH)
+
 
+_callanalysis_cache = None
 
-def call_callanalysis_process(audio_file_path):
+
+def get_callanalysis_cache():
+    """callanalysis 결과 캐시 반환"""
+    global _callanalysis_cache
+    if _callanalysis_cache is None:
+        from .cache import FileResultCache
+        _callanalysis_cache = FileResultCache(
+            settings.CALLANALYSIS_CACHE_DIR,
+            max_bytes=settings.CALLANALYSIS_CACHE_MAX_BYTES
+        )
+    return _callanalysis_cache
+
+
+def get_callanalysis_cache_key(audio_file_path):
+    """오디오 내용 해시와 callanalysis 버전으로 캐시 키 생성"""
+    import hashlib
+    from .utils import file_sha256
+    
+    key_source = f"{file_sha256(audio_file_path)}:{settings.CALLANALYSIS_VERSION}"
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+
+def call_callanalysis_process(audio_file_path, use_cache=True, cache_stats=None):
     """
-    callanalysis의 main.py 스크립트를 호출하여 오디오 파일 처리
+    callanalysis를 호출하여 오디오 파일 처리 (내용 기반 결과 캐시 사용)
+    
+    같은 오디오(바이트 단위 동일)와 같은 callanalysis 버전에 대한 결과가 캐시에
+    있으면 전사를 건너뛰고 캐시된 결과를 반환합니다.
     
     Parameters
     ----------
     audio_file_path : str
         처리할 오디오 파일 경로
+    use_cache : bool
+        False이면 캐시를 조회하지 않고 다시 처리 (결과는 캐시에 저장)
+    cache_stats : dict, optional
+        실행 단위 캐시 적중/미스 횟수를 기록할 딕셔너리
         
     Returns
     -------
     dict or None
         처리 결과 데이터 (성공 시) 또는 None (실패 시)
     """
-    # 원래 코드를 주석 처리하고 테스트용 더미 데이터 반환
-    logger.info(f"[테스트 모드] 더미 데이터 반환 (실제 callanalysis 호출 없음): {audio_file_path}")
+    from .cache import record_cache_access
     
-    # 테스트용 더미 데이터
-    dummy_result = {
-        "transcript": "안녕하세요. 무엇을 도와드릴까요? 저는 기타 관련해서 문의가 있어요. 싼 기타와 비싼 기타의 차이점이 궁금합니다. 네, 비싼 기타는 소리 품질이 더 좋고 내구성이 뛰어납니다. 또한 목재의 품질과 제작 기술이 다릅니다. 그렇군요. 초보자에게는 어떤 기타가 좋을까요? 초보자에게는 중저가 기타를 추천해 드립니다. 연습용으로 충분하고 나중에 실력이 늘면 업그레이드할 수 있어요. 알겠습니다. 감사합니다. 다른 문의사항 있으신가요? 아니요, 충분히 도움이 되었습니다. 감사합니다. 감사합니다. 좋은 하루 되세요.",
-        "speaker_timestamps": {
-            "speakers": [
-                {"id": "AGENT", "utterances": [
-                    {"start": 0.0, "end": 4.5, "text": "안녕하세요. 무엇을 도와드릴까요?"},
-                    {"start": 13.2, "end": 29.8, "text": "네, 비싼 기타는 소리 품질이 더 좋고 내구성이 뛰어납니다. 또한 목재의 품질과 제작 기술이 다릅니다."},
-                    {"start": 38.0, "end": 55.3, "text": "초보자에게는 중저가 기타를 추천해 드립니다. 연습용으로 충분하고 나중에 실력이 늘면 업그레이드할 수 있어요."},
-                    {"start": 63.8, "end": 68.2, "text": "다른 문의사항 있으신가요?"},
-                    {"start": 75.0, "end": 78.5, "text": "감사합니다. 좋은 하루 되세요."}
-                ]},
-                {"id": "CUSTOMER", "utterances": [
-                    {"start": 5.0, "end": 12.7, "text": "저는 기타 관련해서 문의가 있어요. 싼 기타와 비싼 기타의 차이점이 궁금합니다."},
-                    {"start": 30.5, "end": 37.5, "text": "그렇군요. 초보자에게는 어떤 기타가 좋을까요?"},
-                    {"start": 56.0, "end": 62.3, "text": "알겠습니다. 감사합니다."},
-                    {"start": 69.0, "end": 74.5, "text": "아니요, 충분히 도움이 되었습니다. 감사합니다."}
-                ]}
-            ]
-        },
-        "audio_stats": {
-            "duration": 80.0,
-            "silence_rate": 0.15,
-            "agent_talk_ratio": 0.65,
-            "customer_talk_ratio": 0.35,
-            "interruption_count": 0
-        },
-        "sentiment": {
-            "agent": {"positive": 0.8, "neutral": 0.15, "negative": 0.05},
-            "customer": {"positive": 0.7, "neutral": 0.25, "negative": 0.05}
-        }
-    }
+    cache = None
+    cache_key = None
+    if settings.CALLANALYSIS_CACHE_ENABLED:
+        try:
+            cache = get_callanalysis_cache()
+            cache_key = get_callanalysis_cache_key(audio_file_path)
+            if use_cache:
+                cached_result = cache.get(cache_key)
+                if cached_result is not None:
+                    logger.info(f"callanalysis cache hit for {audio_file_path}")
+                    record_cache_access(cache_stats, 'callanalysis', hit=True)
+                    return cached_result
+        except Exception as e:
+            logger.warning(f"callanalysis cache unavailable: {str(e)}")
+            cache = None
     
-    return dummy_result
+    record_cache_access(cache_stats, 'callanalysis', hit=False)
+    result = run_callanalysis(audio_file_path)
     
-    # 기존 코드 (주석 처리)
+    if result and cache is not None:
+        try:
+            cache.set(cache_key, result)
+        except Exception as e:
+            logger.warning(f"Could not store callanalysis result in cache: {str(e)}")
+    
+    return result
+
+
+def run_callanalysis(audio_file_path):
     """
-    callanalysis_path = get_callanalysis_path()
-    logger.info(f"Calling callanalysis process with audio file: {audio_file_path}")
+    callanalysis로 오디오 파일 처리
     
-    try:
-        # subprocess로 callanalysis 호출
-        process = subprocess.Popen(
-            [sys.executable, 'main.py', audio_file_path],
-            cwd=callanalysis_path,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            universal_newlines=True
-        )
-        
-        stdout, stderr = process.communicate()
-        
-        if process.returncode != 0:
-            logger.error(f"Error running callanalysis: {stderr}")
-            return None
+    CALLANALYSIS_BACKEND가 'pool'이면 상주 워커 풀을 사용하고, 'dummy'(기본값)이면
+    테스트용 더미 데이터를 반환합니다.
+    
+    Parameters
+    ----------
+    audio_file_path : str
+        처리할 오디오 파일 경로
         
-        # 출력에서 JSON 결과 추출 (결과가 파일로 저장된 경우)
-        output_json_path = os.path.join(callanalysis_path, '.temp', 'output.json')
-        if os.path.exists(output_json_path):
-            with open(output_json_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-                
-        # 직접 출력에서 JSON 파싱 시도
-        try:
-            return json.loads(stdout)
-        except json.JSONDecodeError:
-            logger.error("Could not parse JSON from callanalysis output")
-            
-        return None
-            
-    except Exception as e:
-        logger.exception(f"Exception calling callanalysis: {str(e)}")
-        return None
+    Returns
+    -------
+    dict or None
+        처리 결과 데이터 (성공 시) 또는 None (실패 시)
     """
+    if settings.CALLANALYSIS_BACKEND == 'pool':
+        # 모델을 메모리에 유지하는 상주 워커 풀에 작업 전달
+        from .callanalysis_pool import get_callanalysis_pool
+        return get_callanalysis_pool().process(audio_file_path)
+    
+    # 테스트용 더미 데이터 반환 (실제 callanalysis 호출 없음)
+    logger.info(f"[테스트 모드] 더미 데이터 반환 (실제 callanalysis 호출 없음): {audio_file_path}")
+    return copy.deepcopy(STUB_RESULT)
 
 
 def extract_transcript_data(callanalysis_result):
@@ -149,92 +157,83 @@ def call_lightgbm_model(features):
     Returns
     -------
     tuple
-        (만족도 점수, 카테고리) - 실패 시 기본값 반환
+        (만족도 점수, 카테고리, 모델 버전) - 실패 시 기본값 반환
     """
     try:
-        # 실제 구현에서는 모델 로드 및 예측
-        import joblib
-        import numpy as np
-        
-        # 모델 경로
-        model_path = os.path.join(settings.BASE_DIR, 'calls', 'models', 'lightgbm_model.pkl')
-        
-        # 모델 파일이 있는지 확인
-        if not os.path.exists(model_path):
-            logger.error(f"Model file not found: {model_path}")
-            return 3.0, "보통"  # 기본값
-        
-        # 모델 로드
-        model = joblib.load(model_path)
+        from .scoring import build_feature_vector, categorize_satisfaction
         
         # 특성 변환
-        feature_array = np.array([
-            features.get('silence_rate', 0.0),
-            features.get('agent_talk_ratio', 0.5),
-            features.get('interruption_count', 0),
-            features.get('avg_response_time', 1.0),
-            # 필요한 다른 특성들...
-        ]).reshape(1, -1)
-        
-        # 예측
-        score = float(model.predict(feature_array)[0])
+        feature_vector = build_feature_vector(features)
+        
+        if settings.LIGHTGBM_BATCH_ENABLED:
+            # 동시에 요청된 다른 통화들과 묶어서 한 번에 예측
+            from .scoring import get_batch_scorer
+            score, model_version = get_batch_scorer().predict(
+                feature_vector,
+                timeout=settings.LIGHTGBM_BATCH_TIMEOUT
+            )
+        else:
+            import numpy as np
+            from .model_registry import lightgbm_registry
+            
+            # 프로세스 단위로 캐시된 모델 조회 (파일 변경 시 자동 재로드)
+            model, model_version = lightgbm_registry.get()
+            if model is None:
+                logger.error("LightGBM model is not available")
+                return 3.0, "보통", ""  # 기본값
+            
+            # 예측
+            score = float(model.predict(np.array(feature_vector).reshape(1, -1))[0])
         
         # 카테고리 매핑
-        if score < 2.0:
-            category = "낮음"
-        elif score < 4.0:
-            category = "보통"
-        else:
-            category = "높음"
+        category = categorize_satisfaction(score)
             
-        return score, category
+        return score, category, model_version
         
     except Exception as e:
         logger.exception(f"Error predicting satisfaction: {str(e)}")
-        return 3.0, "보통"  # 기본값
+        return 3.0, "보통", ""  # 기본값
+
 
+OPENAI_MODEL = settings.OPENAI_MODEL
 
-def call_openai_for_evaluation(transcript, speakers_data, agent_name):
+
+def build_evaluation_messages(speakers_data, agent_name, window=None):
     """
-    OpenAI API를 사용하여 통화 내용 평가
+    통화 평가 요청 메시지 생성
     
     Parameters
     ----------
-    transcript : str
-        전체 전사 텍스트
     speakers_data : dict
         화자 분리 데이터
     agent_name : str
         상담원 이름
+    window : tuple, optional
+        (구간 번호, 전체 구간 수) - 긴 통화를 여러 구간으로 나눠 평가하는 경우
     
     Returns
     -------
-    tuple
-        (평가 텍스트, 평가 점수, 주요 토픽, 감정 데이터, 요약)
+    list
+        chat.completions 메시지 목록
     """
-    try:
-        import openai
-        from openai import OpenAI
-        from .utils import format_conversation_for_llm
-        
-        # API 키 설정
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            logger.error("OPENAI_API_KEY environment variable not set")
-            return generate_fallback_evaluation(agent_name)
-            
-        # 대화 포맷팅
-        formatted_conversation = format_conversation_for_llm(speakers_data)
-        
-        # 클라이언트 초기화
-        client = OpenAI(api_key=api_key)
-        
-        # 평가 요청
-        evaluation_prompt = f"""
+    from .utils import format_conversation_for_llm
+    
+    # 대화 포맷팅
+    formatted_conversation = format_conversation_for_llm(speakers_data)
+    
+    window_note = ""
+    if window:
+        window_note = f"""
+        이 대화는 긴 통화를 나눈 {window[0]}/{window[1]}번째 구간이며 앞뒤 구간과 일부 겹칩니다.
+        이 구간의 내용만으로 평가해주세요.
+        """
+    
+    # 평가 요청
+    evaluation_prompt = f"""
         다음은 고객 상담 대화입니다:
         
         {formatted_conversation}
-        
+        {window_note}
         상담원 {agent_name}의 응대를 다음 기준으로 평가해주세요:
         1. 전반적인 평가와 점수 (1-5)
         2. 주요 대화 주제 (3개 이내)
@@ -250,34 +249,317 @@ def call_openai_for_evaluation(transcript, speakers_data, agent_name):
             "summary": "통화 요약"
         }}
         """
+    
+    return [
+        {"role": "system", "content": "고객 상담 평가 전문가로서 응답해주세요. JSON 형식을 정확히 따라주세요."},
+        {"role": "user", "content": evaluation_prompt}
+    ]
+
+
+def parse_evaluation_result(result_text):
+    """
+    평가 응답(JSON 문자열) 파싱
+    
+    Returns
+    -------
+    tuple
+        (평가 텍스트, 평가 점수, 주요 토픽, 감정 데이터, 요약) - 평가나 점수가 없어
+        기본값으로 채운 경우 FallbackEvaluation
+    """
+    result = json.loads(result_text)
+    
+    # 결과 추출
+    evaluation = result.get("evaluation", "평가 정보 없음")
+    score = result.get("score", 3.0)
+    topics = result.get("topics", [])
+    emotions = result.get("emotions", {})
+    summary = result.get("summary", "요약 정보 없음")
+    
+    parsed = (evaluation, score, topics, emotions, summary)
+    if "evaluation" not in result or "score" not in result:
+        return FallbackEvaluation(parsed)
+    return parsed
+
+
+def split_conversation_windows(speakers_data, budget, overlap):
+    """
+    대화를 토큰 예산 이내의 겹치는 구간으로 분할
+    
+    각 구간은 발화 단위로 나뉘며, 다음 구간은 이전 구간 끝의 약 ``overlap`` 토큰
+    분량의 발화부터 시작하여 구간 경계의 맥락이 끊기지 않도록 합니다.
+    
+    Parameters
+    ----------
+    speakers_data : dict
+        화자 분리 데이터
+    budget : int
+        구간당 최대 토큰 수
+    overlap : int
+        이웃한 구간이 겹치는 토큰 수
+    
+    Returns
+    -------
+    list
+        구간별 화자 분리 데이터 ({'utterances': [...]} 형식, 예산 이내이면 원본 하나만 포함)
+    """
+    from .tokens import count_tokens
+    from .utils import get_utterances
+    
+    utterances = get_utterances(speakers_data)
+    line_tokens = [
+        count_tokens(f"{utterance.get('speaker', 'unknown').capitalize()}: {utterance.get('text', '')}\n", OPENAI_MODEL)
+        for utterance in utterances
+    ]
+    if sum(line_tokens) <= budget:
+        return [speakers_data]
+    
+    windows = []
+    start = 0
+    while start < len(utterances):
+        end = start
+        tokens = 0
+        while end < len(utterances) and (end == start or tokens + line_tokens[end] <= budget):
+            tokens += line_tokens[end]
+            end += 1
+        windows.append({'utterances': utterances[start:end]})
+        if end >= len(utterances):
+            break
+        
+        # 다음 구간은 이번 구간 끝에서 overlap 토큰만큼 앞의 발화부터 시작 (항상 한 발화 이상 전진)
+        next_start = end
+        overlap_tokens = 0
+        while next_start - 1 > start and overlap_tokens + line_tokens[next_start - 1] <= overlap:
+            next_start -= 1
+            overlap_tokens += line_tokens[next_start]
+        start = next_start
+    
+    return windows
+
+
+def merge_window_evaluations(results, weights):
+    """
+    구간별 평가 결과를 하나로 병합
+    
+    점수는 구간 토큰 수로 가중 평균하고, 토픽은 여러 구간에서 자주 나온 순으로 3개,
+    감정은 화자별로 가장 많이 나온 값을 사용합니다. 평가와 요약은 구간 순서대로 잇습니다.
+    """
+    from collections import Counter
+    
+    scores = []
+    for (_, score, _, _, _), weight in zip(results, weights):
+        try:
+            scores.append((float(score), weight))
+        except (TypeError, ValueError):
+            continue
+    total_weight = sum(weight for _, weight in scores)
+    score = round(sum(value * weight for value, weight in scores) / total_weight, 2) if total_weight else 3.0
+    
+    topic_counts = Counter(topic for _, _, topics, _, _ in results for topic in (topics or []))
+    topics = [topic for topic, _ in topic_counts.most_common(3)]
+    
+    speaker_emotions = {}
+    for _, _, _, emotions, _ in results:
+        for speaker, emotion in (emotions or {}).items():
+            speaker_emotions.setdefault(speaker, Counter())[emotion] += 1
+    emotions = {speaker: counts.most_common(1)[0][0] for speaker, counts in speaker_emotions.items()}
+    
+    total = len(results)
+    evaluation = "\n\n".join(
+        f"[구간 {index}/{total}] {result[0]}" for index, result in enumerate(results, start=1)
+    )
+    summary = " ".join(result[4] for result in results if result[4])
+    
+    merged = (evaluation, score, topics, emotions, summary)
+    # 모든 구간이 기본값으로 대체된 경우에만 병합 결과도 기본 평가로 표시
+    if all(is_fallback_evaluation(result) for result in results):
+        return FallbackEvaluation(merged)
+    return merged
+
+
+async def aevaluate_conversation(windows, agent_name, use_cache=True, cache_stats=None, usage_stats=None,
+                                 model=OPENAI_MODEL):
+    """구간들을 동시에 평가하고 결과 병합 (구간이 하나이면 그 결과 그대로)"""
+    import asyncio
+    from .llm import acreate_chat_completion
+    from .tokens import count_tokens
+    from .utils import format_conversation_for_llm
+    
+    async def evaluate_window(index, window):
+        result_text = await acreate_chat_completion(
+            model=model,
+            messages=build_evaluation_messages(
+                window, agent_name, (index + 1, len(windows)) if len(windows) > 1 else None
+            ),
+            response_format={"type": "json_object"},
+            use_cache=use_cache,
+            cache_stats=cache_stats,
+            usage_stats=usage_stats
+        )
+        return parse_evaluation_result(result_text)
+    
+    results = await asyncio.gather(*[evaluate_window(index, window) for index, window in enumerate(windows)])
+    if len(results) == 1:
+        return results[0]
+    
+    weights = [count_tokens(format_conversation_for_llm(window), model) for window in windows]
+    return merge_window_evaluations(results, weights)
+
+
+def get_evaluation_windows(speakers_data):
+    """평가 토큰 예산(LLM_EVALUATION_TOKEN_BUDGET)에 맞춘 대화 구간 목록"""
+    windows = split_conversation_windows(
+        speakers_data,
+        settings.LLM_EVALUATION_TOKEN_BUDGET,
+        settings.LLM_EVALUATION_WINDOW_OVERLAP
+    )
+    if len(windows) > 1:
+        logger.info(f"Evaluating long conversation in {len(windows)} overlapping windows")
+    return windows
+
+
+def call_openai_for_evaluation(transcript, speakers_data, agent_name, use_cache=True, cache_stats=None,
+                               usage_stats=None, model=None, raise_transient_errors=False):
+    """
+    OpenAI API를 사용하여 통화 내용 평가
+    
+    대화가 LLM_EVALUATION_TOKEN_BUDGET 토큰을 넘으면 겹치는 구간으로 나눠 동시에
+    평가한 뒤 하나의 평가, 점수, 토픽, 감정으로 병합합니다.
+    
+    Parameters
+    ----------
+    transcript : str
+        전체 전사 텍스트
+    speakers_data : dict
+        화자 분리 데이터
+    agent_name : str
+        상담원 이름
+    use_cache : bool
+        False이면 LLM 응답 캐시를 사용하지 않음
+    cache_stats : dict, optional
+        실행 단위 캐시 적중/미스 횟수를 기록할 딕셔너리
+    usage_stats : dict, optional
+        입력/출력 토큰 수(input_tokens, output_tokens)를 누적할 딕셔너리
+    model : str, optional
+        평가 모델 (기본값: OPENAI_MODEL) - 보통 route_evaluation_model로 선택
+    raise_transient_errors : bool
+        True이면 재시도 후에도 남은 429/5xx/타임아웃 등 일시적인 오류를 기본 평가로
+        대체하지 않고 TransientStageError로 발생 (파이프라인 단계 재시도용)
+    
+    Returns
+    -------
+    tuple
+        (평가 텍스트, 평가 점수, 주요 토픽, 감정 데이터, 요약)
+    """
+    try:
+        import asyncio
+        from .llm import create_chat_completion
         
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "고객 상담 평가 전문가로서 응답해주세요. JSON 형식을 정확히 따라주세요."},
-                {"role": "user", "content": evaluation_prompt}
-            ],
-            response_format={"type": "json_object"}
+        # API 키 설정
+        if not os.getenv('OPENAI_API_KEY'):
+            logger.error("OPENAI_API_KEY environment variable not set")
+            return generate_fallback_evaluation(agent_name)
+        
+        # 긴 통화는 구간별로 동시에 평가
+        windows = get_evaluation_windows(speakers_data)
+        if len(windows) > 1:
+            return asyncio.run(
+                aevaluate_conversation(windows, agent_name, use_cache, cache_stats, usage_stats, model or OPENAI_MODEL)
+            )
+        
+        # 프로세스 공용 클라이언트로 요청 (속도 제한 및 재시도 포함)
+        result_text = create_chat_completion(
+            model=model or OPENAI_MODEL,
+            messages=build_evaluation_messages(speakers_data, agent_name),
+            response_format={"type": "json_object"},
+            use_cache=use_cache,
+            cache_stats=cache_stats,
+            usage_stats=usage_stats
         )
         
         # 응답 파싱
-        result_text = response.choices[0].message.content
-        result = json.loads(result_text)
+        return parse_evaluation_result(result_text)
         
-        # 결과 추출
-        evaluation = result.get("evaluation", "평가 정보 없음")
-        score = result.get("score", 3.0)
-        topics = result.get("topics", [])
-        emotions = result.get("emotions", {})
-        summary = result.get("summary", "요약 정보 없음")
+    except CircuitOpenError:
+        logger.warning("OpenAI circuit is open, using fallback evaluation")
+        return generate_fallback_evaluation(agent_name)
+    except Exception as e:
+        if raise_transient_errors:
+            from .pipeline import TransientStageError, is_transient_error
+            if is_transient_error(e):
+                raise TransientStageError(f"OpenAI request failed: {str(e)}") from e
+        logger.exception(f"Error calling OpenAI API: {str(e)}")
+        return generate_fallback_evaluation(agent_name)
+
+
+async def acall_openai_for_evaluation(transcript, speakers_data, agent_name, use_cache=True, cache_stats=None,
+                                      usage_stats=None, model=None):
+    """call_openai_for_evaluation의 asyncio 버전"""
+    try:
+        if not os.getenv('OPENAI_API_KEY'):
+            logger.error("OPENAI_API_KEY environment variable not set")
+            return generate_fallback_evaluation(agent_name)
         
-        return evaluation, score, topics, emotions, summary
+        return await aevaluate_conversation(
+            get_evaluation_windows(speakers_data), agent_name, use_cache, cache_stats, usage_stats,
+            model or OPENAI_MODEL
+        )
         
+    except CircuitOpenError:
+        logger.warning("OpenAI circuit is open, using fallback evaluation")
+        return generate_fallback_evaluation(agent_name)
     except Exception as e:
         logger.exception(f"Error calling OpenAI API: {str(e)}")
         return generate_fallback_evaluation(agent_name)
 
 
+def evaluate_calls_concurrently(requests, use_cache=True, usage_stats=None, models=None):
+    """
+    여러 통화를 동시에 평가
+    
+    LLM_MAX_CONCURRENCY개까지 요청을 동시에 진행하며, RPM/TPM 제한과 재시도는
+    공용 클라이언트 계층에서 처리됩니다.
+    
+    Parameters
+    ----------
+    requests : list
+        (전체 전사 텍스트, 화자 분리 데이터, 상담원 이름) 튜플 목록
+    usage_stats : list, optional
+        요청 순서대로 통화별 토큰 사용량 딕셔너리가 추가될 목록
+    models : list, optional
+        요청별 평가 모델 (없으면 모두 OPENAI_MODEL)
+    
+    Returns
+    -------
+    list
+        요청 순서와 같은 순서의 평가 결과 튜플 목록
+    """
+    import asyncio
+    
+    request_usage = [{} for _ in requests]
+    request_models = models or [None] * len(requests)
+    if usage_stats is not None:
+        usage_stats.extend(request_usage)
+    
+    async def evaluate_all():
+        return await asyncio.gather(*[
+            acall_openai_for_evaluation(
+                transcript, speakers_data, agent_name, use_cache=use_cache, usage_stats=usage, model=model
+            )
+            for (transcript, speakers_data, agent_name), usage, model in zip(requests, request_usage, request_models)
+        ])
+    
+    return asyncio.run(evaluate_all())
+
+
+class FallbackEvaluation(tuple):
+    """기본 평가 결과 (일반 평가 결과 튜플과 같이 풀어 쓸 수 있음)"""
+
+
+def is_fallback_evaluation(result):
+    """평가 결과가 LLM 대신 기본값으로 만들어졌는지 여부"""
+    return isinstance(result, FallbackEvaluation)
+
+
 def generate_fallback_evaluation(agent_name):
     """
     OpenAI API 호출 실패 시 기본 평가 결과 생성
@@ -289,19 +571,93 @@ def generate_fallback_evaluation(agent_name):
     
     Returns
     -------
-    tuple
+    FallbackEvaluation
         (평가 텍스트, 평가 점수, 주요 토픽, 감정 데이터, 요약)
     """
-    return (
+    return FallbackEvaluation((
         f"{agent_name} 상담원의 상담에 대한 평가를 생성할 수 없습니다.",
         3.0,
         ["기타"],
         {"agent": "중립", "customer": "중립"},
         "상담 내용 요약을 생성할 수 없습니다."
-    )
+    ))
+
+
+def build_partial_summary_messages(agent_name, date, summaries):
+    """통화 요약 묶음을 중간 요약하기 위한 메시지 생성"""
+    summaries_text = "\n".join([f"- {summary}" for summary in summaries])
+    return [
+        {"role": "system", "content": "당신은 고객 상담 코칭 전문가입니다."},
+        {"role": "user", "content": f"""
+        상담원 {agent_name}의 {date.strftime('%Y-%m-%d')} 통화 요약 {len(summaries)}건입니다:
+        
+        {summaries_text}
+        
+        코칭에 필요한 반복되는 상담 패턴, 강점, 개선이 필요한 점, 주요 고객 이슈를 빠짐없이
+        간결한 글머리표 목록으로 정리해주세요.
+        """}
+    ]
 
 
-def generate_daily_coaching(agent_name, date, call_summaries, avg_satisfaction):
+def reduce_call_summaries(agent_name, date, call_summaries, use_cache=True):
+    """
+    통화 요약이 토큰 예산(COACHING_SUMMARY_TOKEN_BUDGET)을 넘으면 계층적으로 요약
+    
+    요약을 예산 크기의 묶음으로 나눠 동시에 중간 요약(map)하고, 중간 요약들이 다시
+    예산을 넘으면 같은 과정을 반복합니다. 반환된 요약 목록은 최종 코칭 요청(reduce)에
+    그대로 사용됩니다. 묶음 요약에 실패하면 해당 묶음 원문을 잘라서 대신 사용합니다.
+    
+    Parameters
+    ----------
+    agent_name : str
+        상담원 이름
+    date : date
+        날짜
+    call_summaries : list
+        통화 요약 목록
+    use_cache : bool
+        False이면 LLM 응답 캐시를 사용하지 않음
+    
+    Returns
+    -------
+    list
+        토큰 예산 이내의 요약 목록
+    """
+    import asyncio
+    from .llm import acreate_chat_completion
+    from .tokens import count_tokens, truncate_to_tokens, chunk_by_token_budget
+    
+    budget = settings.COACHING_SUMMARY_TOKEN_BUDGET
+    summaries = list(call_summaries)
+    
+    async def summarize_chunk(chunk, max_tokens):
+        try:
+            return await acreate_chat_completion(
+                model=OPENAI_MODEL,
+                messages=build_partial_summary_messages(agent_name, date, chunk),
+                use_cache=use_cache
+            )
+        except Exception as e:
+            logger.warning(f"Partial coaching summary failed for {agent_name}: {str(e)}")
+            return truncate_to_tokens("\n".join(chunk), max_tokens, OPENAI_MODEL)
+    
+    async def summarize_all(chunks):
+        max_tokens = max(1, budget // len(chunks))
+        return await asyncio.gather(*[summarize_chunk(chunk, max_tokens) for chunk in chunks])
+    
+    for level in range(settings.COACHING_SUMMARY_MAX_LEVELS):
+        if sum(count_tokens(summary, OPENAI_MODEL) for summary in summaries) <= budget:
+            break
+        chunks = chunk_by_token_budget(summaries, budget, OPENAI_MODEL)
+        logger.info(
+            f"Summarizing {len(summaries)} summaries for {agent_name} in {len(chunks)} chunks (level {level + 1})"
+        )
+        summaries = asyncio.run(summarize_all(chunks))
+    
+    return summaries
+
+
+def generate_daily_coaching(agent_name, date, call_summaries, avg_satisfaction, use_cache=True):
     """
     상담원 일일 코칭 데이터 생성
     
@@ -315,6 +671,8 @@ def generate_daily_coaching(agent_name, date, call_summaries, avg_satisfaction):
         통화 요약 목록
     avg_satisfaction : float
         평균 만족도 점수
+    use_cache : bool
+        False이면 LLM 응답 캐시를 사용하지 않음
     
     Returns
     -------
@@ -322,20 +680,16 @@ def generate_daily_coaching(agent_name, date, call_summaries, avg_satisfaction):
         코칭 데이터
     """
     try:
-        import openai
-        from openai import OpenAI
+        from .llm import create_chat_completion
         
         # API 키 설정
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
+        if not os.getenv('OPENAI_API_KEY'):
             logger.error("OPENAI_API_KEY environment variable not set")
             return generate_fallback_coaching(agent_name, len(call_summaries), avg_satisfaction)
-            
-        # 클라이언트 초기화
-        client = OpenAI(api_key=api_key)
         
-        # 요약 정보 가공
-        summaries_text = "\n".join([f"- {summary}" for summary in call_summaries])
+        # 요약 정보 가공 (토큰 예산을 넘으면 묶음별 중간 요약으로 축소)
+        summaries = reduce_call_summaries(agent_name, date, call_summaries, use_cache=use_cache)
+        summaries_text = "\n".join([f"- {summary}" for summary in summaries])
         
         # 코칭 요청
         coaching_prompt = f"""
@@ -356,17 +710,17 @@ def generate_daily_coaching(agent_name, date, call_summaries, avg_satisfaction):
         }}
         """
         
-        response = client.chat.completions.create(
-            model="gpt-4",
+        result_text = create_chat_completion(
+            model=OPENAI_MODEL,
             messages=[
                 {"role": "system", "content": "당신은 고객 상담 코칭 전문가입니다. JSON 형식을 정확히 따라주세요."},
                 {"role": "user", "content": coaching_prompt}
             ],
-            response_format={"type": "json_object"}
+            response_format={"type": "json_object"},
+            use_cache=use_cache
         )
         
         # 응답 파싱
-        result_text = response.choices[0].message.content
         result = json.loads(result_text)
         
         # 결과 추출 및 반환
@@ -0,0 +1,361 @@
+import os
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import threading
+import weakref
+from django.conf import settings
+
+from .cache import FileResultCache, record_cache_access
+from .circuit import CLOSED, CircuitOpenError, get_llm_circuit
+from .tokens import count_tokens, record_token_usage
+
+logger = logging.getLogger('calls')
+
+_response_cache = None
+
+_client = None
+_client_pid = None
+_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+_async_semaphores = weakref.WeakKeyDictionary()
+
+_rate_limiter = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_llm_response_cache():
+    """LLM 응답 캐시 반환"""
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = FileResultCache(
+            settings.LLM_CACHE_DIR,
+            max_bytes=settings.LLM_CACHE_MAX_BYTES,
+            ttl=settings.LLM_CACHE_TTL
+        )
+    return _response_cache
+
+
+def get_chat_cache_key(model, messages, response_format=None):
+    """모델 + 메시지 + 응답 형식으로 캐시 키 생성"""
+    key_source = json.dumps(
+        {'model': model, 'messages': messages, 'response_format': response_format},
+        ensure_ascii=False,
+        sort_keys=True
+    )
+    return hashlib.sha256(key_source.encode('utf-8')).hexdigest()
+
+
+def get_openai_client():
+    """
+    프로세스 공용 OpenAI 클라이언트 반환
+
+    HTTP 연결 풀을 재사용하기 위해 프로세스당 하나만 생성합니다. fork 이후에는
+    부모의 연결을 공유하지 않도록 새로 생성합니다. 재시도는 이 모듈에서 직접
+    처리하므로 SDK 자체 재시도는 끕니다.
+    """
+    global _client, _client_pid
+    if _client is None or _client_pid != os.getpid():
+        with _client_lock:
+            if _client is None or _client_pid != os.getpid():
+                from openai import OpenAI
+                _client = OpenAI(
+                    api_key=os.getenv('OPENAI_API_KEY'),
+                    timeout=settings.OPENAI_TIMEOUT,
+                    max_retries=0
+                )
+                _client_pid = os.getpid()
+    return _client
+
+
+def get_async_openai_client():
+    """현재 이벤트 루프용 공용 AsyncOpenAI 클라이언트 반환"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        from openai import AsyncOpenAI
+        client = AsyncOpenAI(
+            api_key=os.getenv('OPENAI_API_KEY'),
+            timeout=settings.OPENAI_TIMEOUT,
+            max_retries=0
+        )
+        _async_clients[loop] = client
+    return client
+
+
+def _get_async_semaphore():
+    """현재 이벤트 루프의 동시 요청 수 제한 세마포어"""
+    loop = asyncio.get_running_loop()
+    semaphore = _async_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        _async_semaphores[loop] = semaphore
+    return semaphore
+
+
+class TokenBucket:
+    """
+    토큰 버킷
+
+    초당 ``rate`` 만큼 채워지고 최대 ``capacity`` 까지 쌓입니다. ``reserve`` 는 토큰을
+    즉시 차감(음수 허용)하고 사용 가능해질 때까지 기다려야 할 시간을 반환하므로,
+    동기/비동기 호출자가 각자의 방식으로 대기할 수 있습니다.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount=1):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # 버킷 크기보다 큰 요청도 언젠가는 통과하도록 capacity로 제한
+            self._tokens -= min(amount, self.capacity)
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+
+class RateLimiter:
+    """분당 요청 수(RPM)와 분당 토큰 수(TPM)를 함께 제한"""
+
+    def __init__(self, requests_per_minute, tokens_per_minute):
+        self.requests = TokenBucket(requests_per_minute / 60.0, requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute) if tokens_per_minute else None
+
+    def _reserve(self, tokens):
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        return wait
+
+    def acquire(self, tokens):
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens):
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+def get_rate_limiter():
+    """프로세스 공용 요청 속도 제한기 반환"""
+    global _rate_limiter
+    if _rate_limiter is None:
+        with _rate_limiter_lock:
+            if _rate_limiter is None:
+                _rate_limiter = RateLimiter(
+                    settings.LLM_REQUESTS_PER_MINUTE,
+                    settings.LLM_TOKENS_PER_MINUTE
+                )
+    return _rate_limiter
+
+
+def estimate_request_tokens(messages):
+    """요청 토큰 수 추정 (속도 제한용, 입력 + 최대 출력 예상치)"""
+    return sum(count_tokens(message.get('content') or '') for message in messages) + settings.LLM_EXPECTED_OUTPUT_TOKENS
+
+
+def is_retryable_error(error):
+    """429/5xx, 연결 오류, 타임아웃 여부"""
+    import openai
+
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError,
+                          openai.APITimeoutError, openai.InternalServerError)):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code == 429 or error.status_code >= 500
+    return False
+
+
+def get_retry_delay(error, attempt):
+    """지터가 적용된 지수 백오프 대기 시간 (Retry-After 헤더가 있으면 우선)"""
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    if retry_after:
+        try:
+            return min(float(retry_after), settings.LLM_RETRY_MAX_DELAY)
+        except ValueError:
+            pass
+    delay = min(settings.LLM_RETRY_MAX_DELAY, settings.LLM_RETRY_BASE_DELAY * (2 ** attempt))
+    return random.uniform(delay / 2, delay)
+
+
+def _check_circuit(circuit):
+    """회로가 열려 있으면 요청 없이 바로 CircuitOpenError 발생"""
+    if circuit is not None and not circuit.allow_request():
+        raise CircuitOpenError("OpenAI circuit is open")
+
+
+def _should_retry(circuit, error, attempt):
+    """
+    재시도 여부 (재시도 가능한 오류이고 횟수가 남아 있으며 회로가 닫혀 있는 경우)
+
+    회로가 열렸거나 반열림 상태의 시험 요청이면 재시도하지 않고 바로 실패로 기록합니다.
+    """
+    if attempt >= settings.LLM_MAX_RETRIES or not is_retryable_error(error):
+        return False
+    return circuit is None or circuit.state == CLOSED
+
+
+def _record_outcome(circuit, error=None):
+    """
+    요청 결과를 서킷 브레이커에 기록
+
+    429/5xx/연결 오류/타임아웃만 실패로 보고, 그 밖의 오류(400 등)는 공급자가 응답한
+    것이므로 성공으로 기록합니다.
+    """
+    if circuit is None:
+        return
+    if error is not None and is_retryable_error(error):
+        circuit.record_failure()
+    else:
+        circuit.record_success()
+
+
+def _build_request(model, messages, response_format):
+    request_kwargs = {'model': model, 'messages': messages}
+    if response_format:
+        request_kwargs['response_format'] = response_format
+    return request_kwargs
+
+
+def _lookup_cache(model, messages, response_format, use_cache, cache_stats):
+    cache = get_llm_response_cache() if settings.LLM_CACHE_ENABLED else None
+    cache_key = get_chat_cache_key(model, messages, response_format)
+
+    if cache is not None and use_cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            record_cache_access(cache_stats, 'llm', hit=True)
+            return cache, cache_key, cached['content']
+
+    record_cache_access(cache_stats, 'llm', hit=False)
+    return cache, cache_key, None
+
+
+def _store_cache(cache, cache_key, content):
+    if cache is None:
+        return
+    try:
+        cache.set(cache_key, {'content': content})
+    except Exception as e:
+        logger.warning(f"Could not store LLM response in cache: {str(e)}")
+
+
+def create_chat_completion(model, messages, response_format=None, use_cache=True, cache_stats=None,
+                           client=None, usage_stats=None):
+    """
+    chat.completions 요청 후 응답 본문 반환
+
+    프롬프트 단위 캐시를 먼저 조회하고, 캐시에 없으면 공용 클라이언트로 요청합니다.
+    요청 전에 RPM/TPM 속도 제한을 통과해야 하며, 429/5xx/연결 오류는 지터가 적용된
+    지수 백오프로 LLM_MAX_RETRIES회까지 재시도합니다. 서킷 브레이커가 열려 있으면
+    요청하지 않고 바로 CircuitOpenError를 발생시킵니다.
+
+    Parameters
+    ----------
+    model : str
+        모델 이름
+    messages : list
+        대화 메시지 목록
+    response_format : dict, optional
+        응답 형식 (예: {"type": "json_object"})
+    use_cache : bool
+        False이면 캐시를 조회하지 않고 API를 호출 (응답은 캐시에 저장)
+    cache_stats : dict, optional
+        실행 단위 캐시 적중/미스 횟수를 기록할 딕셔너리
+    client : OpenAI, optional
+        사용할 클라이언트 (기본값: 프로세스 공용 클라이언트)
+    usage_stats : dict, optional
+        실제 API 요청에 사용된 입력/출력 토큰 수를 누적할 딕셔너리 (캐시 적중 시 기록 없음)
+
+    Returns
+    -------
+    str
+        응답 메시지 본문
+    """
+    cache, cache_key, content = _lookup_cache(model, messages, response_format, use_cache, cache_stats)
+    if content is not None:
+        return content
+
+    client = client or get_openai_client()
+    limiter = get_rate_limiter()
+    request_tokens = estimate_request_tokens(messages)
+    circuit = get_llm_circuit()
+
+    # 서킷 브레이커에는 재시도를 포함한 논리 요청 하나당 결과를 한 번만 기록
+    _check_circuit(circuit)
+    attempt = 0
+    while True:
+        limiter.acquire(request_tokens)
+        try:
+            response = client.chat.completions.create(**_build_request(model, messages, response_format))
+            _record_outcome(circuit)
+            break
+        except Exception as e:
+            if not _should_retry(circuit, e, attempt):
+                _record_outcome(circuit, e)
+                raise
+            delay = get_retry_delay(e, attempt)
+            logger.warning(f"LLM request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            attempt += 1
+
+    record_token_usage(usage_stats, getattr(response, 'usage', None))
+    content = response.choices[0].message.content
+    _store_cache(cache, cache_key, content)
+    return content
+
+
+async def acreate_chat_completion(model, messages, response_format=None, use_cache=True, cache_stats=None,
+                                  usage_stats=None):
+    """
+    create_chat_completion의 asyncio 버전
+
+    이벤트 루프당 LLM_MAX_CONCURRENCY개까지만 동시에 요청하므로, 많은 평가를
+    한꺼번에 gather해도 공급자 한도를 넘지 않습니다.
+    """
+    cache, cache_key, content = _lookup_cache(model, messages, response_format, use_cache, cache_stats)
+    if content is not None:
+        return content
+
+    client = get_async_openai_client()
+    limiter = get_rate_limiter()
+    request_tokens = estimate_request_tokens(messages)
+    circuit = get_llm_circuit()
+
+    async with _get_async_semaphore():
+        _check_circuit(circuit)
+        attempt = 0
+        while True:
+            await limiter.acquire_async(request_tokens)
+            try:
+                response = await client.chat.completions.create(**_build_request(model, messages, response_format))
+                _record_outcome(circuit)
+                break
+            except Exception as e:
+                if not _should_retry(circuit, e, attempt):
+                    _record_outcome(circuit, e)
+                    raise
+                delay = get_retry_delay(e, attempt)
+                logger.warning(f"LLM request failed ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                attempt += 1
+
+    record_token_usage(usage_stats, getattr(response, 'usage', None))
+    content = response.choices[0].message.content
+    _store_cache(cache, cache_key, content)
+    return content
@@ -0,0 +1,25 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+
+from calls.rollup import rebuild_daily_stats
+
+
+class Command(BaseCommand):
+    help = '기간 내 상담원 일별 통계(AgentDailyStats)를 원본 통화에서 다시 집계'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', required=True, help='시작일 (YYYY-MM-DD)')
+        parser.add_argument('--end-date', help='종료일 (YYYY-MM-DD, 포함, 기본값: 시작일)')
+        parser.add_argument('--agent-id', type=int, help='특정 상담원만 다시 집계')
+
+    def handle(self, *args, **options):
+        try:
+            start_date = date.fromisoformat(options['start_date'])
+            end_date = date.fromisoformat(options['end_date']) if options['end_date'] else start_date
+        except ValueError as e:
+            raise CommandError(f'잘못된 날짜 형식입니다: {e}')
+        if start_date > end_date:
+            raise CommandError('시작일이 종료일보다 늦습니다.')
+
+        count = rebuild_daily_stats(start_date, end_date, options['agent_id'])
+        self.stdout.write(f"rows={count} start_date={start_date} end_date={end_date}")
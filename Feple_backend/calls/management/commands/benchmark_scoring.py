@@ -0,0 +1,99 @@
+import time
+import random
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+
+from calls.model_registry import ModelRegistry, lightgbm_registry
+from calls.scoring import BatchScorer, build_feature_vector
+
+
+class StaticRegistry:
+    """벤치마크용 고정 모델 레지스트리"""
+
+    def __init__(self, model):
+        self._loaded = (model, 'synthetic')
+
+    def get(self):
+        return self._loaded
+
+
+class Command(BaseCommand):
+    help = '통화별 단건 예측과 마이크로 배치 예측의 처리량(calls/sec) 비교'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=5000, help='예측할 통화 수')
+        parser.add_argument('--concurrency', type=int, default=32, help='동시에 예측을 요청하는 스레드 수')
+        parser.add_argument('--batch-size', type=int, default=64, help='최대 배치 크기')
+        parser.add_argument('--wait-ms', type=int, default=5, help='배치 수집 최대 대기 시간(ms)')
+        parser.add_argument('--model', help='모델 파일 경로 (기본값: LIGHTGBM_MODEL_PATH)')
+        parser.add_argument('--synthetic', action='store_true', help='임의 데이터로 학습한 LightGBM 모델 사용')
+
+    def handle(self, *args, **options):
+        import numpy as np
+
+        registry = self._get_registry(options)
+        model, _ = registry.get()
+        if model is None:
+            raise CommandError('모델을 로드할 수 없습니다. --model 또는 --synthetic 옵션을 사용하세요.')
+
+        rng = random.Random(42)
+        vectors = [
+            build_feature_vector({
+                'silence_rate': rng.random(),
+                'agent_talk_ratio': rng.random(),
+                'interruption_count': rng.randint(0, 10),
+                'avg_response_time': rng.random() * 5,
+            })
+            for _ in range(options['calls'])
+        ]
+
+        def predict_single(vector):
+            return float(model.predict(np.array(vector).reshape(1, -1))[0])
+
+        scorer = BatchScorer(
+            registry,
+            max_batch_size=options['batch_size'],
+            max_wait_ms=options['wait_ms']
+        )
+
+        def predict_batched(vector):
+            return scorer.predict(vector)[0]
+
+        # 워밍업
+        predict_single(vectors[0])
+        predict_batched(vectors[0])
+
+        single_rate, single_results = self._run(predict_single, vectors, options['concurrency'])
+        batched_rate, batched_results = self._run(predict_batched, vectors, options['concurrency'])
+
+        max_diff = max(abs(a - b) for a, b in zip(single_results, batched_results))
+
+        self.stdout.write(f"calls={options['calls']} concurrency={options['concurrency']} "
+                          f"batch_size={options['batch_size']} wait_ms={options['wait_ms']}")
+        self.stdout.write(f"per-call : {single_rate:10.1f} calls/sec")
+        self.stdout.write(f"batched  : {batched_rate:10.1f} calls/sec")
+        self.stdout.write(f"speedup  : {batched_rate / single_rate:10.2f}x")
+        self.stdout.write(f"max |diff|: {max_diff:.3g}")
+
+    def _get_registry(self, options):
+        if options['synthetic']:
+            import numpy as np
+            import lightgbm
+
+            rng = np.random.default_rng(42)
+            X = rng.random((2000, 4))
+            y = 1.0 + 4.0 * X.mean(axis=1)
+            model = lightgbm.LGBMRegressor(n_estimators=100, verbose=-1).fit(X, y)
+            return StaticRegistry(model)
+
+        if options['model']:
+            return ModelRegistry(lambda: options['model'])
+
+        return lightgbm_registry
+
+    def _run(self, predict, vectors, concurrency):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(predict, vectors))
+        elapsed = time.perf_counter() - started
+        return len(vectors) / elapsed, results
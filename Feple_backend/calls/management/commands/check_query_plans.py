@@ -0,0 +1,111 @@
+import re
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Sum
+
+from calls.models import CallRawData, CallAnalysis, ProcessingTask, AgentDailyStats
+from calls.utils import get_local_day_range
+
+
+def get_hot_queries():
+    """views.py / tasks.py / pipeline.py에서 자주 실행되는 조회 (이름, 검사 대상 테이블, 쿼리셋)"""
+    day_start, day_end = get_local_day_range(date.today())
+    calls_table = CallRawData._meta.db_table
+    tasks_table = ProcessingTask._meta.db_table
+    analyses_table = CallAnalysis._meta.db_table
+    daily_stats_table = AgentDailyStats._meta.db_table
+    today = date.today()
+
+    return [
+        ('call_list', calls_table,
+         CallRawData.objects.order_by('-call_date', '-id')[:11]),
+        ('agent_calls', calls_table,
+         CallRawData.objects.filter(agent_id=1, call_date__gte=day_start, call_date__lt=day_end)
+         .order_by('-call_date', '-id')[:11]),
+        ('agent_calls_by_status', calls_table,
+         CallRawData.objects.filter(agent_id=1, status='completed').order_by('-call_date', '-id')[:11]),
+        ('agent_stats', daily_stats_table,
+         AgentDailyStats.objects.filter(agent_id=1, date__gte=today, date__lte=today).values('call_count')),
+        ('group_stats', daily_stats_table,
+         AgentDailyStats.objects.filter(agent_id__in=[1, 2], date__gte=today, date__lte=today)
+         .order_by().values('agent_id').annotate(call_count=Sum('call_count'))),
+        ('rollup_rebuild', calls_table,
+         CallRawData.objects.filter(agent_id=1, call_date__gte=day_start, call_date__lt=day_end)
+         .order_by('id').values('id', 'agent_id', 'call_date', 'status', 'duration')),
+        ('dead_letter', calls_table,
+         CallRawData.objects.filter(status='dead_letter').order_by('-call_date', '-id')[:11]),
+        ('daily_coaching', calls_table,
+         CallRawData.objects.filter(agent_id=1, status='completed', call_date__gte=day_start, call_date__lt=day_end)
+         .values('id')),
+        ('daily_coaching_stats', daily_stats_table,
+         AgentDailyStats.objects.filter(agent_id=1, date=today)[:1]),
+        ('daily_coaching_agents', daily_stats_table,
+         AgentDailyStats.objects.filter(date=today, completed_count__gt=0).values_list('agent_id', flat=True)),
+        ('overview_totals', daily_stats_table,
+         AgentDailyStats.objects.filter(date__gte=today, date__lte=today).values('call_count')),
+        ('stage_task', tasks_table,
+         ProcessingTask.objects.filter(call_id=1, task_type='analysis', status__in=('pending', 'processing'))[:1]),
+        ('stage_checkpoint', tasks_table,
+         ProcessingTask.objects.filter(call_id=1, stage='satisfaction', status='completed', result__isnull=False)
+         .order_by('-updated_at').values_list('result', flat=True)[:1]),
+        ('reprocess_check', tasks_table,
+         ProcessingTask.objects.filter(call_id=1, status__in=('pending', 'processing'))),
+        ('checkpoint_invalidate', tasks_table,
+         ProcessingTask.objects.filter(call_id=1, stage__in=('satisfaction', 'llm_evaluation'), status='completed',
+                                       result__isnull=False)),
+        ('call_tasks', tasks_table,
+         ProcessingTask.objects.filter(call_id=1)),
+        ('in_flight', tasks_table,
+         ProcessingTask.objects.filter(call__isnull=False, status__in=('pending', 'processing')).order_by()),
+        ('coaching_tasks', tasks_table,
+         ProcessingTask.objects.filter(agent_id=1, task_type='coaching', status='processing')),
+        ('queue_wait', tasks_table,
+         ProcessingTask.objects.filter(created_at__gte=day_start, queue_wait__isnull=False)
+         .values('priority', 'task_type')),
+        ('fallback_analyses', analyses_table,
+         CallAnalysis.objects.filter(llm_fallback=True).order_by('call_id').values_list('call_id', flat=True)),
+    ]
+
+
+def find_sequential_scans(plan, table):
+    """실행 계획에서 table 전체 순차 스캔을 찾아 해당 줄 목록 반환"""
+    if connection.vendor == 'postgresql':
+        pattern = re.compile(rf'Seq Scan on "?{table}"?\b')
+        return [line.strip() for line in plan.splitlines() if pattern.search(line)]
+    if connection.vendor == 'sqlite':
+        # 인덱스 없이 테이블을 읽는 경우만 'SCAN table' (인덱스 순서 스캔은 'USING ... INDEX')
+        pattern = re.compile(rf'\bSCAN {table}\b(?!.*USING)')
+        return [line.strip() for line in plan.splitlines() if pattern.search(line)]
+    raise CommandError(f'지원하지 않는 데이터베이스입니다: {connection.vendor}')
+
+
+class Command(BaseCommand):
+    help = '주요 조회의 실행 계획을 확인하여 순차 스캔으로 떨어지는 쿼리가 있으면 실패'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help='모든 실행 계획 출력')
+
+    def handle(self, *args, **options):
+        failures = []
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # 빈 테이블에서도 인덱스 사용 가능 여부를 확인하도록 순차 스캔 비용을 최대로 설정
+                cursor.execute('SET enable_seqscan = off')
+            try:
+                for name, table, queryset in get_hot_queries():
+                    plan = queryset.explain()
+                    if options['verbose_plans']:
+                        self.stdout.write(f'-- {name}\n{plan}\n')
+                    scans = find_sequential_scans(plan, table)
+                    if scans:
+                        failures.append(name)
+                        self.stdout.write(self.style.ERROR(f'{name}: sequential scan ({"; ".join(scans)})'))
+                    else:
+                        self.stdout.write(f'{name}: ok')
+            finally:
+                if connection.vendor == 'postgresql':
+                    cursor.execute('RESET enable_seqscan')
+
+        if failures:
+            raise CommandError(f'순차 스캔을 사용하는 쿼리: {", ".join(failures)}')
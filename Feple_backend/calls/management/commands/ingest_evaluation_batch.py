@@ -0,0 +1,30 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+
+from calls.batch import ingest_evaluation_batch, TERMINAL_STATUSES
+
+
+class Command(BaseCommand):
+    help = '완료된 LLM 평가 배치 결과를 CallAnalysis에 일괄 반영'
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_id', help='submit_evaluation_batch가 출력한 job_id')
+        parser.add_argument('--wait', action='store_true', help='배치가 끝날 때까지 대기')
+        parser.add_argument('--poll-interval', type=int, default=60, help='대기 시 상태 확인 간격(초)')
+
+    def handle(self, *args, **options):
+        try:
+            manifest = ingest_evaluation_batch(options['job_id'])
+            while options['wait'] and manifest['status'] not in TERMINAL_STATUSES:
+                self.stdout.write(f"status={manifest['status']}, waiting...")
+                time.sleep(options['poll_interval'])
+                manifest = ingest_evaluation_batch(options['job_id'])
+        except FileNotFoundError:
+            raise CommandError(f"배치 작업을 찾을 수 없습니다: {options['job_id']}")
+
+        self.stdout.write(
+            f"job_id={manifest['job_id']} status={manifest['status']} "
+            f"ingested={manifest.get('ingested_count', 0)} failed={manifest.get('failed_count', 0)}"
+        )
+        if manifest.get('failed_call_ids'):
+            self.stdout.write(f"failed call_ids={','.join(map(str, manifest['failed_call_ids']))}")
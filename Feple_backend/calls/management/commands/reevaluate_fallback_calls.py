@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from calls.tasks import reevaluate_fallback_calls
+
+
+class Command(BaseCommand):
+    help = '기본 평가로 대체된 통화들의 LLM 재평가를 묶음 단위로 예약'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, help='재평가할 최대 통화 수')
+        parser.add_argument('--chunk-size', type=int, help='작업당 통화 수 (기본값: LLM_FALLBACK_REEVALUATION_CHUNK_SIZE)')
+
+    def handle(self, *args, **options):
+        result = reevaluate_fallback_calls(limit=options['limit'], chunk_size=options['chunk_size'])
+        self.stdout.write(f"status={result['status']} calls={result['call_count']}")
@@ -0,0 +1,28 @@
+from datetime import date
+from django.core.management.base import BaseCommand, CommandError
+
+from calls.batch import submit_evaluation_batch
+
+
+class Command(BaseCommand):
+    help = '기간 내 통화의 LLM 평가 요청을 배치 작업(JSONL)으로 제출'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--start-date', required=True, help='시작일 (YYYY-MM-DD)')
+        parser.add_argument('--end-date', required=True, help='종료일 (YYYY-MM-DD, 포함)')
+        parser.add_argument('--provider', choices=['openai', 'local'], help='배치 공급자 (기본값: LLM_BATCH_PROVIDER)')
+
+    def handle(self, *args, **options):
+        try:
+            start_date = date.fromisoformat(options['start_date'])
+            end_date = date.fromisoformat(options['end_date'])
+        except ValueError as e:
+            raise CommandError(f'잘못된 날짜 형식입니다: {e}')
+        if start_date > end_date:
+            raise CommandError('시작일이 종료일보다 늦습니다.')
+
+        manifest = submit_evaluation_batch(start_date, end_date, options['provider'])
+        self.stdout.write(
+            f"job_id={manifest['job_id']} batch_id={manifest['batch_id']} "
+            f"requests={manifest['request_count']} status={manifest['status']}"
+        )
@@ -0,0 +1,128 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Agent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('employee_id', models.CharField(max_length=20, unique=True, verbose_name='직원 ID')),
+                ('department', models.CharField(blank=True, max_length=50, verbose_name='부서')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='agent', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': '상담원',
+                'verbose_name_plural': '상담원들',
+            },
+        ),
+        migrations.CreateModel(
+            name='CallRawData',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('audio_file', models.FileField(upload_to='audio/', verbose_name='오디오 파일')),
+                ('call_date', models.DateTimeField(verbose_name='통화 일시')),
+                ('duration', models.IntegerField(blank=True, null=True, verbose_name='통화 시간(초)')),
+                ('caller_number', models.CharField(blank=True, max_length=20, verbose_name='발신자 번호')),
+                ('status', models.CharField(choices=[('pending', '처리 대기'), ('processing', '처리 중'), ('completed', '처리 완료'), ('failed', '처리 실패')], default='pending', max_length=20, verbose_name='처리 상태')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+                ('agent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='calls', to='calls.agent')),
+            ],
+            options={
+                'verbose_name': '원본 통화 데이터',
+                'verbose_name_plural': '원본 통화 데이터들',
+                'ordering': ['-call_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='CallAnalysis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('satisfaction_score', models.FloatField(blank=True, null=True, verbose_name='만족도 점수')),
+                ('satisfaction_category', models.CharField(blank=True, max_length=20, verbose_name='만족도 카테고리')),
+                ('llm_evaluation', models.TextField(blank=True, verbose_name='LLM 평가 내용')),
+                ('llm_score', models.FloatField(blank=True, null=True, verbose_name='LLM 평가 점수')),
+                ('key_topics', models.JSONField(blank=True, null=True, verbose_name='주요 토픽')),
+                ('emotions', models.JSONField(blank=True, null=True, verbose_name='감정 분석')),
+                ('summary', models.TextField(blank=True, verbose_name='요약')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+                ('call', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analysis', to='calls.callrawdata')),
+            ],
+            options={
+                'verbose_name': '통화 분석 결과',
+                'verbose_name_plural': '통화 분석 결과들',
+            },
+        ),
+        migrations.CreateModel(
+            name='CallTranscript',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('full_transcript', models.TextField(verbose_name='전체 전사 내용')),
+                ('speakers_json', models.JSONField(default=dict, verbose_name='화자 분리 데이터')),
+                ('silence_rate', models.FloatField(blank=True, null=True, verbose_name='침묵률(%)')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+                ('call', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='transcript', to='calls.callrawdata')),
+            ],
+            options={
+                'verbose_name': '통화 전사 데이터',
+                'verbose_name_plural': '통화 전사 데이터들',
+            },
+        ),
+        migrations.CreateModel(
+            name='ProcessingTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_type', models.CharField(choices=[('transcription', '음성 전사'), ('analysis', '통화 분석'), ('llm_evaluation', 'LLM 평가'), ('coaching', '코칭 생성')], max_length=20, verbose_name='작업 유형')),
+                ('status', models.CharField(choices=[('pending', '대기 중'), ('processing', '처리 중'), ('completed', '완료'), ('failed', '실패')], default='pending', max_length=20, verbose_name='상태')),
+                ('task_id', models.CharField(blank=True, max_length=50, verbose_name='Celery 작업 ID')),
+                ('error_message', models.TextField(blank=True, verbose_name='오류 메시지')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+                ('agent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='calls.agent')),
+                ('call', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='tasks', to='calls.callrawdata')),
+            ],
+            options={
+                'verbose_name': '처리 작업',
+                'verbose_name_plural': '처리 작업들',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='AgentCoaching',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='날짜')),
+                ('daily_summary', models.TextField(verbose_name='하루 요약')),
+                ('coaching_points', models.TextField(verbose_name='코칭 포인트')),
+                ('strengths', models.TextField(blank=True, verbose_name='강점')),
+                ('areas_to_improve', models.TextField(blank=True, verbose_name='개선 영역')),
+                ('call_count', models.IntegerField(default=0, verbose_name='통화 수')),
+                ('avg_satisfaction', models.FloatField(blank=True, null=True, verbose_name='평균 만족도')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='생성일')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+                ('agent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='coaching', to='calls.agent')),
+            ],
+            options={
+                'verbose_name': '상담원 코칭',
+                'verbose_name_plural': '상담원 코칭들',
+                'ordering': ['-date'],
+                'unique_together': {('agent', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='processingtask',
+            name='task_type',
+            field=models.CharField(choices=[('transcription', '음성 전사'), ('feature_extraction', '오디오 특성 추출'), ('analysis', '통화 분석'), ('llm_evaluation', 'LLM 평가'), ('finalize', '처리 마무리'), ('coaching', '코칭 생성')], max_length=20, verbose_name='작업 유형'),
+        ),
+    ]
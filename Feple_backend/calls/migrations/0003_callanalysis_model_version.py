@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0002_processingtask_task_types'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callanalysis',
+            name='model_version',
+            field=models.CharField(blank=True, max_length=64, verbose_name='예측 모델 버전'),
+        ),
+    ]
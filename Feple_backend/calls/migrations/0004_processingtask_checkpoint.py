@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0003_callanalysis_model_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='processingtask',
+            name='result',
+            field=models.JSONField(blank=True, null=True, verbose_name='단계 결과 (체크포인트)'),
+        ),
+        migrations.AddField(
+            model_name='processingtask',
+            name='stage',
+            field=models.CharField(blank=True, max_length=50, verbose_name='파이프라인 단계'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0004_processingtask_checkpoint'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='callrawdata',
+            name='status',
+            field=models.CharField(choices=[('pending', '처리 대기'), ('processing', '처리 중'), ('completed', '처리 완료'), ('failed', '처리 실패'), ('dead_letter', '재시도 소진')], default='pending', max_length=20, verbose_name='처리 상태'),
+        ),
+    ]
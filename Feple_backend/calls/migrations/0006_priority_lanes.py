@@ -0,0 +1,28 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0005_callrawdata_dead_letter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callrawdata',
+            name='priority',
+            field=models.CharField(choices=[('live', '실시간'), ('reprocess', '재처리'), ('backfill', '백필')], default='live', max_length=20, verbose_name='처리 우선순위'),
+        ),
+        migrations.AddField(
+            model_name='processingtask',
+            name='priority',
+            field=models.CharField(choices=[('live', '실시간'), ('reprocess', '재처리'), ('backfill', '백필')], default='live', max_length=20, verbose_name='처리 우선순위'),
+        ),
+        migrations.AddField(
+            model_name='processingtask',
+            name='queue_wait',
+            field=models.FloatField(blank=True, null=True, verbose_name='큐 대기 시간(초)'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0006_priority_lanes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callanalysis',
+            name='llm_input_tokens',
+            field=models.IntegerField(blank=True, null=True, verbose_name='LLM 입력 토큰 수'),
+        ),
+        migrations.AddField(
+            model_name='callanalysis',
+            name='llm_output_tokens',
+            field=models.IntegerField(blank=True, null=True, verbose_name='LLM 출력 토큰 수'),
+        ),
+    ]
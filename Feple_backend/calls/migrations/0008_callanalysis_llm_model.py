@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0007_callanalysis_llm_tokens'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callanalysis',
+            name='llm_model',
+            field=models.CharField(blank=True, max_length=64, verbose_name='LLM 평가 모델'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0008_callanalysis_llm_model'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='callanalysis',
+            name='llm_fallback',
+            field=models.BooleanField(default=False, verbose_name='기본 평가 대체 여부'),
+        ),
+    ]
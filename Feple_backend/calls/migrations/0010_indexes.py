@@ -0,0 +1,53 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0009_callanalysis_llm_fallback'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='callanalysis',
+            index=models.Index(condition=models.Q(('llm_fallback', True)), fields=['call'], name='analysis_fallback_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='callrawdata',
+            index=models.Index(fields=['call_date', 'id'], name='call_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='callrawdata',
+            index=models.Index(fields=['agent', 'call_date', 'id'], name='call_agent_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='callrawdata',
+            index=models.Index(fields=['status', 'call_date'], name='call_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processingtask',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'processing'])), fields=['call', 'task_type'], name='task_call_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processingtask',
+            index=models.Index(fields=['status'], name='task_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processingtask',
+            index=models.Index(condition=models.Q(('status', 'completed')), fields=['call', 'stage', 'updated_at'], name='task_checkpoint_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processingtask',
+            index=models.Index(fields=['call', 'status'], name='task_call_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processingtask',
+            index=models.Index(fields=['agent', 'task_type', 'status'], name='task_agent_type_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='processingtask',
+            index=models.Index(condition=models.Q(('queue_wait__isnull', False)), fields=['created_at'], name='task_queue_wait_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:14
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0010_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AgentDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='날짜')),
+                ('call_count', models.IntegerField(default=0, verbose_name='통화 수')),
+                ('completed_count', models.IntegerField(default=0, verbose_name='처리 완료 수')),
+                ('failed_count', models.IntegerField(default=0, verbose_name='처리 실패 수')),
+                ('total_duration', models.IntegerField(default=0, verbose_name='총 통화 시간(초)')),
+                ('duration_count', models.IntegerField(default=0, verbose_name='통화 시간이 있는 통화 수')),
+                ('satisfaction_sum', models.FloatField(default=0, verbose_name='만족도 점수 합계')),
+                ('satisfaction_count', models.IntegerField(default=0, verbose_name='만족도 점수 수')),
+                ('llm_score_sum', models.FloatField(default=0, verbose_name='LLM 평가 점수 합계')),
+                ('llm_score_count', models.IntegerField(default=0, verbose_name='LLM 평가 점수 수')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='수정일')),
+                ('agent', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='calls.agent')),
+            ],
+            options={
+                'verbose_name': '상담원 일별 통계',
+                'verbose_name_plural': '상담원 일별 통계들',
+                'ordering': ['-date'],
+                'indexes': [models.Index(fields=['date'], name='daily_stats_date_idx')],
+                'unique_together': {('agent', 'date')},
+            },
+        ),
+    ]
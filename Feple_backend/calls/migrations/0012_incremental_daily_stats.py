@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2026-10-17 21:14
+
+from django.db import migrations, models
+
+
+def clear_daily_stats(apps, schema_editor):
+    # 기존 행은 통화별 반영 값(stats_snapshot) 없이 집계되어 증분 갱신과 맞지 않으므로 비움
+    # (배포 후 backfill_agent_daily_stats로 다시 집계)
+    apps.get_model('calls', 'AgentDailyStats').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('calls', '0011_agentdailystats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='agentdailystats',
+            name='pending_count',
+            field=models.IntegerField(default=0, verbose_name='처리 대기 수'),
+        ),
+        migrations.AddField(
+            model_name='agentdailystats',
+            name='processing_count',
+            field=models.IntegerField(default=0, verbose_name='처리 중 수'),
+        ),
+        migrations.AddField(
+            model_name='callrawdata',
+            name='stats_snapshot',
+            field=models.JSONField(blank=True, editable=False, null=True, verbose_name='일별 통계 반영 값'),
+        ),
+        migrations.RunPython(clear_daily_stats, migrations.RunPython.noop),
+    ]
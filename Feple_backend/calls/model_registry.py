@@ -0,0 +1,104 @@
+import os
+import logging
+import threading
+from django.conf import settings
+
+from .utils import file_sha256
+
+logger = logging.getLogger('calls')
+
+
+def get_lightgbm_model_path():
+    """LightGBM 모델 파일 경로 반환"""
+    return settings.LIGHTGBM_MODEL_PATH
+
+
+class ModelRegistry:
+    """
+    프로세스 단위 모델 레지스트리
+
+    모델 파일을 워커 프로세스당 한 번만 로드하고, 이후 호출에서는 메모리에 올라간
+    모델을 재사용합니다. 매 조회 시 파일의 mtime/크기만 확인하며(stat 1회), 변경이
+    감지되면 해시를 계산해 내용이 실제로 바뀐 경우에만 새 모델을 로드한 뒤
+    (모델, 버전) 쌍을 한 번에 교체합니다.
+    """
+
+    def __init__(self, path_getter, loader=None):
+        self._path_getter = path_getter
+        self._loader = loader
+        self._lock = threading.Lock()
+        # (모델, 버전) 쌍을 하나의 튜플로 보관하여 원자적으로 교체
+        self._loaded = (None, None)
+        self._stat_key = None
+
+    def _load(self, path):
+        if self._loader:
+            return self._loader(path)
+        import joblib
+        return joblib.load(path)
+
+    def _stat(self, path):
+        stat = os.stat(path)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def get(self):
+        """
+        현재 모델과 버전 반환
+
+        Returns
+        -------
+        tuple
+            (모델, 버전) - 모델 파일이 없으면 (None, None)
+        """
+        path = self._path_getter()
+        try:
+            stat_key = self._stat(path)
+        except FileNotFoundError:
+            return self._loaded
+
+        if stat_key != self._stat_key:
+            self.reload(path, stat_key)
+
+        return self._loaded
+
+    def reload(self, path=None, stat_key=None):
+        """모델 파일이 변경된 경우 새 모델 로드 후 교체"""
+        path = path or self._path_getter()
+        with self._lock:
+            try:
+                stat_key = stat_key or self._stat(path)
+            except FileNotFoundError:
+                logger.error(f"Model file not found: {path}")
+                return self._loaded
+
+            # 다른 스레드가 이미 갱신한 경우
+            if stat_key == self._stat_key:
+                return self._loaded
+
+            version = file_sha256(path)[:12]
+            if version == self._loaded[1]:
+                # 내용이 동일하면 (touch 등) 다시 로드하지 않음
+                self._stat_key = stat_key
+                return self._loaded
+
+            model = self._load(path)
+            self._loaded = (model, version)
+            self._stat_key = stat_key
+            logger.info(f"Loaded model {os.path.basename(path)} (version {version})")
+            return self._loaded
+
+    @property
+    def version(self):
+        """현재 로드된 모델 버전"""
+        return self._loaded[1]
+
+
+lightgbm_registry = ModelRegistry(get_lightgbm_model_path)
+
+
+def preload_models():
+    """워커 프로세스 시작 시 모델 미리 로드"""
+    try:
+        lightgbm_registry.get()
+    except Exception as e:
+        logger.exception(f"Error preloading LightGBM model: {str(e)}")
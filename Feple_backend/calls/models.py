@@ -25,6 +25,13 @@ class CallRawData(models.Model):
         ('processing', '처리 중'),
         ('completed', '처리 완료'),
         ('failed', '처리 실패'),
+        ('dead_letter', '재시도 소진'),
+    )
+
+    PRIORITY_CHOICES = (
+        ('live', '실시간'),
+        ('reprocess', '재처리'),
+        ('backfill', '백필'),
     )
     
     audio_file = models.FileField("오디오 파일", upload_to='audio/')
@@ -33,6 +40,9 @@ class CallRawData(models.Model):
     duration = models.IntegerField("통화 시간(초)", null=True, blank=True)
     caller_number = models.CharField("발신자 번호", max_length=20, blank=True)
     status = models.CharField("처리 상태", max_length=20, choices=STATUS_CHOICES, default='pending')
+    priority = models.CharField("처리 우선순위", max_length=20, choices=PRIORITY_CHOICES, default='live')
+    # 일별 통계(AgentDailyStats)에 마지막으로 반영한 값 - 증분 갱신 시 이전 값과의 차이 계산용
+    stats_snapshot = models.JSONField("일별 통계 반영 값", null=True, blank=True, editable=False)
     created_at = models.DateTimeField("생성일", auto_now_add=True)
     updated_at = models.DateTimeField("수정일", auto_now=True)
 
@@ -40,6 +50,14 @@ class CallRawData(models.Model):
         verbose_name = "원본 통화 데이터"
         verbose_name_plural = "원본 통화 데이터들"
         ordering = ['-call_date']
+        indexes = [
+            # 통화 목록 커서 페이지네이션 (call_date, id)
+            models.Index(fields=['call_date', 'id'], name='call_date_id_idx'),
+            # 상담원별 통화 목록/통계/코칭 (agent + 기간)
+            models.Index(fields=['agent', 'call_date', 'id'], name='call_agent_date_idx'),
+            # 상태별 조회 (완료 통화 코칭 대상, dead_letter 목록)
+            models.Index(fields=['status', 'call_date'], name='call_status_date_idx'),
+        ]
         
     def __str__(self):
         return f"Call {self.id} - {self.agent.user.get_full_name()} ({self.call_date.strftime('%Y-%m-%d %H:%M')})"
@@ -67,17 +85,26 @@ class CallAnalysis(models.Model):
     call = models.OneToOneField(CallRawData, on_delete=models.CASCADE, related_name='analysis')
     satisfaction_score = models.FloatField("만족도 점수", null=True, blank=True)
     satisfaction_category = models.CharField("만족도 카테고리", max_length=20, blank=True)
+    model_version = models.CharField("예측 모델 버전", max_length=64, blank=True)
     llm_evaluation = models.TextField("LLM 평가 내용", blank=True)
     llm_score = models.FloatField("LLM 평가 점수", null=True, blank=True)
     key_topics = models.JSONField("주요 토픽", blank=True, null=True)
     emotions = models.JSONField("감정 분석", blank=True, null=True)
     summary = models.TextField("요약", blank=True)
+    llm_model = models.CharField("LLM 평가 모델", max_length=64, blank=True)
+    llm_fallback = models.BooleanField("기본 평가 대체 여부", default=False)
+    llm_input_tokens = models.IntegerField("LLM 입력 토큰 수", null=True, blank=True)
+    llm_output_tokens = models.IntegerField("LLM 출력 토큰 수", null=True, blank=True)
     created_at = models.DateTimeField("생성일", auto_now_add=True)
     updated_at = models.DateTimeField("수정일", auto_now=True)
 
     class Meta:
         verbose_name = "통화 분석 결과"
         verbose_name_plural = "통화 분석 결과들"
+        indexes = [
+            # 기본 평가로 대체되어 재평가가 필요한 분석 결과
+            models.Index(fields=['call'], name='analysis_fallback_idx', condition=models.Q(llm_fallback=True)),
+        ]
     
     def __str__(self):
         return f"Analysis for Call {self.call.id}"
@@ -106,12 +133,51 @@ class AgentCoaching(models.Model):
         return f"Coaching for {self.agent.user.get_full_name()} on {self.date}"
 
 
+class AgentDailyStats(models.Model):
+    """
+    상담원 일별 통계 집계 모델
+
+    통화 업로드/수정/처리 완료/실패/삭제 시 그 통화의 변경분만 해당 상담원-날짜 행에
+    더하여 갱신합니다 (calls.rollup.refresh_call_daily_stats). 만족도와 LLM 점수는 분석
+    결과가 있는 모든 통화를 집계합니다.
+    """
+    agent = models.ForeignKey(Agent, on_delete=models.CASCADE, related_name='daily_stats')
+    date = models.DateField("날짜")
+    call_count = models.IntegerField("통화 수", default=0)
+    completed_count = models.IntegerField("처리 완료 수", default=0)
+    pending_count = models.IntegerField("처리 대기 수", default=0)
+    processing_count = models.IntegerField("처리 중 수", default=0)
+    failed_count = models.IntegerField("처리 실패 수", default=0)
+    total_duration = models.IntegerField("총 통화 시간(초)", default=0)
+    duration_count = models.IntegerField("통화 시간이 있는 통화 수", default=0)
+    satisfaction_sum = models.FloatField("만족도 점수 합계", default=0)
+    satisfaction_count = models.IntegerField("만족도 점수 수", default=0)
+    llm_score_sum = models.FloatField("LLM 평가 점수 합계", default=0)
+    llm_score_count = models.IntegerField("LLM 평가 점수 수", default=0)
+    updated_at = models.DateTimeField("수정일", auto_now=True)
+
+    class Meta:
+        verbose_name = "상담원 일별 통계"
+        verbose_name_plural = "상담원 일별 통계들"
+        unique_together = ('agent', 'date')
+        ordering = ['-date']
+        indexes = [
+            # 기간별 전체/부서 집계
+            models.Index(fields=['date'], name='daily_stats_date_idx'),
+        ]
+
+    def __str__(self):
+        return f"Stats for {self.agent.user.get_full_name()} on {self.date}"
+
+
 class ProcessingTask(models.Model):
     """비동기 작업 모니터링 모델"""
     TASK_TYPES = (
         ('transcription', '음성 전사'),
+        ('feature_extraction', '오디오 특성 추출'),
         ('analysis', '통화 분석'),
         ('llm_evaluation', 'LLM 평가'),
+        ('finalize', '처리 마무리'),
         ('coaching', '코칭 생성'),
     )
     
@@ -127,6 +193,10 @@ class ProcessingTask(models.Model):
     task_type = models.CharField("작업 유형", max_length=20, choices=TASK_TYPES)
     status = models.CharField("상태", max_length=20, choices=STATUS_CHOICES, default='pending')
     task_id = models.CharField("Celery 작업 ID", max_length=50, blank=True)
+    stage = models.CharField("파이프라인 단계", max_length=50, blank=True)
+    priority = models.CharField("처리 우선순위", max_length=20, choices=CallRawData.PRIORITY_CHOICES, default='live')
+    queue_wait = models.FloatField("큐 대기 시간(초)", null=True, blank=True)
+    result = models.JSONField("단계 결과 (체크포인트)", null=True, blank=True)
     error_message = models.TextField("오류 메시지", blank=True)
     created_at = models.DateTimeField("생성일", auto_now_add=True)
     updated_at = models.DateTimeField("수정일", auto_now=True)
@@ -135,6 +205,28 @@ class ProcessingTask(models.Model):
         verbose_name = "처리 작업"
         verbose_name_plural = "처리 작업들"
         ordering = ['-created_at']
+        indexes = [
+            # 단계 작업 재사용 (call + task_type, 대기/처리 중 작업만 담는 부분 인덱스)
+            models.Index(
+                fields=['call', 'task_type'], name='task_call_active_idx',
+                condition=models.Q(status__in=['pending', 'processing'])
+            ),
+            # 처리 중 작업 수 (입장 제어) - SQLite는 IN 조건의 부분 인덱스를 쓰지 못하므로 일반 인덱스
+            models.Index(fields=['status'], name='task_status_idx'),
+            # 완료된 단계 체크포인트 조회
+            models.Index(
+                fields=['call', 'stage', 'updated_at'], name='task_checkpoint_idx',
+                condition=models.Q(status='completed')
+            ),
+            models.Index(fields=['call', 'status'], name='task_call_status_idx'),
+            # 상담원 코칭 작업 상태 갱신
+            models.Index(fields=['agent', 'task_type', 'status'], name='task_agent_type_status_idx'),
+            # 큐 대기 시간 통계
+            models.Index(
+                fields=['created_at'], name='task_queue_wait_idx',
+                condition=models.Q(queue_wait__isnull=False)
+            ),
+        ]
     
     def __str__(self):
         return f"{self.get_task_type_display()} for {'Call ' + str(self.call.id) if self.call else 'Agent ' + str(self.agent.id)}"
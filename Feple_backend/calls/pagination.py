@@ -0,0 +1,127 @@
+import json
+from base64 import b64decode, b64encode
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetCursorPagination(CursorPagination):
+    """
+    복합 키 기준 커서(keyset) 페이지네이션
+
+    DRF CursorPagination은 첫 번째 정렬 필드 값과 오프셋으로 위치를 기록하므로 같은
+    값이 많으면 오프셋 스캔이 생깁니다. 여기서는 ``ordering`` 의 모든 필드 값을 커서에
+    담고 ``(call_date, id) < (x, y)`` 형태의 조건으로 다음 페이지를 조회하므로, COUNT나
+    OFFSET 없이 어느 깊이에서도 같은 비용으로 페이지를 읽습니다. 마지막 정렬 필드는
+    고유해야 합니다 (예: id).
+    """
+    ordering = ('-call_date', '-id')
+    page_size_query_param = 'page_size'
+
+    @property
+    def max_page_size(self):
+        return settings.API_MAX_PAGE_SIZE
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor['reverse']
+
+        # 이전 페이지는 정렬을 뒤집어 조회한 뒤 결과 순서를 되돌림
+        ordering = [self._flip(field) for field in self.ordering] if reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor is not None:
+            try:
+                queryset = queryset.filter(self._keyset_filter(ordering, self.cursor['position']))
+            except (TypeError, ValueError, ValidationError):
+                # 형식은 맞지만 필드 값으로 변환할 수 없는 커서 (조작된 커서 등)
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor({'position': self._get_position(self.page[-1]), 'reverse': False})
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor({'position': self._get_position(self.page[0]), 'reverse': True})
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            cursor = json.loads(b64decode(encoded.encode('ascii')).decode('utf-8'))
+            position = cursor['p']
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError('position length mismatch')
+            return {'position': position, 'reverse': bool(cursor.get('r'))}
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, cursor):
+        data = json.dumps({'p': cursor['position'], 'r': int(cursor['reverse'])}, separators=(',', ':'))
+        encoded = b64encode(data.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position(self, instance):
+        position = []
+        for field in self.ordering:
+            value = instance
+            for attr in field.lstrip('-').split('__'):
+                value = getattr(value, attr)
+            position.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return position
+
+    @staticmethod
+    def _flip(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _keyset_filter(ordering, position):
+        """정렬 순서상 position 다음에 오는 행 조건 (a > x) OR (a = x AND b > y) ..."""
+        conditions = []
+        for index, field in enumerate(ordering):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            equal = {ordering[i].lstrip('-'): position[i] for i in range(index)}
+            conditions.append(Q(**equal, **{f'{name}__{lookup}': position[index]}))
+        return reduce(or_, conditions)
+
+
+class CallCursorPagination(KeysetCursorPagination):
+    """통화 목록 - 최신 통화부터 (call_date, id)"""
+    ordering = ('-call_date', '-id')
+
+
+class CallRelatedCursorPagination(KeysetCursorPagination):
+    """전사/분석 결과 목록 - 연결된 통화의 (call_date, call_id) 순"""
+    ordering = ('-call__call_date', '-call_id')
+
+
+class CoachingCursorPagination(KeysetCursorPagination):
+    """코칭 기록 - 최신 날짜부터 (date, id)"""
+    ordering = ('-date', '-id')
@@ -0,0 +1,435 @@
+import time
+import random
+import logging
+import importlib
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import CallRawData, ProcessingTask
+from .dashboard import invalidate_overview_cache
+from .rollup import refresh_call_daily_stats
+
+logger = logging.getLogger('calls')
+
+# process_call이 처음 payload에 넣는 키 (단계 출력이 아님)
+PAYLOAD_KEYS = ('call_id', 'use_cache', 'force', 'priority', 'enqueued_at')
+
+
+class TransientStageError(Exception):
+    """일시적인 오류 (재시도하면 성공할 수 있음)"""
+
+
+class PermanentStageError(Exception):
+    """영구적인 오류 (재시도해도 실패, 예: 손상된 오디오)"""
+
+
+class StageRetry(Exception):
+    """단계를 ``countdown`` 초 후 다시 실행해야 함을 알림"""
+
+    def __init__(self, error, countdown):
+        super().__init__(str(error))
+        self.error = error
+        self.countdown = countdown
+
+
+class Stage:
+    """
+    통화 분석 단계
+
+    ``func(call_instance, payload)`` 는 ``provides`` 에 선언한 키를 담은 딕셔너리를
+    반환합니다. ``requires`` 에 선언한 키는 실행 전에 payload에 채워져 있음이
+    보장되며, 이를 기준으로 단계 간 의존 관계(DAG)가 결정됩니다.
+    ``payload['cache_stats']`` 는 해당 단계 전용 캐시 통계 딕셔너리이고,
+    ``payload['retries_left']`` 는 이번 시도가 실패했을 때 남은 재시도 횟수입니다.
+    반환값에 ``'fallback': True`` 를 넣으면 기본값으로 대체된 결과로 보고 체크포인트로
+    저장하지 않으므로, 재시도나 재처리 시 해당 단계를 다시 실행합니다.
+    """
+
+    def __init__(self, name, func, task_type, requires=(), provides=(), queue=None):
+        self.name = name
+        self.func = func
+        self.task_type = task_type
+        self.requires = tuple(requires)
+        self.provides = tuple(provides)
+        self.queue = queue
+
+    def __repr__(self):
+        return f"<Stage {self.name}>"
+
+
+_stages = {}
+_stage_modules_loaded = False
+
+
+def register_stage(name, task_type, requires=(), provides=(), queue=None):
+    """
+    분석 단계 등록 데코레이터
+
+    예)
+        @register_stage('keywords', 'analysis', requires=('transcript_id',),
+                        provides=('keywords',), queue='scoring')
+        def extract_keywords(call_instance, payload):
+            return {'keywords': [...]}
+
+    PIPELINE_STAGE_MODULES에 모듈을 추가하면 process_call 수정 없이 파이프라인에 포함됩니다.
+    """
+    def decorator(func):
+        if name in _stages:
+            raise ValueError(f"Pipeline stage already registered: {name}")
+        _stages[name] = Stage(name, func, task_type, requires, provides, queue)
+        return func
+    return decorator
+
+
+def get_stages():
+    """등록된 단계 반환 (PIPELINE_STAGE_MODULES를 처음 한 번 import)"""
+    global _stage_modules_loaded
+    if not _stage_modules_loaded:
+        for module_name in settings.PIPELINE_STAGE_MODULES:
+            importlib.import_module(module_name)
+        _stage_modules_loaded = True
+    return _stages
+
+
+def get_stage(name):
+    return get_stages()[name]
+
+
+def get_stage_dependencies(stages, initial_keys=()):
+    """
+    단계별 선행 단계 이름 집합 반환
+
+    각 단계의 requires 키를 제공하는 단계가 선행 단계가 됩니다. 어떤 단계도
+    제공하지 않는 키가 있거나 순환 의존이 있으면 ValueError를 발생시킵니다.
+    """
+    providers = {}
+    for stage in stages.values():
+        for key in stage.provides:
+            if key in providers:
+                raise ValueError(f"Key '{key}' is provided by both {providers[key]} and {stage.name}")
+            providers[key] = stage.name
+
+    dependencies = {}
+    for stage in stages.values():
+        dependencies[stage.name] = set()
+        for key in stage.requires:
+            if key in initial_keys:
+                continue
+            if key not in providers:
+                raise ValueError(f"No stage provides '{key}' required by {stage.name}")
+            dependencies[stage.name].add(providers[key])
+    return dependencies
+
+
+def get_stage_layers(stages=None, initial_keys=()):
+    """
+    의존 관계에 따라 단계를 층으로 나눔
+
+    같은 층의 단계는 서로 독립적이므로 동시에 실행할 수 있습니다.
+    """
+    stages = get_stages() if stages is None else stages
+    dependencies = get_stage_dependencies(stages, initial_keys)
+
+    layers = []
+    done = set()
+    while len(done) < len(stages):
+        layer = sorted(
+            name for name, requires in dependencies.items()
+            if name not in done and requires <= done
+        )
+        if not layer:
+            raise ValueError(f"Cyclic pipeline stage dependencies: {sorted(set(stages) - done)}")
+        layers.append([stages[name] for name in layer])
+        done.update(layer)
+    return layers
+
+
+def merge_payloads(payloads):
+    """병렬 실행된 단계들의 payload를 하나로 합침"""
+    if isinstance(payloads, dict):
+        return payloads
+
+    merged = {}
+    stage_cache_stats = {}
+    for payload in payloads:
+        stage_cache_stats.update(payload.get('stage_cache_stats', {}))
+        merged.update(payload)
+    merged['stage_cache_stats'] = stage_cache_stats
+    # 다음 단계는 마지막으로 끝난 병렬 단계 이후에 큐에 들어감
+    enqueued_at = [payload['enqueued_at'] for payload in payloads if payload.get('enqueued_at')]
+    if enqueued_at:
+        merged['enqueued_at'] = max(enqueued_at)
+    return merged
+
+
+def sum_cache_stats(payload):
+    """단계별 캐시 적중/미스 횟수를 캐시 이름별로 합산"""
+    cache_stats = {}
+    for stats in payload.get('stage_cache_stats', {}).values():
+        for name, counts in stats.items():
+            total = cache_stats.setdefault(name, {'hits': 0, 'misses': 0})
+            total['hits'] += counts['hits']
+            total['misses'] += counts['misses']
+    return cache_stats
+
+
+def is_transient_error(error):
+    """네트워크/429/5xx/브로커/DB 연결 오류 등 재시도할 만한 오류인지 판단"""
+    if isinstance(error, PermanentStageError):
+        return False
+    if isinstance(error, (TransientStageError, ConnectionError, TimeoutError)):
+        return True
+
+    from .llm import is_retryable_error
+    if is_retryable_error(error):
+        return True
+
+    from kombu.exceptions import OperationalError as BrokerError
+    from django.db import InterfaceError, OperationalError as DatabaseError
+    return isinstance(error, (BrokerError, InterfaceError, DatabaseError))
+
+
+def get_retry_policy(stage_name):
+    """단계별 재시도 정책 (PIPELINE_RETRY_DEFAULT에 PIPELINE_RETRY_POLICIES 덮어씀)"""
+    policy = dict(settings.PIPELINE_RETRY_DEFAULT)
+    policy.update(settings.PIPELINE_RETRY_POLICIES.get(stage_name, {}))
+    return policy
+
+
+def get_stage_retry_delay(policy, attempt):
+    """지터가 적용된 지수 백오프 대기 시간"""
+    delay = min(policy['backoff_max'], policy['backoff'] * (2 ** attempt))
+    return random.uniform(delay / 2, delay)
+
+
+@contextmanager
+def pipeline_stage(call_id, task_type, task_id='', stage='', retry_policy=None, attempt=0):
+    """
+    파이프라인 단계 실행 컨텍스트
+
+    해당 단계의 ProcessingTask 행을 '처리 중'으로 표시하여 반환하고, 정상 종료 시
+    '완료'로 기록합니다. 블록 안에서 ``stage_task.result`` 를 설정하면 완료 시
+    체크포인트로 저장됩니다.
+
+    예외 발생 시 retry_policy가 있고 일시적인 오류이며 재시도 횟수가 남아 있으면
+    작업을 '대기 중'으로 되돌리고 StageRetry를 발생시킵니다. 재시도를 모두 소진한
+    일시적 오류는 통화를 'dead_letter'로, 그 밖의 오류는 '실패'로 변경합니다.
+    """
+    call_instance = CallRawData.objects.select_related('agent__user').get(id=call_id)
+
+    # 대기/처리 중인 같은 유형의 작업이 있으면 재사용 (업로드 시 생성된 전사 작업, 재시도 등)
+    stage_task = ProcessingTask.objects.filter(
+        call=call_instance,
+        task_type=task_type,
+        status__in=('pending', 'processing')
+    ).first()
+    if stage_task is None:
+        stage_task = ProcessingTask(
+            call=call_instance,
+            agent=call_instance.agent,
+            task_type=task_type
+        )
+    stage_task.call = call_instance
+    stage_task.status = 'processing'
+    stage_task.stage = stage
+    if task_id:
+        stage_task.task_id = task_id
+    stage_task.save()
+
+    try:
+        yield stage_task
+    except Exception as e:
+        error_msg = str(e)
+        transient = retry_policy is not None and is_transient_error(e)
+
+        if transient and attempt < retry_policy['max_retries']:
+            countdown = get_stage_retry_delay(retry_policy, attempt)
+            logger.warning(
+                f"Transient error in {task_type} stage for call {call_id} "
+                f"(attempt {attempt + 1}/{retry_policy['max_retries'] + 1}), "
+                f"retrying in {countdown:.1f}s: {error_msg}"
+            )
+            stage_task.status = 'pending'
+            stage_task.error_message = error_msg
+            stage_task.save()
+            raise StageRetry(e, countdown) from e
+
+        logger.error(f"Error in {task_type} stage for call {call_id}: {error_msg}")
+
+        stage_task.status = 'failed'
+        stage_task.error_message = error_msg
+        stage_task.save()
+
+        with transaction.atomic():
+            call_instance.status = 'dead_letter' if transient else 'failed'
+            call_instance.save(update_fields=['status', 'updated_at'])
+            refresh_call_daily_stats(call_instance)
+            transaction.on_commit(invalidate_overview_cache)
+        raise
+
+    stage_task.status = 'completed'
+    stage_task.save()
+
+
+def get_lane_queue(queue, priority):
+    """우선순위 등급별 큐 이름 (live는 기본 큐, 나머지는 등급 접미사가 붙은 큐)"""
+    return f"{queue}{settings.PRIORITY_QUEUE_SUFFIXES.get(priority, '')}"
+
+
+def record_queue_wait(stage_task, payload):
+    """단계 작업의 우선순위 등급과 큐 대기 시간(이전 단계 종료 또는 등록 시점부터) 기록"""
+    stage_task.priority = payload.get('priority', 'live')
+    if payload.get('enqueued_at'):
+        stage_task.queue_wait = max(0.0, time.time() - payload['enqueued_at'])
+
+
+def get_stage_checkpoint(call_id, stage):
+    """가장 최근에 완료된 단계 결과 반환 (없으면 None)"""
+    checkpoint = ProcessingTask.objects.filter(
+        call_id=call_id,
+        stage=stage.name,
+        status='completed',
+        result__isnull=False
+    ).order_by('-updated_at').values_list('result', flat=True).first()
+
+    if checkpoint is None or any(key not in checkpoint for key in stage.provides):
+        return None
+    return checkpoint
+
+
+def invalidate_stage_checkpoints(call_id, stage_names=None):
+    """
+    지정한 단계와 그 출력에 (간접적으로) 의존하는 단계의 체크포인트 무효화
+
+    무효화한 단계는 다음 실행 시 다시 계산됩니다. stage_names가 None이면 모든 단계를
+    무효화하며, 등록되지 않은 단계 이름이 있으면 ValueError를 발생시킵니다.
+
+    Returns
+    -------
+    list
+        무효화한 단계 이름 목록
+    """
+    stages = get_stages()
+    names = set(stages) if stage_names is None else set(stage_names)
+    unknown = names - set(stages)
+    if unknown:
+        raise ValueError(f"Unknown pipeline stages: {sorted(unknown)}")
+
+    dependencies = get_stage_dependencies(stages, initial_keys=PAYLOAD_KEYS)
+    changed = True
+    while changed:
+        changed = False
+        for name, requires in dependencies.items():
+            if name not in names and requires & names:
+                names.add(name)
+                changed = True
+
+    ProcessingTask.objects.filter(
+        call_id=call_id,
+        stage__in=names,
+        status='completed',
+        result__isnull=False
+    ).update(result=None)
+    return sorted(names)
+
+
+def run_stage(stage, payload, task_id='', attempt=0):
+    """
+    단계 하나를 실행하고 출력이 반영된 payload 반환
+
+    단계 출력은 ProcessingTask.result에 체크포인트로 저장됩니다. 같은 통화의 완료된
+    체크포인트가 있으면 단계를 다시 실행하지 않고 저장된 출력을 사용하므로, 재시도나
+    재처리는 완료되지 않은 첫 단계부터 이어서 진행됩니다. payload['force']가 참이면
+    체크포인트를 무시하고 모든 단계를 다시 계산합니다.
+    일시적인 오류로 재시도가 필요하면 StageRetry가 발생합니다 (attempt는 0부터 시작).
+    """
+    payload = merge_payloads(payload)
+    missing = [key for key in stage.requires if key not in payload]
+    if missing:
+        raise ValueError(f"Stage {stage.name} is missing inputs: {missing}")
+
+    call_id = payload['call_id']
+    checkpoint = None if payload.get('force') else get_stage_checkpoint(call_id, stage)
+
+    cache_stats = {}
+    retry_policy = get_retry_policy(stage.name)
+    with pipeline_stage(call_id, stage.task_type, task_id, stage=stage.name,
+                        retry_policy=retry_policy, attempt=attempt) as stage_task:
+        # 재시도 시에는 백오프 대기 시간이 섞이므로 첫 시도의 대기 시간만 기록
+        if attempt == 0:
+            record_queue_wait(stage_task, payload)
+
+        if checkpoint is not None:
+            logger.info(f"Resuming call {call_id}: using checkpoint for stage {stage.name}")
+            outputs = checkpoint
+        else:
+            outputs = stage.func(stage_task.call, dict(
+                payload,
+                cache_stats=cache_stats,
+                retries_left=max(retry_policy['max_retries'] - attempt, 0)
+            )) or {}
+
+            missing = [key for key in stage.provides if key not in outputs]
+            if missing:
+                raise ValueError(f"Stage {stage.name} did not provide: {missing}")
+
+        # 기본값으로 대체된 결과는 체크포인트로 남기지 않음 (다음 실행 시 다시 계산)
+        outputs = dict(outputs)
+        if not outputs.pop('fallback', False):
+            stage_task.result = outputs
+
+    payload = dict(payload)
+    payload.update(outputs)
+    payload['stage_cache_stats'] = dict(payload.get('stage_cache_stats', {}), **{stage.name: cache_stats})
+    payload['enqueued_at'] = time.time()
+    return payload
+
+
+def run_stages_locally(payload, stages=None, max_workers=None):
+    """
+    현재 프로세스의 스레드 풀에서 DAG 순서대로 단계 실행
+
+    선행 단계가 모두 끝난 단계는 즉시 시작되므로 전체 소요 시간은 모든 단계의
+    합이 아니라 가장 긴 의존 경로(critical path)에 가깝습니다. 전사는 별도
+    callanalysis 워커 프로세스에서, 오디오 특성 추출은 GIL을 해제하는 numpy/librosa
+    연산에서 대부분의 시간을 쓰므로 스레드로도 겹쳐서 실행됩니다.
+    재시도 대기는 PIPELINE_LOCAL_RETRY_BACKOFF_MAX 초로 제한하여, 재시도 정책의 긴
+    백오프가 풀 스레드와 DAG를 기다리는 요청/명령을 오래 붙잡지 않도록 합니다.
+    """
+    stages = get_stages() if stages is None else stages
+    dependencies = get_stage_dependencies(stages, initial_keys=payload.keys())
+    max_workers = max_workers or settings.PIPELINE_LOCAL_MAX_WORKERS
+
+    def run(stage, stage_payload):
+        try:
+            attempt = 0
+            while True:
+                try:
+                    return run_stage(stage, stage_payload, attempt=attempt)
+                except StageRetry as retry:
+                    time.sleep(min(retry.countdown, settings.PIPELINE_LOCAL_RETRY_BACKOFF_MAX))
+                    attempt += 1
+        finally:
+            # 스레드별 DB 연결은 단계가 끝나면 닫음
+            connection.close()
+
+    done = set()
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while len(done) < len(stages):
+            for name, requires in dependencies.items():
+                if name not in done and name not in running.values() and requires <= done:
+                    running[executor.submit(run, stages[name], dict(payload))] = name
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            results = []
+            for future in finished:
+                name = running.pop(future)
+                # 실패한 단계가 있으면 실행 중인 다른 단계가 끝난 뒤 예외 전달
+                results.append(future.result())
+                done.add(name)
+            payload = merge_payloads([payload] + results)
+
+    return payload
@@ -0,0 +1,203 @@
+import logging
+from datetime import date
+from django.db import transaction, IntegrityError
+from django.db.models import F, Sum, FloatField
+from django.db.models.functions import Coalesce, Cast, NullIf
+from django.utils import timezone
+
+from .models import CallRawData, CallAnalysis, AgentDailyStats
+from .utils import get_local_day_range
+
+logger = logging.getLogger('calls')
+
+FAILED_STATUSES = ('failed', 'dead_letter')
+
+# AgentDailyStats의 합계 필드 (기간 합산 시 사용)
+ROLLUP_FIELDS = (
+    'call_count', 'completed_count', 'pending_count', 'processing_count', 'failed_count',
+    'total_duration', 'duration_count', 'satisfaction_sum', 'satisfaction_count',
+    'llm_score_sum', 'llm_score_count',
+)
+
+
+def get_call_contribution(status, duration, satisfaction_score, llm_score):
+    """통화 하나가 일별 통계 필드에 더하는 값"""
+    return {
+        'call_count': 1,
+        'completed_count': int(status == 'completed'),
+        'pending_count': int(status == 'pending'),
+        'processing_count': int(status == 'processing'),
+        'failed_count': int(status in FAILED_STATUSES),
+        'total_duration': duration or 0,
+        'duration_count': int(duration is not None),
+        'satisfaction_sum': satisfaction_score or 0.0,
+        'satisfaction_count': int(satisfaction_score is not None),
+        'llm_score_sum': llm_score or 0.0,
+        'llm_score_count': int(llm_score is not None),
+    }
+
+
+def build_stats_snapshot(agent_id, call_date, status, duration, satisfaction_score=None, llm_score=None):
+    """통화가 일별 통계에 반영한 값 (CallRawData.stats_snapshot에 저장)"""
+    return {
+        'agent_id': agent_id,
+        'date': timezone.localtime(call_date).date().isoformat(),
+        'values': get_call_contribution(status, duration, satisfaction_score, llm_score),
+    }
+
+
+def get_rollup_sums():
+    """여러 AgentDailyStats 행을 합산하는 집계식"""
+    return {
+        field: Coalesce(Sum(field), 0.0 if isinstance(AgentDailyStats._meta.get_field(field), FloatField) else 0)
+        for field in ROLLUP_FIELDS
+    }
+
+
+def get_average(total, count):
+    """합계/개수 평균 (개수가 0이면 None)"""
+    return total / count if count else None
+
+
+def summarize_rollup(sums):
+    """합산된 일별 통계를 API 응답용 통계로 변환 (만족도는 분석 결과가 있는 모든 통화 기준)"""
+    return {
+        'call_count': sums['call_count'],
+        'avg_satisfaction': get_average(sums['satisfaction_sum'], sums['satisfaction_count']),
+        'completed_calls': sums['completed_count'],
+        'pending_calls': sums['pending_count'],
+        'processing_calls': sums['processing_count'],
+        'avg_call_duration': get_average(sums['total_duration'], sums['duration_count']),
+    }
+
+
+def average_expression(total_field, count_field):
+    """쿼리 안에서 계산하는 합계/개수 평균 (개수가 0이면 NULL)"""
+    return Cast(total_field, FloatField()) / NullIf(count_field, 0)
+
+
+def apply_daily_stats_delta(agent_id, day, delta):
+    """
+    상담원-날짜 행에 변경분을 더함 (행이 없으면 생성)
+
+    UPDATE ... SET field = field + delta로 반영하므로 동시에 갱신해도 변경분이 누락되지
+    않으며, 같은 행을 동시에 처음 만드는 경우 unique 충돌 후 UPDATE로 다시 반영합니다.
+    """
+    delta = {field: value for field, value in delta.items() if value}
+    if not delta:
+        return
+    updates = {field: F(field) + value for field, value in delta.items()}
+    rows = AgentDailyStats.objects.filter(agent_id=agent_id, date=day)
+    if rows.update(updated_at=timezone.now(), **updates):
+        return
+    try:
+        with transaction.atomic():
+            AgentDailyStats.objects.create(agent_id=agent_id, date=day, **delta)
+    except IntegrityError:
+        rows.update(updated_at=timezone.now(), **updates)
+
+
+def apply_snapshot_change(old, new):
+    """통화의 이전 반영 값(old)을 빼고 현재 값(new)을 더함 (같은 상담원-날짜면 차이만 반영)"""
+    if old and new and (old['agent_id'], old['date']) == (new['agent_id'], new['date']):
+        apply_daily_stats_delta(new['agent_id'], date.fromisoformat(new['date']), {
+            field: new['values'][field] - old['values'].get(field, 0) for field in ROLLUP_FIELDS
+        })
+        return
+    if old:
+        apply_daily_stats_delta(old['agent_id'], date.fromisoformat(old['date']), {
+            field: -value for field, value in old['values'].items()
+        })
+    if new:
+        apply_daily_stats_delta(new['agent_id'], date.fromisoformat(new['date']), new['values'])
+
+
+def refresh_call_daily_stats(call):
+    """
+    통화 하나의 변경분만 일별 통계에 반영 (증분 갱신)
+
+    통화에 마지막으로 반영한 값(stats_snapshot)과 현재 상태/통화 시간/점수의 차이만
+    해당 상담원-날짜 행에 더하므로 비용이 그날의 통화 수와 무관합니다. 통화 행을 잠근 뒤
+    계산하므로 같은 통화를 동시에 갱신해도 두 번 반영되지 않으며, 호출한 쪽의 트랜잭션
+    안에서 실행되면 상태 변경과 함께 커밋됩니다. call은 CallRawData 또는 통화 ID입니다.
+    """
+    call_id = getattr(call, 'pk', call)
+    with transaction.atomic():
+        current = CallRawData.objects.select_for_update().filter(id=call_id).values(
+            'agent_id', 'call_date', 'status', 'duration', 'stats_snapshot'
+        ).first()
+        if current is None:
+            return None
+        scores = CallAnalysis.objects.filter(call_id=call_id).values_list(
+            'satisfaction_score', 'llm_score'
+        ).first() or (None, None)
+
+        snapshot = build_stats_snapshot(
+            current['agent_id'], current['call_date'], current['status'], current['duration'], *scores
+        )
+        if snapshot != current['stats_snapshot']:
+            apply_snapshot_change(current['stats_snapshot'], snapshot)
+            CallRawData.objects.filter(id=call_id).update(stats_snapshot=snapshot)
+    if isinstance(call, CallRawData):
+        call.stats_snapshot = snapshot
+    return snapshot
+
+
+def remove_call_daily_stats(call):
+    """삭제할 통화가 반영한 값을 일별 통계에서 뺌 (통화 삭제와 같은 트랜잭션에서 호출)"""
+    with transaction.atomic():
+        snapshot = CallRawData.objects.select_for_update().filter(id=call.pk).values_list(
+            'stats_snapshot', flat=True
+        ).first()
+        if snapshot:
+            apply_snapshot_change(snapshot, None)
+            CallRawData.objects.filter(id=call.pk).update(stats_snapshot=None)
+    call.stats_snapshot = None
+
+
+def rebuild_daily_stats(start_date, end_date, agent_id=None, chunk_size=2000):
+    """
+    기간 내 일별 통계를 원본 통화에서 다시 만듦 (백필)
+
+    통화별 반영 값(stats_snapshot)과 상담원-날짜 합계를 같은 조회 결과로 함께 계산하여
+    이후 증분 갱신이 정확히 이어지도록 합니다. 기간 내 기존 행을 지운 뒤 한 번에 저장하므로
+    처리 중인 통화가 적은 시간에 실행하는 것이 좋습니다.
+
+    Returns
+    -------
+    int
+        저장한 행 수
+    """
+    day_start, day_end = get_local_day_range(start_date, end_date)
+    calls = CallRawData.objects.filter(call_date__gte=day_start, call_date__lt=day_end)
+    existing = AgentDailyStats.objects.filter(date__gte=start_date, date__lte=end_date)
+    if agent_id is not None:
+        calls = calls.filter(agent_id=agent_id)
+        existing = existing.filter(agent_id=agent_id)
+
+    totals = {}
+    snapshots = []
+    with transaction.atomic():
+        rows = calls.order_by('id').values(
+            'id', 'agent_id', 'call_date', 'status', 'duration',
+            'analysis__satisfaction_score', 'analysis__llm_score'
+        )
+        for row in rows.iterator(chunk_size=chunk_size):
+            snapshot = build_stats_snapshot(
+                row['agent_id'], row['call_date'], row['status'], row['duration'],
+                row['analysis__satisfaction_score'], row['analysis__llm_score']
+            )
+            total = totals.setdefault((snapshot['agent_id'], snapshot['date']), dict.fromkeys(ROLLUP_FIELDS, 0))
+            for field, value in snapshot['values'].items():
+                total[field] += value
+            snapshots.append(CallRawData(id=row['id'], stats_snapshot=snapshot))
+
+        existing.delete()
+        created = AgentDailyStats.objects.bulk_create([
+            AgentDailyStats(agent_id=agent, date=date.fromisoformat(day), **values)
+            for (agent, day), values in totals.items()
+        ])
+        CallRawData.objects.bulk_update(snapshots, ['stats_snapshot'], batch_size=chunk_size)
+
+    logger.info(f"Rebuilt {len(created)} agent daily stats rows for {start_date} ~ {end_date}")
+    return len(created)
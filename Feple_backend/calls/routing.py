@@ -0,0 +1,82 @@
+import logging
+from django.conf import settings
+
+from .tokens import count_tokens
+
+logger = logging.getLogger('calls')
+
+# 규칙 조건 키와 비교할 통화 지표 (min_*는 이상, max_*는 이하)
+RULE_METRICS = {
+    'tokens': 'transcript_tokens',
+    'utterances': 'utterance_count',
+    'satisfaction': 'satisfaction_score',
+}
+
+
+def get_call_metrics(speakers_data, satisfaction_score=None):
+    """라우팅에 사용하는 통화 지표 (전사 토큰 수, 발화 수, 만족도 점수)"""
+    from .utils import format_conversation_for_llm, get_utterances
+
+    return {
+        'transcript_tokens': count_tokens(
+            format_conversation_for_llm(speakers_data), settings.LLM_ROUTING_DEFAULT_MODEL
+        ),
+        'utterance_count': len(get_utterances(speakers_data)),
+        'satisfaction_score': satisfaction_score,
+    }
+
+
+def rule_matches(rule, metrics):
+    """규칙의 모든 조건을 만족하는지 확인 (값이 없는 지표에 대한 조건은 불일치)"""
+    for key, metric in RULE_METRICS.items():
+        value = metrics.get(metric)
+        minimum = rule.get(f'min_{key}')
+        maximum = rule.get(f'max_{key}')
+        if minimum is None and maximum is None:
+            continue
+        if value is None:
+            return False
+        if minimum is not None and value < minimum:
+            return False
+        if maximum is not None and value > maximum:
+            return False
+    return True
+
+
+def route_evaluation_model(speakers_data, satisfaction_score=None, call_id=None):
+    """
+    통화 규모와 복잡도에 맞는 LLM 평가 모델 선택
+
+    LLM_ROUTING_RULES를 위에서부터 확인하여 처음 일치하는 규칙의 모델을 사용하고,
+    일치하는 규칙이 없으면 LLM_ROUTING_DEFAULT_MODEL을 사용합니다.
+
+    Parameters
+    ----------
+    speakers_data : dict
+        화자 분리 데이터
+    satisfaction_score : float, optional
+        LightGBM 만족도 점수
+    call_id : int, optional
+        로그용 통화 ID
+
+    Returns
+    -------
+    tuple
+        (모델 이름, 규칙 이름, 통화 지표)
+    """
+    metrics = get_call_metrics(speakers_data, satisfaction_score)
+
+    model = settings.LLM_ROUTING_DEFAULT_MODEL
+    rule_name = 'default'
+    for index, rule in enumerate(settings.LLM_ROUTING_RULES):
+        if rule_matches(rule, metrics):
+            model = rule['model']
+            rule_name = rule.get('name', f'rule-{index}')
+            break
+
+    logger.info(
+        f"LLM routing: call {call_id} -> {model} (rule {rule_name}, "
+        f"tokens {metrics['transcript_tokens']}, utterances {metrics['utterance_count']}, "
+        f"satisfaction {metrics['satisfaction_score']})"
+    )
+    return model, rule_name, metrics
@@ -0,0 +1,132 @@
+import os
+import queue
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from django.conf import settings
+
+from .model_registry import lightgbm_registry
+
+logger = logging.getLogger('calls')
+
+
+def build_feature_vector(features):
+    """만족도 예측 모델 입력 순서에 맞춘 특성 벡터 생성"""
+    return [
+        features.get('silence_rate', 0.0),
+        features.get('agent_talk_ratio', 0.5),
+        features.get('interruption_count', 0),
+        features.get('avg_response_time', 1.0),
+        # 필요한 다른 특성들...
+    ]
+
+
+def categorize_satisfaction(score):
+    """만족도 점수를 카테고리로 매핑"""
+    if score < 2.0:
+        return "낮음"
+    elif score < 4.0:
+        return "보통"
+    return "높음"
+
+
+class BatchScorer:
+    """
+    마이크로 배치 만족도 예측기
+
+    여러 호출자가 동시에 제출한 특성 벡터를 최대 ``max_wait_ms`` 동안 또는
+    ``max_batch_size`` 개가 모일 때까지 모은 뒤, 하나의 행렬로 ``predict`` 를 한 번만
+    호출하고 결과를 각 호출자에게 돌려줍니다. 같은 프로세스 안에서 동시에 점수를
+    요청하는 경우(스레드/gevent 풀 워커, 벌크 재처리 등)에만 배치가 형성됩니다.
+    """
+
+    def __init__(self, registry, max_batch_size=64, max_wait_ms=10):
+        self.registry = registry
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def _ensure_worker(self):
+        # fork 이후 자식 프로세스에서는 스레드가 없으므로 다시 시작
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run,
+                name='lightgbm-batch-scorer',
+                daemon=True
+            )
+            self._thread.start()
+
+    def submit(self, feature_vector):
+        """특성 벡터를 제출하고 (점수, 모델 버전)을 돌려줄 Future 반환"""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((feature_vector, future))
+        return future
+
+    def predict(self, feature_vector, timeout=None):
+        """특성 벡터 하나에 대한 (점수, 모델 버전) 반환 (배치 완료까지 대기)"""
+        return self.submit(feature_vector).result(timeout=timeout)
+
+    def _collect_batch(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        import numpy as np
+
+        while True:
+            batch = self._collect_batch()
+            futures = [future for _, future in batch]
+            try:
+                model, model_version = self.registry.get()
+                if model is None:
+                    raise RuntimeError("LightGBM model is not available")
+
+                matrix = np.array([vector for vector, _ in batch], dtype=float)
+                predictions = model.predict(matrix)
+
+                for future, prediction in zip(futures, predictions):
+                    future.set_result((float(prediction), model_version))
+            except Exception as e:
+                logger.exception(f"Error in batch prediction ({len(batch)} calls): {str(e)}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+
+
+_batch_scorer = None
+_batch_scorer_lock = threading.Lock()
+
+
+def get_batch_scorer():
+    """프로세스 공용 배치 예측기 반환"""
+    global _batch_scorer
+    if _batch_scorer is None:
+        with _batch_scorer_lock:
+            if _batch_scorer is None:
+                _batch_scorer = BatchScorer(
+                    lightgbm_registry,
+                    max_batch_size=settings.LIGHTGBM_BATCH_MAX_SIZE,
+                    max_wait_ms=settings.LIGHTGBM_BATCH_MAX_WAIT_MS
+                )
+    return _batch_scorer
@@ -29,11 +29,18 @@ class CallRawDataSerializer(serializers.ModelSerializer):
         model = CallRawData
         fields = [
             'id', 'audio_file', 'agent', 'agent_name', 'call_date', 
-            'duration', 'caller_number', 'status',
+            'duration', 'caller_number', 'status', 'priority',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'status', 'created_at', 'updated_at']
 
+    def update(self, instance, validated_data):
+        """수정한 필드만 저장 (일별 통계 반영 값 등 다른 경로에서 갱신하는 필드는 덮어쓰지 않음)"""
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
 
 class CallTranscriptSerializer(serializers.ModelSerializer):
     class Meta:
@@ -50,8 +57,8 @@ class CallAnalysisSerializer(serializers.ModelSerializer):
         model = CallAnalysis
         fields = [
             'id', 'call', 'satisfaction_score', 'satisfaction_category',
-            'llm_evaluation', 'llm_score', 'key_topics', 'emotions',
-            'summary', 'created_at', 'updated_at'
+            'model_version', 'llm_evaluation', 'llm_score', 'key_topics', 'emotions',
+            'summary', 'llm_model', 'llm_fallback', 'llm_input_tokens', 'llm_output_tokens', 'created_at', 'updated_at'
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
@@ -77,10 +84,10 @@ class ProcessingTaskSerializer(serializers.ModelSerializer):
         model = ProcessingTask
         fields = [
             'id', 'call', 'agent', 'task_type', 'task_type_display',
-            'status', 'status_display', 'task_id', 'error_message',
-            'created_at', 'updated_at'
+            'status', 'status_display', 'task_id', 'stage', 'priority', 'queue_wait',
+            'error_message', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['id', 'task_id', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'task_id', 'stage', 'priority', 'queue_wait', 'created_at', 'updated_at']
 
 
 class CallDetailSerializer(serializers.ModelSerializer):
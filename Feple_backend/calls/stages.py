@@ -0,0 +1,175 @@
+import logging
+import time
+from django.conf import settings
+
+from .models import CallTranscript, CallAnalysis
+from .pipeline import register_stage, TransientStageError
+from .integration import (
+    call_callanalysis_process, extract_transcript_data,
+    call_lightgbm_model, call_openai_for_evaluation, is_fallback_evaluation
+)
+from .audio import probe_audio_duration, decode_audio
+from .routing import route_evaluation_model
+from .utils import get_audio_duration, extract_audio_features
+
+logger = logging.getLogger('calls')
+
+
+@register_stage(
+    'transcription', 'transcription',
+    provides=('transcript_id', 'silence_rate'),
+    queue='transcription'
+)
+def transcribe(call_instance, payload):
+    """전사 서비스 호출 (STT)"""
+    # callanalysis 호출 (동일 오디오 결과가 캐시에 있으면 전사 생략)
+    callanalysis_result = call_callanalysis_process(
+        call_instance.audio_file.path,
+        use_cache=payload.get('use_cache', True),
+        cache_stats=payload['cache_stats']
+    )
+    if not callanalysis_result:
+        # 워커 충돌/시간 초과와 오디오 문제를 구분할 수 없으므로 재시도 대상으로 처리
+        raise TransientStageError("Failed to process audio with callanalysis")
+
+    # 결과 추출
+    transcript, speakers_data, silence_rate = extract_transcript_data(callanalysis_result)
+
+    # 전사 결과 저장 (강제 재계산 시 기존 결과 덮어씀)
+    call_transcript, _ = CallTranscript.objects.update_or_create(
+        call=call_instance,
+        defaults={
+            'full_transcript': transcript,
+            'speakers_json': speakers_data,
+            'silence_rate': silence_rate
+        }
+    )
+
+    return {'transcript_id': call_transcript.id, 'silence_rate': silence_rate}
+
+
+@register_stage(
+    'audio_features', 'feature_extraction',
+    provides=('audio_features',),
+    queue='audio'
+)
+def extract_features(call_instance, payload):
+    """오디오 특성 추출 (전사 결과와 무관하므로 전사와 동시에 실행)"""
+    file_path = call_instance.audio_file.path
+
+    # 오디오 길이 계산 및 저장 (없는 경우) - 헤더만 읽고, 알 수 없으면 디코딩 후 계산
+    if not call_instance.duration:
+        duration = probe_audio_duration(file_path)
+        if duration:
+            call_instance.duration = int(duration)
+            call_instance.save(update_fields=['duration'])
+
+    audio_features = None
+
+    # 긴 통화는 블록 단위 스트리밍으로 처리하여 메모리 사용량을 일정하게 유지
+    if (call_instance.duration or 0) >= settings.AUDIO_STREAMING_MIN_DURATION:
+        audio_features = extract_audio_features(file_path, streaming=True)
+
+    # 오디오는 이 실행에서 한 번만 디코딩하여 길이 계산과 특성 추출에 공유
+    audio = None
+    if audio_features is None:
+        try:
+            audio = decode_audio(file_path)
+        except Exception as e:
+            logger.error(f"Error decoding audio for call {call_instance.id}: {str(e)}")
+
+    if audio is not None:
+        if not call_instance.duration:
+            call_instance.duration = int(get_audio_duration(file_path, audio=audio))
+            call_instance.save(update_fields=['duration'])
+
+        audio_features = extract_audio_features(file_path, audio=audio)
+
+    return {'audio_features': audio_features or {}}
+
+
+@register_stage(
+    'satisfaction', 'analysis',
+    requires=('silence_rate', 'audio_features'),
+    provides=('analysis_id', 'satisfaction_score'),
+    queue='scoring'
+)
+def score(call_instance, payload):
+    """만족도 분석 (ML 모델)"""
+    # 특성 데이터 준비
+    features = {
+        'silence_rate': payload['silence_rate'],
+        # 다른 특성들 추가
+    }
+    features.update(payload['audio_features'])
+
+    satisfaction_score, satisfaction_category, model_version = call_lightgbm_model(features)
+
+    # 만족도 분석 결과 저장 (기존 LLM 평가 필드는 유지)
+    call_analysis, _ = CallAnalysis.objects.update_or_create(
+        call=call_instance,
+        defaults={
+            'satisfaction_score': satisfaction_score,
+            'satisfaction_category': satisfaction_category,
+            'model_version': model_version
+        }
+    )
+
+    return {'analysis_id': call_analysis.id, 'satisfaction_score': satisfaction_score}
+
+
+@register_stage(
+    'llm_evaluation', 'llm_evaluation',
+    requires=('transcript_id', 'analysis_id', 'satisfaction_score'),
+    provides=('llm_score',),
+    queue='llm'
+)
+def llm_evaluate(call_instance, payload):
+    """
+    LLM 평가 (통화 규모와 만족도에 따라 모델 선택)
+
+    OpenAI 타임아웃/429 등 일시적인 오류는 단계 재시도 정책에 따라 다시 시도하고,
+    재시도가 남지 않은 마지막 시도에서만 기본 평가로 대체합니다.
+    """
+    call_transcript = call_instance.transcript
+
+    model, rule_name, _ = route_evaluation_model(
+        call_transcript.speakers_json,
+        payload.get('satisfaction_score'),
+        call_id=call_instance.id
+    )
+
+    usage_stats = {}
+    started = time.monotonic()
+    result = call_openai_for_evaluation(
+        call_transcript.full_transcript,
+        call_transcript.speakers_json,
+        call_instance.agent.user.get_full_name(),
+        use_cache=payload.get('use_cache', True),
+        cache_stats=payload['cache_stats'],
+        usage_stats=usage_stats,
+        model=model,
+        raise_transient_errors=payload.get('retries_left', 0) > 0
+    )
+    llm_evaluation, llm_score, topics, emotions, summary = result
+    logger.info(
+        f"LLM evaluation for call {call_instance.id}: model {model} (rule {rule_name}), "
+        f"{time.monotonic() - started:.2f}s, {usage_stats.get('input_tokens', 0)} input / "
+        f"{usage_stats.get('output_tokens', 0)} output tokens"
+    )
+
+    # LLM 평가 결과 저장
+    call_analysis = call_instance.analysis
+    call_analysis.llm_evaluation = llm_evaluation
+    call_analysis.llm_score = llm_score
+    call_analysis.key_topics = topics
+    call_analysis.emotions = emotions
+    call_analysis.summary = summary
+    call_analysis.llm_model = model
+    # 기본 평가로 대체된 경우 표시해 두었다가 reevaluate_fallback_calls로 다시 평가
+    call_analysis.llm_fallback = is_fallback_evaluation(result)
+    call_analysis.llm_input_tokens = usage_stats.get('input_tokens', 0)
+    call_analysis.llm_output_tokens = usage_stats.get('output_tokens', 0)
+    call_analysis.save()
+
+    return {'llm_score': llm_score, 'fallback': call_analysis.llm_fallback}
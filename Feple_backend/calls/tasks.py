@@ -1,162 +1,232 @@
-import os
 import logging
 import time
-from celery import shared_task
+from celery import shared_task, chain, chord, group
 from datetime import datetime, date
-from django.utils import timezone
-from django.db.models import Avg
 from django.conf import settings
+from django.db import transaction
 
 from .models import (
-    CallRawData, CallTranscript, CallAnalysis, 
-    AgentCoaching, ProcessingTask, Agent
+    CallRawData, CallAnalysis,
+    AgentCoaching, ProcessingTask, Agent, AgentDailyStats
 )
-from .integration import (
-    call_callanalysis_process, extract_transcript_data, 
-    call_lightgbm_model, call_openai_for_evaluation,
-    generate_daily_coaching
+from .integration import evaluate_calls_concurrently, generate_daily_coaching, is_fallback_evaluation
+from .pipeline import (
+    StageRetry, pipeline_stage, get_stage, get_stage_layers, get_lane_queue,
+    record_queue_wait, run_stage, run_stages_locally, merge_payloads, sum_cache_stats
 )
-from .utils import get_audio_duration, extract_audio_features, format_conversation_for_llm
+from .utils import get_local_day_range
+from .routing import route_evaluation_model
+from .dashboard import invalidate_overview_cache
+from .rollup import refresh_call_daily_stats, get_average
 
 logger = logging.getLogger('calls')
 
 
+def format_cache_stats(cache_stats):
+    """캐시 적중/미스 횟수를 로그용 문자열로 변환"""
+    if not cache_stats:
+        return "none"
+    return ", ".join(
+        f"{name} {counts['hits']} hit / {counts['misses']} miss"
+        for name, counts in sorted(cache_stats.items())
+    )
+
+
+def build_stage_signature(stage, payload=None, priority=None):
+    """단계 실행 서명 생성 (단계에 선언된 전용 큐의 우선순위 등급 레인으로 라우팅)"""
+    args = (payload, stage.name) if payload is not None else (stage.name,)
+    signature = run_pipeline_stage.s(*args)
+    priority = (payload or {}).get('priority', 'live') if priority is None else priority
+    return signature.set(queue=get_lane_queue(stage.queue or 'celery', priority))
+
+
+def build_call_pipeline(call_id, use_cache=True, force=False, priority='live', enqueued_at=None):
+    """
+    통화 처리 파이프라인 생성
+
+    등록된 분석 단계(calls.stages 및 PIPELINE_STAGE_MODULES)의 입력/출력 선언으로
+    의존 관계를 계산하여, 서로 독립적인 단계(전사, 오디오 특성 추출 등)는 group으로
+    동시에 실행하고 모든 단계가 끝나면 마무리 단계를 실행합니다.
+    use_cache=False이면 callanalysis/LLM 결과 캐시를 조회하지 않고, force=True이면
+    완료된 단계의 체크포인트를 무시하고 모든 단계를 다시 계산합니다.
+    priority(live/reprocess/backfill)에 따라 등급별 큐 레인으로 라우팅되어, 대량
+    백필이 당일 실시간 통화 처리를 밀어내지 않습니다.
+    """
+    payload = {
+        'call_id': call_id,
+        'use_cache': use_cache,
+        'force': force,
+        'priority': priority,
+        'enqueued_at': enqueued_at or time.time()
+    }
+
+    steps = []
+    for layer in get_stage_layers(initial_keys=payload.keys()):
+        step_payload = payload if not steps else None
+        signatures = [build_stage_signature(stage, step_payload, priority) for stage in layer]
+        steps.append(signatures[0] if len(signatures) == 1 else group(signatures))
+    steps.append(finalize_call.s().set(queue=get_lane_queue('finalize', priority)))
+
+    return chain(*steps)
+
+
+def enqueue_call(call_id, priority='live', use_cache=True, force=False):
+    """통화 처리 요청을 우선순위 등급 레인에 등록하고 AsyncResult 반환"""
+    return process_call.apply_async(
+        (call_id, use_cache, force, priority, time.time()),
+        queue=get_lane_queue('celery', priority)
+    )
+
+
 @shared_task
-def process_call(call_id):
-    """오디오 파일 처리 작업"""
-    logger.info(f"Processing call {call_id}")
-    call_instance = CallRawData.objects.get(id=call_id)
-    
+def process_call(call_id, use_cache=True, force=False, priority='live', enqueued_at=None):
+    """
+    오디오 파일 처리 파이프라인 시작
+
+    PIPELINE_EXECUTOR가 'local'이면 Celery 큐를 거치지 않고 현재 워커의
+    스레드 풀에서 단계들을 의존 순서대로 동시에 실행합니다.
+    enqueued_at(등록 시각, epoch 초)부터 첫 단계 시작까지가 첫 단계의 큐 대기 시간으로 기록됩니다.
+    """
+    logger.info(f"Processing call {call_id} ({priority})")
+
+    if settings.PIPELINE_EXECUTOR == 'local':
+        payload = run_stages_locally({
+            'call_id': call_id,
+            'use_cache': use_cache,
+            'force': force,
+            'priority': priority,
+            'enqueued_at': enqueued_at or time.time()
+        })
+        return finalize_call(payload)
+
+    result = build_call_pipeline(call_id, use_cache, force, priority, enqueued_at).apply_async()
+    return {
+        'call_id': call_id,
+        'status': 'dispatched',
+        'pipeline_id': result.id
+    }
+
+
+@shared_task(bind=True, max_retries=None)
+def run_pipeline_stage(self, payload, stage_name):
+    """
+    등록된 분석 단계 하나 실행 (payload가 목록이면 병렬 단계 결과를 합쳐서 사용)
+
+    일시적인 오류는 단계별 재시도 정책(PIPELINE_RETRY_POLICIES)에 따라 지수 백오프로
+    같은 단계만 다시 실행하며, 체인의 다음 단계는 재시도가 성공한 뒤 이어집니다.
+    """
     try:
-        # 오디오 길이 계산 및 저장 (없는 경우)
-        if not call_instance.duration:
-            duration = get_audio_duration(call_instance.audio_file.path)
-            if duration:
-                call_instance.duration = int(duration)
-                call_instance.save(update_fields=['duration'])
-        
-        # 1단계: 전사 서비스 호출 (STT)
-        transcription_task = ProcessingTask.objects.filter(
-            call=call_instance,
-            task_type='transcription'
-        ).first()
-        
-        if transcription_task:
-            transcription_task.status = 'processing'
-            transcription_task.save()
-        
-        # callanalysis 호출
-        callanalysis_result = call_callanalysis_process(call_instance.audio_file.path)
-        if not callanalysis_result:
-            raise Exception("Failed to process audio with callanalysis")
-            
-        # 결과 추출
-        transcript, speakers_data, silence_rate = extract_transcript_data(callanalysis_result)
-        
-        # 전사 결과 저장
-        call_transcript = CallTranscript.objects.create(
-            call=call_instance,
-            full_transcript=transcript,
-            speakers_json=speakers_data,
-            silence_rate=silence_rate
-        )
-        
-        if transcription_task:
-            transcription_task.status = 'completed'
-            transcription_task.save()
-        
-        # 2단계: 만족도 분석 (ML 모델)
-        analysis_task = ProcessingTask.objects.create(
-            call=call_instance,
-            agent=call_instance.agent,
-            task_type='analysis',
-            status='processing'
-        )
-        
-        # 오디오 특성 추출
-        audio_features = extract_audio_features(call_instance.audio_file.path)
-        
-        # 특성 데이터 준비
-        features = {
-            'silence_rate': silence_rate,
-            # 다른 특성들 추가
-        }
-        if audio_features:
-            features.update(audio_features)
-        
-        # 모델 호출
-        satisfaction_score, satisfaction_category = call_lightgbm_model(features)
-        
-        # 만족도 분석 결과 저장
-        call_analysis = CallAnalysis.objects.create(
-            call=call_instance,
-            satisfaction_score=satisfaction_score,
-            satisfaction_category=satisfaction_category
-        )
-        
-        analysis_task.status = 'completed'
-        analysis_task.save()
-        
-        # 3단계: LLM 평가
-        llm_task = ProcessingTask.objects.create(
-            call=call_instance,
-            agent=call_instance.agent,
-            task_type='llm_evaluation',
-            status='processing'
-        )
-        
-        llm_evaluation, llm_score, topics, emotions, summary = call_openai_for_evaluation(
-            transcript,
-            speakers_data,
-            call_instance.agent.user.get_full_name()
-        )
-        
-        # LLM 평가 결과 저장
+        return run_stage(get_stage(stage_name), payload, self.request.id, attempt=self.request.retries)
+    except StageRetry as retry:
+        # 재시도 횟수 제한은 단계별 정책에서 판단하므로 Celery 자체 제한은 두지 않음
+        raise self.retry(exc=retry.error, countdown=retry.countdown)
+
+
+@shared_task(bind=True)
+def finalize_call(self, payload):
+    """마지막 단계: 통화 처리 상태 업데이트"""
+    payload = merge_payloads(payload)
+    call_id = payload['call_id']
+    with pipeline_stage(call_id, 'finalize', self.request.id) as stage_task:
+        record_queue_wait(stage_task, payload)
+        call_instance = stage_task.call
+        # 상태 변경과 일별 통계 갱신을 함께 커밋
+        with transaction.atomic():
+            call_instance.status = 'completed'
+            call_instance.save(update_fields=['status', 'updated_at'])
+            refresh_call_daily_stats(call_instance)
+            transaction.on_commit(invalidate_overview_cache)
+
+    cache_stats = sum_cache_stats(payload)
+    logger.info(f"Successfully processed call {call_id} (cache: {format_cache_stats(cache_stats)})")
+    return {
+        'call_id': call_id,
+        'status': 'completed',
+        'satisfaction_score': payload.get('satisfaction_score'),
+        'cache_stats': cache_stats
+    }
+
+
+@shared_task
+def reevaluate_calls(call_ids, use_cache=False):
+    """
+    여러 통화의 LLM 평가를 동시에 다시 수행
+
+    하나의 워커에서 asyncio로 LLM_MAX_CONCURRENCY개까지 평가를 동시에 진행합니다.
+    """
+    calls = list(
+        CallRawData.objects.filter(
+            id__in=call_ids,
+            transcript__isnull=False,
+            analysis__isnull=False
+        ).select_related('transcript', 'analysis', 'agent__user')
+    )
+    logger.info(f"Re-evaluating {len(calls)} calls with LLM")
+
+    models = [
+        route_evaluation_model(call.transcript.speakers_json, call.analysis.satisfaction_score, call_id=call.id)[0]
+        for call in calls
+    ]
+    usage_stats = []
+    results = evaluate_calls_concurrently(
+        [
+            (call.transcript.full_transcript, call.transcript.speakers_json, call.agent.user.get_full_name())
+            for call in calls
+        ],
+        use_cache=use_cache,
+        usage_stats=usage_stats,
+        models=models
+    )
+
+    for call, result, usage, model in zip(calls, results, usage_stats, models):
+        llm_evaluation, llm_score, topics, emotions, summary = result
+        call_analysis = call.analysis
         call_analysis.llm_evaluation = llm_evaluation
         call_analysis.llm_score = llm_score
         call_analysis.key_topics = topics
         call_analysis.emotions = emotions
         call_analysis.summary = summary
+        call_analysis.llm_model = model
+        call_analysis.llm_fallback = is_fallback_evaluation(result)
+        call_analysis.llm_input_tokens = usage.get('input_tokens', 0)
+        call_analysis.llm_output_tokens = usage.get('output_tokens', 0)
         call_analysis.save()
-        
-        llm_task.status = 'completed'
-        llm_task.save()
-        
-        # 통화 처리 상태 업데이트
-        call_instance.status = 'completed'
-        call_instance.save()
-        
-        logger.info(f"Successfully processed call {call_id}")
-        return {
-            'call_id': call_id,
-            'status': 'completed',
-            'satisfaction_score': satisfaction_score
-        }
-        
-    except Exception as e:
-        # 오류 발생 시 상태 업데이트
-        error_msg = str(e)
-        logger.error(f"Error processing call {call_id}: {error_msg}")
-        
-        # 작업 상태 업데이트
-        for task in ProcessingTask.objects.filter(
-            call=call_instance,
-            status='processing'
-        ):
-            task.status = 'failed'
-            task.error_message = error_msg
-            task.save()
-        
-        # 통화 상태 업데이트
-        call_instance.status = 'failed'
-        call_instance.save()
-        
-        raise
+        refresh_call_daily_stats(call)
+
+    return {
+        'call_ids': [call.id for call in calls],
+        'status': 'completed'
+    }
+
+
+@shared_task
+def reevaluate_fallback_calls(limit=None, chunk_size=None):
+    """
+    기본 평가로 대체된 통화들을 묶음 단위로 다시 평가하도록 예약
+
+    OpenAI 회로가 열려 있으면 다시 기본 평가가 될 것이므로 예약하지 않습니다.
+    """
+    from .circuit import OPEN, get_llm_circuit
+
+    circuit = get_llm_circuit()
+    if circuit is not None and circuit.state == OPEN:
+        logger.warning("OpenAI circuit is open, skipping re-evaluation of fallback calls")
+        return {'status': 'skipped', 'call_count': 0}
+
+    chunk_size = chunk_size or settings.LLM_FALLBACK_REEVALUATION_CHUNK_SIZE
+    call_ids = list(
+        CallAnalysis.objects.filter(llm_fallback=True).order_by('call_id').values_list('call_id', flat=True)[:limit]
+    )
+    for offset in range(0, len(call_ids), chunk_size):
+        reevaluate_calls.delay(call_ids[offset:offset + chunk_size])
+
+    logger.info(f"Scheduled re-evaluation of {len(call_ids)} fallback calls")
+    return {'status': 'scheduled', 'call_count': len(call_ids)}
 
 
 @shared_task
 def daily_coaching(agent_id, target_date=None):
-    """상담원 일일 코칭 생성"""
+    """상담원 일일 코칭 생성 (같은 날짜로 다시 실행하면 기존 코칭을 갱신)"""
     logger.info(f"Generating daily coaching for agent {agent_id}")
     
     try:
@@ -168,21 +238,23 @@ def daily_coaching(agent_id, target_date=None):
         else:
             coaching_date = date.today()
         
-        # 해당 날짜의 통화 조회
-        calls = CallRawData.objects.filter(
-            agent=agent,
-            call_date__date=coaching_date,
-            status='completed'
-        )
+        # 처리 완료 통화 수는 일별 통계에서 조회
+        daily_stats = AgentDailyStats.objects.filter(agent=agent, date=coaching_date).first()
+        call_count = daily_stats.completed_count if daily_stats else 0
         
         # 통화가 없으면 빈 코칭 생성
-        if not calls.exists():
-            AgentCoaching.objects.create(
+        if not call_count:
+            AgentCoaching.objects.update_or_create(
                 agent=agent,
                 date=coaching_date,
-                daily_summary="오늘의 통화 데이터가 없습니다.",
-                coaching_points="통화 데이터가 충분하지 않아 코칭 포인트를 생성할 수 없습니다.",
-                call_count=0
+                defaults={
+                    'daily_summary': "오늘의 통화 데이터가 없습니다.",
+                    'coaching_points': "통화 데이터가 충분하지 않아 코칭 포인트를 생성할 수 없습니다.",
+                    'strengths': '',
+                    'areas_to_improve': '',
+                    'call_count': 0,
+                    'avg_satisfaction': None
+                }
             )
             
             logger.info(f"No calls found for agent {agent_id} on {coaching_date}")
@@ -193,16 +265,23 @@ def daily_coaching(agent_id, target_date=None):
                 'message': 'No calls found'
             }
         
-        # 통화 분석 데이터 수집
-        analyzed_calls = calls.filter(analysis__isnull=False)
-        call_count = calls.count()
-        avg_satisfaction = analyzed_calls.aggregate(avg=Avg('analysis__satisfaction_score'))['avg'] or 3.0
-        
-        # 요약 정보 수집
-        summaries = []
-        for call in calls.filter(analysis__isnull=False):
-            if call.analysis.summary:
-                summaries.append(call.analysis.summary)
+        # 처리 완료 통화의 요약과 만족도 수집 (통화별 분석 조회 없이 한 번의 쿼리로,
+        # 인덱스를 사용하도록 datetime 범위로 조회)
+        day_start, day_end = get_local_day_range(coaching_date)
+        analyses = list(
+            CallRawData.objects.filter(
+                agent=agent,
+                call_date__gte=day_start,
+                call_date__lt=day_end,
+                status='completed',
+                analysis__isnull=False
+            )
+            .order_by('call_date')
+            .values_list('analysis__summary', 'analysis__satisfaction_score')
+        )
+        summaries = [summary for summary, _ in analyses if summary]
+        scores = [score for _, score in analyses if score is not None]
+        avg_satisfaction = get_average(sum(scores), len(scores)) or 3.0
         
         # 코칭 내용 생성 (LLM 사용)
         coaching_data = generate_daily_coaching(
@@ -212,16 +291,18 @@ def daily_coaching(agent_id, target_date=None):
             avg_satisfaction
         )
         
-        # 코칭 저장
-        coaching = AgentCoaching.objects.create(
+        # 코칭 저장 (재실행 시 unique_together(agent, date) 충돌 없이 갱신)
+        coaching, _ = AgentCoaching.objects.update_or_create(
             agent=agent,
             date=coaching_date,
-            daily_summary=coaching_data['summary'],
-            coaching_points=coaching_data['coaching_points'],
-            strengths=coaching_data['strengths'],
-            areas_to_improve=coaching_data['areas_to_improve'],
-            call_count=call_count,
-            avg_satisfaction=avg_satisfaction
+            defaults={
+                'daily_summary': coaching_data['summary'],
+                'coaching_points': coaching_data['coaching_points'],
+                'strengths': coaching_data['strengths'],
+                'areas_to_improve': coaching_data['areas_to_improve'],
+                'call_count': call_count,
+                'avg_satisfaction': avg_satisfaction
+            }
         )
         
         logger.info(f"Successfully generated coaching for agent {agent_id} on {coaching_date}")
@@ -246,4 +327,86 @@ def daily_coaching(agent_id, target_date=None):
             task.error_message = error_msg
             task.save()
             
-        raise 
\ No newline at end of file
+        raise
+
+
+@shared_task
+def daily_coaching_all(target_date=None):
+    """
+    해당 날짜에 완료된 통화가 있는 모든 상담원의 일일 코칭 생성
+
+    상담원을 COACHING_MAX_CONCURRENCY개 묶음으로 나눠 group으로 동시에 실행하므로
+    동시에 진행되는 코칭 작업(LLM 요청)은 최대 그 수로 제한됩니다. 모든 묶음이
+    끝나면 summarize_daily_coaching이 결과와 소요 시간을 집계합니다.
+    """
+    coaching_date = datetime.fromisoformat(target_date).date() if target_date else date.today()
+
+    agent_ids = list(
+        AgentDailyStats.objects.filter(
+            date=coaching_date,
+            completed_count__gt=0
+        ).values_list('agent_id', flat=True).order_by('agent_id')
+    )
+    if not agent_ids:
+        logger.info(f"No agents with completed calls on {coaching_date}")
+        return {'date': coaching_date.isoformat(), 'agent_count': 0, 'status': 'completed'}
+
+    batch_count = min(settings.COACHING_MAX_CONCURRENCY, len(agent_ids))
+    batches = [agent_ids[i::batch_count] for i in range(batch_count)]
+    logger.info(f"Dispatching daily coaching for {len(agent_ids)} agents on {coaching_date} in {batch_count} batches")
+
+    result = chord(
+        group(daily_coaching_batch.s(batch, coaching_date.isoformat()) for batch in batches),
+        summarize_daily_coaching.s(coaching_date.isoformat(), time.time())
+    ).apply_async()
+
+    return {
+        'date': coaching_date.isoformat(),
+        'agent_count': len(agent_ids),
+        'batch_count': batch_count,
+        'status': 'dispatched',
+        'summary_id': result.id
+    }
+
+
+@shared_task
+def daily_coaching_batch(agent_ids, target_date):
+    """여러 상담원의 일일 코칭을 차례로 생성 (한 상담원의 실패가 나머지를 막지 않음)"""
+    results = []
+    for agent_id in agent_ids:
+        started = time.time()
+        try:
+            result = daily_coaching(agent_id, target_date)
+        except Exception as e:
+            result = {'agent_id': agent_id, 'status': 'failed', 'error': str(e)}
+        result['elapsed'] = time.time() - started
+        results.append(result)
+    return results
+
+
+@shared_task
+def summarize_daily_coaching(batch_results, target_date, started_at):
+    """일일 코칭 일괄 생성 결과 및 소요 시간 집계"""
+    results = [result for batch in batch_results for result in batch]
+    elapsed = [result['elapsed'] for result in results]
+    failed = [result['agent_id'] for result in results if result['status'] == 'failed']
+
+    summary = {
+        'date': target_date,
+        'agent_count': len(results),
+        'completed': len(results) - len(failed),
+        'failed': len(failed),
+        'failed_agent_ids': failed,
+        'wall_time': time.time() - started_at,
+        'agent_time': {
+            'total': sum(elapsed),
+            'avg': sum(elapsed) / len(elapsed) if elapsed else 0,
+            'max': max(elapsed, default=0),
+        }
+    }
+    logger.info(
+        f"Daily coaching for {target_date}: {summary['completed']} completed, {summary['failed']} failed, "
+        f"wall {summary['wall_time']:.1f}s, per agent avg {summary['agent_time']['avg']:.1f}s "
+        f"/ max {summary['agent_time']['max']:.1f}s"
+    )
+    return summary
@@ -1,3 +1,1650 @@
-from django.test import TestCase
+import base64
+import io
+import json
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import reverse
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from health_check.exceptions import ServiceUnavailable, ServiceWarning
+from rest_framework.test import APIClient
+
+from . import admission, batch, tasks
+from .callanalysis_pool import CallanalysisWorkerPool, get_callanalysis_worker_command
+from .cache import EVICT_TARGET_RATIO, FileResultCache
+from .callanalysis_worker import STUB_RESULT, load_stub_processor, serve
+from .checks import check_circuit_cache, check_dashboard_cache
+from .circuit import CLOSED, OPEN, HALF_OPEN, CircuitBreaker
+from .health import OpenAICircuitHealthCheck
+from .llm import create_chat_completion, get_chat_cache_key
+from .integration import FallbackEvaluation, merge_window_evaluations, reduce_call_summaries, split_conversation_windows
+from .models import Agent, AgentCoaching, AgentDailyStats, CallRawData, CallTranscript, CallAnalysis, ProcessingTask
+from .model_registry import ModelRegistry
+from .routing import route_evaluation_model, rule_matches
+from .scoring import BatchScorer
+from .pipeline import (
+    PermanentStageError, TransientStageError, get_retry_policy, get_stage_retry_delay, invalidate_stage_checkpoints,
+    is_transient_error
+)
+from .rollup import ROLLUP_FIELDS, rebuild_daily_stats, refresh_call_daily_stats
+from .tasks import finalize_call, process_call
+from .utils import file_sha256
+
+# 단일 프로세스에서 실행되는 테스트용 캐시 (기본 설정은 공유 Redis 캐시)
+LOCAL_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+def create_agent(username='agent', employee_id='E001'):
+    user = User.objects.create(username=username, first_name='테스트')
+    return Agent.objects.create(user=user, employee_id=employee_id, department='상담1팀')
+
+
+class BatchEvaluationTests(TestCase):
+    """로컬 배치 공급자로 제출부터 결과 반영까지 확인"""
+
+    def setUp(self):
+        batch_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, batch_dir, ignore_errors=True)
+        settings_override = override_settings(LLM_BATCH_DIR=batch_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.today = timezone.localdate()
+        self.call = CallRawData.objects.create(
+            agent=create_agent(), call_date=timezone.now(), status='completed', audio_file='audio/test.wav'
+        )
+        CallTranscript.objects.create(call=self.call, full_transcript='안녕하세요', speakers_json={'speakers': []})
+        self.analysis = CallAnalysis.objects.create(
+            call=self.call, satisfaction_score=4.0, llm_evaluation='이전 평가', llm_score=4.5, llm_model='previous'
+        )
+
+    def test_submit_and_ingest_round_trip(self):
+        manifest = batch.submit_evaluation_batch(self.today, self.today, 'local')
+        self.assertEqual(manifest['status'], 'submitted')
+        self.assertEqual(manifest['request_count'], 1)
+
+        manifest = batch.ingest_evaluation_batch(manifest['job_id'])
+        self.assertEqual(manifest['status'], 'ingested')
+        self.assertEqual(manifest['ingested_count'], 1)
+        self.assertEqual(manifest['failed_count'], 0)
+
+        self.analysis.refresh_from_db()
+        self.assertEqual(self.analysis.llm_score, 3.0)
+        self.assertFalse(self.analysis.llm_fallback)
+        self.assertEqual(self.analysis.llm_evaluation, '로컬 배치 공급자 평가 결과입니다.')
+        self.assertNotEqual(self.analysis.llm_model, 'previous')
+        self.assertEqual(self.analysis.summary, '로컬 배치 공급자 요약입니다.')
+
+    def test_ingested_job_is_not_ingested_again(self):
+        manifest = batch.submit_evaluation_batch(self.today, self.today, 'local')
+        batch.ingest_evaluation_batch(manifest['job_id'])
+
+        with mock.patch.object(batch.LocalBatchProvider, 'download_results') as download_results:
+            manifest = batch.ingest_evaluation_batch(manifest['job_id'])
+        download_results.assert_not_called()
+        self.assertEqual(manifest['status'], 'ingested')
+
+    def ingest_with_content(self, content, status_code=200, error=None):
+        def respond(provider, request):
+            return {
+                'custom_id': request['custom_id'],
+                'response': {'status_code': status_code, 'body': {
+                    'model': request['body']['model'],
+                    'choices': [{'message': {'content': content}}]
+                }},
+                'error': error
+            }
+
+        with mock.patch.object(batch.LocalBatchProvider, '_respond', respond):
+            manifest = batch.submit_evaluation_batch(self.today, self.today, 'local')
+        return batch.ingest_evaluation_batch(manifest['job_id'])
+
+    def assert_skipped(self, manifest):
+        self.assertEqual(manifest['ingested_count'], 0)
+        self.assertEqual(manifest['failed_count'], 1)
+        self.assertEqual(manifest['failed_call_ids'], [self.call.id])
+
+        # 기존 평가는 그대로 유지
+        self.analysis.refresh_from_db()
+        self.assertEqual(
+            (self.analysis.llm_evaluation, self.analysis.llm_score, self.analysis.llm_model, self.analysis.llm_fallback),
+            ('이전 평가', 4.5, 'previous', False)
+        )
+
+    def test_result_without_score_is_skipped(self):
+        self.assert_skipped(self.ingest_with_content('{"summary": "요약"}'))
+
+    def test_unparseable_result_is_skipped(self):
+        self.assert_skipped(self.ingest_with_content('평가 결과가 아닌 응답'))
+
+    def test_failed_request_is_skipped(self):
+        self.assert_skipped(self.ingest_with_content('', status_code=500, error={'message': 'server error'}))
+
+    def test_successful_result_clears_previous_fallback(self):
+        CallAnalysis.objects.filter(id=self.analysis.id).update(llm_fallback=True)
+        batch.ingest_evaluation_batch(batch.submit_evaluation_batch(self.today, self.today, 'local')['job_id'])
+
+        self.analysis.refresh_from_db()
+        self.assertFalse(self.analysis.llm_fallback)
+
+    def test_provider_interface_is_abstract(self):
+        with self.assertRaises(TypeError):
+            batch.BatchProvider()
+
+    def test_empty_period_is_not_submitted(self):
+        start = self.today - timedelta(days=365)
+        manifest = batch.submit_evaluation_batch(start, start, 'local')
+        self.assertEqual(manifest['status'], 'empty')
+        self.assertIsNone(manifest['batch_id'])
+        self.assertEqual(batch.ingest_evaluation_batch(manifest['job_id']), manifest)
+
+
+    def set_long_transcript(self):
+        """발화당 10토큰인 발화 6개 - 예산 30, 겹침 10이면 발화 [0-2], [2-4], [4-5] 세 구간"""
+        CallTranscript.objects.filter(call=self.call).update(speakers_json=conversation(6))
+        for name, value in (('LLM_EVALUATION_TOKEN_BUDGET', 30), ('LLM_EVALUATION_WINDOW_OVERLAP', 10)):
+            settings_override = override_settings(**{name: value})
+            settings_override.enable()
+            self.addCleanup(settings_override.disable)
+        token_patch = mock.patch('calls.tokens.count_tokens', line_tokens)
+        token_patch.start()
+        self.addCleanup(token_patch.stop)
+
+    def ingest_windows(self, scores):
+        """구간 번호별 점수로 응답 (점수가 None인 구간은 오류 응답)"""
+        def respond(provider, request):
+            _, index, _ = batch.parse_custom_id(request['custom_id'])
+            content = json.dumps({'evaluation': f'구간 {index} 평가', 'score': scores[index], 'topics': ['요금']})
+            return {
+                'custom_id': request['custom_id'],
+                'response': {'status_code': 200 if scores[index] is not None else 500, 'body': {
+                    'model': request['body']['model'],
+                    'choices': [{'message': {'content': content}}],
+                    'usage': {'prompt_tokens': 100, 'completion_tokens': 10}
+                }},
+                'error': None
+            }
+
+        with mock.patch.object(batch.LocalBatchProvider, '_respond', respond):
+            manifest = batch.submit_evaluation_batch(self.today, self.today, 'local')
+        return manifest, batch.ingest_evaluation_batch(manifest['job_id'])
+
+    def test_long_transcript_is_requested_per_window_and_merged(self):
+        self.set_long_transcript()
+        submitted, manifest = self.ingest_windows({1: 2.0, 2: 4.0, 3: 5.0})
+
+        self.assertEqual(submitted['request_count'], 3)
+        self.assertEqual(submitted['window_weights'], {str(self.call.id): [30, 30, 20]})
+        with open(batch.os.path.join(batch.get_batch_job_dir(submitted['job_id']), 'requests.jsonl')) as f:
+            requests = [json.loads(line) for line in f]
+        self.assertEqual(
+            [request['custom_id'] for request in requests],
+            [f'call-{self.call.id}:1/3', f'call-{self.call.id}:2/3', f'call-{self.call.id}:3/3']
+        )
+        prompt = requests[1]['body']['messages'][-1]['content']
+        self.assertIn('Agent: 발화 2\nCustomer: 발화 3\nAgent: 발화 4\n', prompt)
+        self.assertIn('2/3번째 구간', prompt)
+
+        self.assertEqual((manifest['ingested_count'], manifest['failed_count']), (1, 0))
+        self.analysis.refresh_from_db()
+        # 구간 토큰 수 가중 평균 (2.0*30 + 4.0*30 + 5.0*20) / 80
+        self.assertEqual(self.analysis.llm_score, 3.5)
+        self.assertTrue(self.analysis.llm_evaluation.startswith('[구간 1/3] 구간 1 평가'))
+        self.assertEqual(self.analysis.key_topics, ['요금'])
+        self.assertEqual((self.analysis.llm_input_tokens, self.analysis.llm_output_tokens), (300, 30))
+
+    def test_long_transcript_with_failed_window_is_skipped(self):
+        self.set_long_transcript()
+        _, manifest = self.ingest_windows({1: 2.0, 2: None, 3: 5.0})
+        self.assert_skipped(manifest)
+
+    def test_custom_id_round_trip(self):
+        self.assertEqual(batch.build_custom_id(7), 'call-7')
+        self.assertEqual(batch.parse_custom_id('call-7'), (7, 1, 1))
+        self.assertEqual(batch.parse_custom_id(batch.build_custom_id(7, 2, 3)), (7, 2, 3))
+
+def conversation(count):
+    """상담원/고객이 번갈아 말하는 발화 count개의 화자 분리 데이터"""
+    return {'utterances': [
+        {'speaker': 'agent' if index % 2 == 0 else 'customer', 'text': f'발화 {index}', 'start': index}
+        for index in range(count)
+    ]}
+
+
+def line_tokens(text, model=None):
+    """테스트용 토큰 수 - 대화 한 줄당 10토큰"""
+    return text.count('\n') * 10
+
+
+@mock.patch('calls.tokens.count_tokens', line_tokens)
+class ConversationWindowTests(SimpleTestCase):
+    """긴 대화의 구간 분할 경계와 구간 평가 병합 확인"""
+
+    def texts(self, windows):
+        return [[utterance['text'] for utterance in window['utterances']] for window in windows]
+
+    def test_conversation_within_budget_is_not_split(self):
+        speakers_data = conversation(3)
+        self.assertEqual(split_conversation_windows(speakers_data, 30, 10), [speakers_data])
+
+    def test_windows_fit_budget_and_overlap(self):
+        windows = split_conversation_windows(conversation(6), 30, 10)
+        self.assertEqual(self.texts(windows), [
+            ['발화 0', '발화 1', '발화 2'],
+            ['발화 2', '발화 3', '발화 4'],
+            ['발화 4', '발화 5'],
+        ])
+
+    def test_windows_without_overlap_do_not_repeat_utterances(self):
+        windows = split_conversation_windows(conversation(6), 30, 0)
+        self.assertEqual(self.texts(windows), [['발화 0', '발화 1', '발화 2'], ['발화 3', '발화 4', '발화 5']])
+
+    def test_large_overlap_still_advances(self):
+        windows = split_conversation_windows(conversation(4), 20, 100)
+        self.assertEqual(self.texts(windows), [
+            ['발화 0', '발화 1'], ['발화 1', '발화 2'], ['발화 2', '발화 3'],
+        ])
+
+    def test_utterance_over_budget_gets_own_window(self):
+        windows = split_conversation_windows(conversation(3), 5, 0)
+        self.assertEqual(self.texts(windows), [['발화 0'], ['발화 1'], ['발화 2']])
+
+    def test_merge_weights_scores_and_picks_majority(self):
+        merged = merge_window_evaluations([
+            ('첫 구간', 2.0, ['요금', '해지'], {'agent': '중립', 'customer': '부정'}, '요약 1'),
+            ('둘째 구간', 4.0, ['요금'], {'agent': '긍정', 'customer': '부정'}, ''),
+            ('셋째 구간', 5.0, ['요금', '해지', '배송', '기타'], {'agent': '긍정'}, '요약 3'),
+        ], [10, 20, 30])
+
+        evaluation, score, topics, emotions, summary = merged
+        self.assertNotIsInstance(merged, FallbackEvaluation)
+        self.assertEqual(evaluation, "[구간 1/3] 첫 구간\n\n[구간 2/3] 둘째 구간\n\n[구간 3/3] 셋째 구간")
+        # (2.0*10 + 4.0*20 + 5.0*30) / 60
+        self.assertEqual(score, 4.17)
+        self.assertEqual(topics[:2], ['요금', '해지'])
+        self.assertEqual(len(topics), 3)
+        self.assertEqual(emotions, {'agent': '긍정', 'customer': '부정'})
+        self.assertEqual(summary, '요약 1 요약 3')
+
+    def test_merge_ignores_invalid_scores(self):
+        _, score, _, _, _ = merge_window_evaluations([('a', 'N/A', [], {}, ''), ('b', 4.0, [], {}, '')], [50, 10])
+        self.assertEqual(score, 4.0)
+
+    def test_merge_is_fallback_only_when_every_window_is(self):
+        fallback = FallbackEvaluation(('기본 평가', 3.0, [], {}, ''))
+        self.assertNotIsInstance(
+            merge_window_evaluations([fallback, ('평가', 4.0, [], {}, '')], [10, 10]), FallbackEvaluation
+        )
+        self.assertIsInstance(merge_window_evaluations([fallback, fallback], [10, 10]), FallbackEvaluation)
+
+
+class CallanalysisWorkerTests(SimpleTestCase):
+    """테스트용 워커(--stub)로 상주 워커 프로토콜과 풀 재사용/재시작 확인"""
+
+    def test_serve_answers_each_job_line(self):
+        input_stream = io.StringIO('{"id": 1, "audio_path": "a.wav"}\n\n{"id": 2}\n')
+        output_stream = io.StringIO()
+        with mock.patch('sys.stderr', io.StringIO()):
+            serve(load_stub_processor(), input_stream, output_stream)
+
+        responses = [json.loads(line) for line in output_stream.getvalue().splitlines()]
+        self.assertEqual(responses[0], {'id': 1, 'result': STUB_RESULT})
+        self.assertEqual(responses[1]['id'], 2)
+        self.assertIn('KeyError', responses[1]['error'])
+
+    @override_settings(CALLANALYSIS_WORKER_STUB=True)
+    def test_pool_reuses_worker_and_restarts_after_crash(self):
+        pool = CallanalysisWorkerPool(
+            get_callanalysis_worker_command(), size=1, cwd=str(settings.BASE_DIR),
+            job_timeout=30, startup_timeout=30
+        )
+        self.addCleanup(pool.shutdown)
+
+        self.assertEqual(pool.process('a.wav'), STUB_RESULT)
+        first_pid = pool._workers[0].process.pid
+        self.assertEqual(pool.process('b.wav'), STUB_RESULT)
+        self.assertEqual(pool._workers[0].process.pid, first_pid)
+
+        pool._workers[0].process.kill()
+        pool._workers[0].process.wait()
+        self.assertEqual(pool.process('c.wav'), STUB_RESULT)
+        self.assertEqual(len(pool._workers), 1)
+        self.assertNotEqual(pool._workers[0].process.pid, first_pid)
+
+
+
+@override_settings(AUDIO_STREAM_BLOCK_SECONDS=1)
+class StreamingFeatureTests(SimpleTestCase):
+    """스트리밍 특성 추출이 전체 디코딩 결과와 문서화된 허용 오차 이내인지 확인"""
+
+    def write_signal(self, sample_rate, seconds=6):
+        """음성 구간(배음 + 잡음)과 침묵 구간이 번갈아 나오는 합성 신호를 WAV로 저장"""
+        import numpy as np
+        import soundfile as sf
+
+        rng = np.random.default_rng(0)
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        voiced = (np.sin(2 * np.pi * 220 * t) + 0.5 * np.sin(2 * np.pi * 660 * t)
+                  + 0.3 * np.sin(2 * np.pi * 1500 * t)) * (0.5 + 0.5 * np.sin(2 * np.pi * 3 * t))
+        signal = 0.3 * voiced + 0.01 * rng.standard_normal(len(t))
+        signal[(t % 2) >= 1.4] *= 0.001
+
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        path = f"{directory}/signal_{sample_rate}.wav"
+        sf.write(path, signal.astype('float32'), sample_rate)
+        return path
+
+    def test_streaming_matches_full_decode_within_tolerance(self):
+        from .utils import extract_audio_features
+
+        for sample_rate in (8000, 22050, 44100):
+            with self.subTest(sample_rate=sample_rate):
+                path = self.write_signal(sample_rate)
+                full = extract_audio_features(path)
+                streamed = extract_audio_features(path, streaming=True)
+
+                for key in ('rms_mean', 'zcr_mean', 'spectral_centroid_mean'):
+                    self.assertLessEqual(abs(streamed[key] - full[key]), 0.001 * abs(full[key]), key)
+                self.assertEqual(len(streamed['mfccs']), len(full['mfccs']))
+                for index, (value, expected) in enumerate(zip(streamed['mfccs'], full['mfccs'])):
+                    self.assertAlmostEqual(value, expected, delta=0.05, msg=f"mfcc {index}")
+                self.assertAlmostEqual(streamed['silence_ratio'], full['silence_ratio'], delta=0.5)
+                # 침묵 구간이 실제로 감지되어야 비교가 의미 있음
+                self.assertGreater(full['silence_ratio'], 10)
+
+
+EVALUATION_RESULT = ('친절한 응대', 4.5, ['기타'], {'agent': '긍정', 'customer': '긍정'}, '기타 문의 상담')
+
+
+@override_settings(
+    CACHES=LOCAL_CACHES,
+    PIPELINE_EXECUTOR='local',
+    PIPELINE_LOCAL_MAX_WORKERS=1,
+    PIPELINE_LOCAL_RETRY_BACKOFF_MAX=0,
+    CALLANALYSIS_BACKEND='dummy',
+    CALLANALYSIS_CACHE_ENABLED=False
+)
+class StageCheckpointTests(TransactionTestCase):
+    """
+    로컬 실행기로 파이프라인을 돌려 완료된 단계의 체크포인트 재사용과 단계 재시도 확인
+
+    단계는 스레드 풀에서 실행되므로 다른 DB 연결에서도 데이터가 보이도록
+    TransactionTestCase를 사용하고, SQLite 메모리 DB의 테이블 잠금 충돌을 피하도록
+    스레드는 하나만 사용합니다. 전사는 더미 callanalysis 결과를 사용하고,
+    오디오 디코딩/만족도 모델/LLM 호출만 대체합니다.
+    """
+
+    def setUp(self):
+        self.call = CallRawData.objects.create(
+            agent=create_agent(), call_date=timezone.now(), status='processing', audio_file='audio/test.wav'
+        )
+
+        from .integration import call_callanalysis_process
+        patches = {
+            'call_callanalysis_process': mock.patch('calls.stages.call_callanalysis_process', wraps=call_callanalysis_process),
+            'probe_audio_duration': mock.patch('calls.stages.probe_audio_duration', return_value=80.0),
+            'decode_audio': mock.patch('calls.stages.decode_audio', return_value=object()),
+            'extract_audio_features': mock.patch('calls.stages.extract_audio_features', return_value={'energy': 0.1}),
+            'call_lightgbm_model': mock.patch('calls.stages.call_lightgbm_model', return_value=(4.0, 'high', 'test')),
+            'call_openai_for_evaluation': mock.patch('calls.stages.call_openai_for_evaluation', return_value=EVALUATION_RESULT),
+        }
+        self.mocks = {}
+        for name, patcher in patches.items():
+            self.mocks[name] = patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def call_counts(self):
+        return {name: mocked.call_count for name, mocked in self.mocks.items() if name.startswith('call_')}
+
+    def test_rerun_reuses_completed_stages(self):
+        self.assertEqual(process_call(self.call.id)['status'], 'completed')
+        self.assertEqual(process_call(self.call.id)['status'], 'completed')
+
+        self.assertEqual(self.call_counts(), {
+            'call_callanalysis_process': 1, 'call_lightgbm_model': 1, 'call_openai_for_evaluation': 1
+        })
+        self.assertEqual(CallRawData.objects.get(id=self.call.id).duration, 80)
+
+    def test_retry_resumes_from_failed_stage(self):
+        self.mocks['call_openai_for_evaluation'].side_effect = PermanentStageError('invalid request')
+        with self.assertRaises(PermanentStageError):
+            process_call(self.call.id)
+        self.assertEqual(CallRawData.objects.get(id=self.call.id).status, 'failed')
+        self.assertEqual(
+            ProcessingTask.objects.get(call=self.call, stage='llm_evaluation').status, 'failed'
+        )
+
+        self.mocks['call_openai_for_evaluation'].side_effect = None
+        self.assertEqual(process_call(self.call.id)['status'], 'completed')
+
+        self.assertEqual(self.call_counts(), {
+            'call_callanalysis_process': 1, 'call_lightgbm_model': 1, 'call_openai_for_evaluation': 2
+        })
+        self.assertEqual(CallAnalysis.objects.get(call=self.call).llm_score, 4.5)
+
+    def test_fallback_evaluation_is_not_checkpointed(self):
+        self.mocks['call_openai_for_evaluation'].return_value = FallbackEvaluation(EVALUATION_RESULT)
+        process_call(self.call.id)
+        self.assertTrue(CallAnalysis.objects.get(call=self.call).llm_fallback)
+
+        self.mocks['call_openai_for_evaluation'].return_value = EVALUATION_RESULT
+        process_call(self.call.id)
+
+        self.assertEqual(self.mocks['call_openai_for_evaluation'].call_count, 2)
+        self.assertFalse(CallAnalysis.objects.get(call=self.call).llm_fallback)
+
+    def test_invalidated_stage_and_dependents_are_recomputed(self):
+        process_call(self.call.id)
+        self.assertEqual(
+            invalidate_stage_checkpoints(self.call.id, ['satisfaction']), ['llm_evaluation', 'satisfaction']
+        )
+        process_call(self.call.id)
+
+        self.assertEqual(self.call_counts(), {
+            'call_callanalysis_process': 1, 'call_lightgbm_model': 2, 'call_openai_for_evaluation': 2
+        })
+
+    def test_force_recomputes_every_stage(self):
+        process_call(self.call.id)
+        process_call(self.call.id, force=True)
+
+        self.assertEqual(self.call_counts(), {
+            'call_callanalysis_process': 2, 'call_lightgbm_model': 2, 'call_openai_for_evaluation': 2
+        })
+
+
+    @override_settings(PIPELINE_RETRY_POLICIES={'transcription': {'max_retries': 2}})
+    def test_exhausted_transient_retries_move_call_to_dead_letter(self):
+        # callanalysis가 결과를 주지 못하면 일시적 오류 (워커 충돌/시간 초과)
+        self.mocks['call_callanalysis_process'].side_effect = None
+        self.mocks['call_callanalysis_process'].return_value = None
+        with self.assertRaises(TransientStageError):
+            process_call(self.call.id)
+
+        self.assertEqual(self.mocks['call_callanalysis_process'].call_count, 3)
+        self.assertEqual(CallRawData.objects.get(id=self.call.id).status, 'dead_letter')
+        self.assertEqual(ProcessingTask.objects.get(call=self.call, stage='transcription').status, 'failed')
+
+    @override_settings(PIPELINE_RETRY_POLICIES={'transcription': {'max_retries': 2}})
+    def test_transient_error_is_retried_until_success(self):
+        from .integration import call_callanalysis_process
+
+        def fail_twice(*args, **kwargs):
+            if self.mocks['call_callanalysis_process'].call_count <= 2:
+                return None
+            return call_callanalysis_process(*args, **kwargs)
+
+        self.mocks['call_callanalysis_process'].side_effect = fail_twice
+
+        self.assertEqual(process_call(self.call.id)['status'], 'completed')
+        self.assertEqual(self.mocks['call_callanalysis_process'].call_count, 3)
+        self.assertEqual(ProcessingTask.objects.get(call=self.call, stage='transcription').status, 'completed')
+
+    def test_permanent_error_is_not_retried(self):
+        self.mocks['call_lightgbm_model'].side_effect = PermanentStageError('corrupted audio')
+        with self.assertRaises(PermanentStageError):
+            process_call(self.call.id)
+
+        self.assertEqual(self.mocks['call_lightgbm_model'].call_count, 1)
+        self.assertEqual(CallRawData.objects.get(id=self.call.id).status, 'failed')
+
+    @override_settings(PIPELINE_RETRY_POLICIES={'llm_evaluation': {'max_retries': 1}})
+    def test_last_llm_attempt_falls_back_instead_of_raising(self):
+        self.mocks['call_openai_for_evaluation'].side_effect = [TransientStageError('rate limited'), EVALUATION_RESULT]
+        self.assertEqual(process_call(self.call.id)['status'], 'completed')
+
+        # 재시도가 남은 시도만 일시적 오류를 올리고, 마지막 시도는 기본 평가로 대체 가능
+        self.assertEqual(
+            [call.kwargs['raise_transient_errors'] for call in self.mocks['call_openai_for_evaluation'].call_args_list],
+            [True, False]
+        )
+
+
+class RetryClassificationTests(SimpleTestCase):
+    """재시도할 오류(일시적)와 바로 실패시킬 오류(영구적) 구분과 재시도 정책 확인"""
+
+    def test_transient_errors(self):
+        import openai
+        from django.db import OperationalError as DatabaseError
+        from kombu.exceptions import OperationalError as BrokerError
+
+        errors = [
+            TransientStageError('callanalysis'),
+            ConnectionError('reset'),
+            TimeoutError('timed out'),
+            mock.Mock(spec=openai.RateLimitError),
+            mock.Mock(spec=openai.APITimeoutError),
+            mock.Mock(spec=openai.APIStatusError, status_code=503),
+            BrokerError('broker down'),
+            DatabaseError('database is locked'),
+        ]
+        for error in errors:
+            with self.subTest(error=error):
+                self.assertTrue(is_transient_error(error))
+
+    def test_permanent_errors(self):
+        import openai
+
+        errors = [
+            PermanentStageError('corrupted audio'),
+            ValueError('bad input'),
+            KeyError('speakers'),
+            mock.Mock(spec=openai.APIStatusError, status_code=400),
+        ]
+        for error in errors:
+            with self.subTest(error=error):
+                self.assertFalse(is_transient_error(error))
+
+    @override_settings(
+        PIPELINE_RETRY_DEFAULT={'max_retries': 3, 'backoff': 10, 'backoff_max': 60},
+        PIPELINE_RETRY_POLICIES={'transcription': {'max_retries': 1}}
+    )
+    def test_stage_policy_overrides_default_and_backoff_is_capped(self):
+        self.assertEqual(get_retry_policy('transcription'), {'max_retries': 1, 'backoff': 10, 'backoff_max': 60})
+        self.assertEqual(get_retry_policy('analysis')['max_retries'], 3)
+
+        policy = get_retry_policy('analysis')
+        for attempt, upper in ((0, 10), (1, 20), (2, 40), (3, 60), (10, 60)):
+            delay = get_stage_retry_delay(policy, attempt)
+            self.assertTrue(upper / 2 <= delay <= upper, (attempt, delay))
+
+
+@override_settings(CACHES=LOCAL_CACHES)
+class DeadLetterRequeueTests(TestCase):
+    """재시도 소진(dead_letter) 통화 목록 조회와 일괄 재처리 API 확인"""
+
+    def setUp(self):
+        self.agent = create_agent()
+        self.client = APIClient()
+        self.client.force_authenticate(self.agent.user)
+        self.dead = [
+            CallRawData.objects.create(
+                agent=self.agent, call_date=timezone.now(), status='dead_letter', audio_file='audio/test.wav'
+            )
+            for _ in range(2)
+        ]
+        self.failed = CallRawData.objects.create(
+            agent=self.agent, call_date=timezone.now(), status='failed', audio_file='audio/test.wav'
+        )
+        for call in self.dead + [self.failed]:
+            refresh_call_daily_stats(call)
+
+        enqueue_patch = mock.patch('calls.views.enqueue_call')
+        self.enqueue_call = enqueue_patch.start()
+        self.addCleanup(enqueue_patch.stop)
+
+    def requeue(self, data=None):
+        return self.client.post(reverse('callrawdata-requeue'), data or {}, format='json')
+
+    def test_dead_letter_lists_only_exhausted_calls(self):
+        response = self.client.get(reverse('callrawdata-dead-letter'))
+        self.assertEqual(sorted(row['id'] for row in response.data['results']), [call.id for call in self.dead])
+
+    def test_requeue_selected_calls(self):
+        # dead_letter가 아닌 통화 ID는 무시
+        response = self.requeue({'call_ids': [self.dead[0].id, self.failed.id]})
+        self.assertEqual(response.data, {'requeued': 1, 'call_ids': [self.dead[0].id]})
+
+        self.enqueue_call.assert_called_once_with(self.dead[0].id, 'reprocess')
+        call = CallRawData.objects.get(id=self.dead[0].id)
+        self.assertEqual((call.status, call.priority), ('processing', 'reprocess'))
+        self.assertEqual(CallRawData.objects.get(id=self.dead[1].id).status, 'dead_letter')
+        self.assertEqual(CallRawData.objects.get(id=self.failed.id).status, 'failed')
+        # 상태 변경이 일별 통계에 반영됨
+        self.assertEqual(AgentDailyStats.objects.get(agent=self.agent).processing_count, 1)
+
+    def test_requeue_all_dead_letter_calls(self):
+        response = self.requeue()
+        self.assertEqual(response.data['requeued'], 2)
+        self.assertEqual(self.enqueue_call.call_count, 2)
+        self.assertFalse(CallRawData.objects.filter(status='dead_letter').exists())
+
+    def test_requeue_rejects_invalid_call_ids(self):
+        for call_ids in ('1,2', [self.dead[0].id, 'x'], [True]):
+            with self.subTest(call_ids=call_ids):
+                self.assertEqual(self.requeue({'call_ids': call_ids}).status_code, 400)
+        self.enqueue_call.assert_not_called()
+
+class DailyStatsRollupTests(TestCase):
+    """통화 변경을 증분 반영한 일별 통계가 원본에서 다시 만든 값과 같은지 확인"""
+
+    def setUp(self):
+        self.agent = create_agent()
+        self.other_agent = create_agent('other', 'E002')
+        self.today = timezone.localdate()
+        self.client = APIClient()
+        self.client.force_authenticate(self.agent.user)
+
+    def create_call(self, status, duration=None, satisfaction_score=None, agent=None, call_date=None):
+        call = CallRawData.objects.create(
+            agent=agent or self.agent, call_date=call_date or timezone.now(), status=status,
+            duration=duration, audio_file='audio/test.wav'
+        )
+        if satisfaction_score is not None:
+            CallAnalysis.objects.create(call=call, satisfaction_score=satisfaction_score, llm_score=4.0)
+        refresh_call_daily_stats(call)
+        return call
+
+    def get_rollup_rows(self):
+        # 통화가 모두 빠져 0만 남은 행은 다시 만들면 생기지 않으므로 비교에서 제외
+        rows = {
+            (row.agent_id, row.date): {field: getattr(row, field) for field in ROLLUP_FIELDS}
+            for row in AgentDailyStats.objects.all()
+        }
+        return {key: values for key, values in rows.items() if any(values.values())}
+
+    def assert_matches_rebuild(self):
+        rows = self.get_rollup_rows()
+        rebuild_daily_stats(self.today - timedelta(days=7), self.today)
+        self.assertEqual(rows, self.get_rollup_rows())
+
+    def test_incremental_refresh_matches_rebuild(self):
+        processing = self.create_call('processing')
+        self.create_call('pending')
+        self.create_call('completed', duration=60, satisfaction_score=4.0)
+        failed = self.create_call('failed', duration=30, satisfaction_score=2.0)
+        moved = self.create_call('completed', duration=90, satisfaction_score=5.0)
+
+        # 처리 완료, 재처리, 다른 상담원/날짜로 이동
+        processing.status = 'completed'
+        processing.duration = 120
+        processing.save(update_fields=['status', 'duration', 'updated_at'])
+        CallAnalysis.objects.create(call=processing, satisfaction_score=3.0)
+        refresh_call_daily_stats(processing)
+        CallRawData.objects.filter(id=failed.id).update(status='processing')
+        refresh_call_daily_stats(failed.id)
+        moved.agent = self.other_agent
+        moved.call_date = timezone.now() - timedelta(days=1)
+        moved.save(update_fields=['agent', 'call_date', 'updated_at'])
+        refresh_call_daily_stats(moved)
+
+        self.assert_matches_rebuild()
+        row = AgentDailyStats.objects.get(agent=self.agent, date=self.today)
+        self.assertEqual(
+            (row.call_count, row.completed_count, row.pending_count, row.processing_count, row.failed_count),
+            (4, 2, 1, 1, 0)
+        )
+
+    def test_status_save_keeps_recorded_snapshot(self):
+        call = CallRawData.objects.create(
+            agent=self.agent, call_date=timezone.now(), status='processing', audio_file='audio/test.wav'
+        )
+        loaded = CallRawData.objects.get(id=call.id)
+        refresh_call_daily_stats(call)
+
+        # 스냅샷 기록 전에 읽은 인스턴스도 변경한 필드만 저장하므로 반영 값을 되돌리지 않음
+        loaded.status = 'completed'
+        loaded.save(update_fields=['status', 'updated_at'])
+        refresh_call_daily_stats(loaded)
+
+        row = AgentDailyStats.objects.get(agent=self.agent, date=self.today)
+        self.assertEqual((row.call_count, row.completed_count, row.processing_count), (1, 1, 0))
+        self.assert_matches_rebuild()
+
+    def test_update_api_moves_call_between_days(self):
+        call = self.create_call('completed', duration=60, satisfaction_score=4.0)
+        yesterday = timezone.now() - timedelta(days=1)
+
+        response = self.client.patch(
+            reverse('callrawdata-detail', args=[call.id]),
+            {'call_date': yesterday.isoformat(), 'duration': 90},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(AgentDailyStats.objects.get(agent=self.agent, date=self.today).call_count, 0)
+        row = AgentDailyStats.objects.get(agent=self.agent, date=timezone.localdate(yesterday))
+        self.assertEqual((row.call_count, row.total_duration), (1, 90))
+        self.assert_matches_rebuild()
+
+    def test_deleting_call_subtracts_it(self):
+        self.create_call('completed', duration=60, satisfaction_score=4.0)
+        call = self.create_call('completed', duration=30, satisfaction_score=2.0)
+
+        response = self.client.delete(reverse('callrawdata-detail', args=[call.id]))
+        self.assertEqual(response.status_code, 204)
+
+        row = AgentDailyStats.objects.get(agent=self.agent, date=self.today)
+        self.assertEqual((row.call_count, row.total_duration, row.satisfaction_sum), (1, 60, 4.0))
+        self.assert_matches_rebuild()
+
+    def test_stats_endpoints_report_totals(self):
+        self.create_call('completed', duration=60, satisfaction_score=4.0)
+        self.create_call('completed', duration=120, satisfaction_score=5.0)
+        self.create_call('failed', satisfaction_score=3.0)
+        self.create_call('processing')
+        self.create_call('pending')
+        self.create_call('completed', duration=30, satisfaction_score=1.0, agent=self.other_agent)
+
+        expected = {
+            'call_count': 5,
+            'avg_satisfaction': 4.0,
+            'completed_calls': 2,
+            'pending_calls': 1,
+            'processing_calls': 1,
+            'avg_call_duration': 90.0,
+        }
+        response = self.client.get(reverse('agent-stats', args=[self.agent.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({key: response.data[key] for key in expected}, expected)
+
+        response = self.client.get(reverse('agent-group-stats'), {'department': '상담1팀'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total']['call_count'], 6)
+        self.assertEqual(response.data['total']['avg_satisfaction'], 3.25)
+        self.assertEqual(response.data['total']['avg_call_duration'], 70.0)
+
+
+class FakeClock:
+    """time.time 대체 (회로 복구 대기와 캐시 만료를 함께 진행)"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@override_settings(CACHES=LOCAL_CACHES, LLM_CIRCUIT_ENABLED=True, LLM_CIRCUIT_FAILURE_THRESHOLD=3,
+                   LLM_CIRCUIT_RECOVERY_TIMEOUT=30)
+class CircuitBreakerTests(SimpleTestCase):
+    """서킷 브레이커 상태 전이 (닫힘 → 열림 → 반열림 → 닫힘)와 시험 요청 하나만 허용하는지 확인"""
+
+    def setUp(self):
+        cache.clear()
+        self.clock = FakeClock()
+        patcher = mock.patch('time.time', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.circuit = CircuitBreaker('test', failure_threshold=3, recovery_timeout=30, probe_timeout=10)
+
+    def open_circuit(self):
+        for _ in range(3):
+            self.circuit.record_failure()
+
+    def test_success_resets_consecutive_failures(self):
+        self.circuit.record_failure()
+        self.circuit.record_failure()
+        self.circuit.record_success()
+        self.circuit.record_failure()
+        self.circuit.record_failure()
+
+        self.assertEqual(self.circuit.state, CLOSED)
+        self.assertEqual(self.circuit.get_status()['failures'], 2)
+
+    def test_full_cycle_with_single_probe(self):
+        self.assertTrue(self.circuit.allow_request())
+        self.open_circuit()
+        self.assertEqual(self.circuit.state, OPEN)
+        self.assertFalse(self.circuit.allow_request())
+
+        self.clock.now += 31
+        self.assertEqual(self.circuit.state, HALF_OPEN)
+        # 다른 워커가 시험 요청을 보내는 동안에는 요청을 막음
+        self.assertTrue(self.circuit.allow_request())
+        self.assertFalse(self.circuit.allow_request())
+
+        self.circuit.record_success()
+        self.assertEqual(self.circuit.get_status(), {'state': CLOSED, 'failures': 0, 'opened_at': None})
+        self.assertTrue(self.circuit.allow_request())
+
+    def test_failed_probe_reopens_circuit(self):
+        self.open_circuit()
+        self.clock.now += 31
+        self.assertTrue(self.circuit.allow_request())
+
+        self.circuit.record_failure()
+        self.assertEqual(self.circuit.state, OPEN)
+        self.assertFalse(self.circuit.allow_request())
+
+        self.clock.now += 31
+        self.assertTrue(self.circuit.allow_request())
+
+    def test_expired_probe_lets_another_worker_probe(self):
+        self.open_circuit()
+        self.clock.now += 31
+        self.assertTrue(self.circuit.allow_request())
+
+        # 시험 요청을 보낸 워커가 결과를 기록하지 못하고 종료된 경우
+        self.clock.now += 11
+        self.assertTrue(self.circuit.allow_request())
+
+    def test_health_check_reports_open_circuit(self):
+        self.open_circuit()
+        with mock.patch('calls.health.get_llm_circuit', return_value=self.circuit), \
+                mock.patch('calls.health.is_process_local_cache', return_value=False):
+            with self.assertRaises(ServiceUnavailable):
+                OpenAICircuitHealthCheck().check_status()
+
+    def test_health_check_warns_when_state_is_process_local(self):
+        with mock.patch('calls.health.get_llm_circuit', return_value=self.circuit):
+            with self.assertRaises(ServiceWarning):
+                OpenAICircuitHealthCheck().check_status()
+
+    def test_process_local_cache_fails_system_check(self):
+        self.assertEqual([error.id for error in check_circuit_cache(None)], ['calls.E001'])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}):
+            self.assertEqual(check_circuit_cache(None), [])
+        with override_settings(LLM_CIRCUIT_ENABLED=False):
+            self.assertEqual(check_circuit_cache(None), [])
+
+
+@override_settings(CACHES=LOCAL_CACHES, DASHBOARD_CACHE_ALIAS='default')
+class DashboardOverviewCacheTests(TestCase):
+    """대시보드 개요의 조건부 응답(304)과 통화 처리 완료 시 캐시 무효화 확인"""
+
+    def setUp(self):
+        cache.clear()
+        self.agent = create_agent()
+        self.client = APIClient()
+        self.client.force_authenticate(self.agent.user)
+        self.url = reverse('dashboard-overview')
+
+    def test_matching_etag_returns_not_modified(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(response.status_code, 200)
+
+    def test_finalize_call_invalidates_overview(self):
+        call = CallRawData.objects.create(
+            agent=self.agent, call_date=timezone.now(), status='processing', audio_file='audio/test.wav'
+        )
+        refresh_call_daily_stats(call)
+        before = self.client.get(self.url)
+        self.assertEqual(before.data['completed_analysis'], 0)
+
+        # 분석 단계가 결과를 저장한 뒤 마지막 단계에서 일별 통계 갱신과 캐시 무효화
+        CallAnalysis.objects.create(call=call, satisfaction_score=4.0)
+        with self.captureOnCommitCallbacks(execute=True):
+            finalize_call({'call_id': call.id})
+
+        after = self.client.get(self.url, HTTP_IF_NONE_MATCH=before['ETag'])
+        self.assertEqual(after.status_code, 200)
+        self.assertNotEqual(after['ETag'], before['ETag'])
+        self.assertEqual(after.data['completed_analysis'], 1)
+        self.assertEqual(after.data['avg_satisfaction'], 4.0)
+
+    def test_days_counts_calendar_days_including_today(self):
+        today = timezone.localdate()
+        response = self.client.get(self.url, {'days': 1})
+        self.assertEqual(response.data['period']['start_date'], today.isoformat())
+        self.assertEqual(response.data['period']['end_date'], today.isoformat())
+
+        response = self.client.get(self.url, {'days': 7})
+        self.assertEqual(response.data['period']['start_date'], (today - timedelta(days=6)).isoformat())
+
+        self.assertEqual(self.client.get(self.url, {'days': 0}).status_code, 400)
+
+    def test_process_local_alias_fails_system_check(self):
+        self.assertEqual([error.id for error in check_dashboard_cache(None)], ['calls.E002'])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}):
+            self.assertEqual(check_dashboard_cache(None), [])
+
+
+@override_settings(
+    CACHES=LOCAL_CACHES,
+    ADMISSION_CONTROL_ENABLED=True,
+    ADMISSION_DEFER_QUEUE_DEPTH=10,
+    ADMISSION_REJECT_QUEUE_DEPTH=20,
+    ADMISSION_DEFER_IN_FLIGHT=2,
+    ADMISSION_REJECT_IN_FLIGHT=4,
+    ADMISSION_RETRY_AFTER=30
+)
+class AdmissionControlTests(TestCase):
+    """큐 적체량/처리 중 작업 수에 따른 업로드 승인 결정과 브로커 큐 조회 확인"""
+
+    def setUp(self):
+        self.agent = create_agent()
+        self.client = APIClient()
+        self.client.force_authenticate(self.agent.user)
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def set_queue_depth(self, depth):
+        queue_patch = mock.patch.object(admission, 'get_queue_depth', return_value=depth)
+        self.addCleanup(queue_patch.stop)
+        return queue_patch.start()
+
+    def add_in_flight(self, count):
+        call = CallRawData.objects.create(
+            agent=self.agent, call_date=timezone.now(), status='processing', audio_file='audio/test.wav'
+        )
+        for _ in range(count):
+            ProcessingTask.objects.create(call=call, task_type='transcription', status='processing')
+
+    def test_decision_by_queue_depth(self):
+        for depth, decision in ((0, admission.ACCEPT), (9, admission.ACCEPT), (10, admission.DEFER),
+                                (19, admission.DEFER), (20, admission.REJECT)):
+            with self.subTest(depth=depth):
+                self.set_queue_depth(depth)
+                self.assertEqual(admission.check_admission(), decision)
+
+    def test_decision_by_in_flight_tasks(self):
+        self.set_queue_depth(0)
+        self.add_in_flight(1)
+        self.assertEqual(admission.check_admission(), admission.ACCEPT)
+        self.add_in_flight(1)
+        self.assertEqual(admission.check_admission(), admission.DEFER)
+        self.add_in_flight(2)
+        self.assertEqual(admission.check_admission(), admission.REJECT)
+
+    def test_unreachable_broker_uses_in_flight_tasks_only(self):
+        self.set_queue_depth(None)
+        self.assertEqual(admission.check_admission(), admission.ACCEPT)
+        self.add_in_flight(2)
+        self.assertEqual(admission.check_admission(), admission.DEFER)
+
+    @override_settings(ADMISSION_CONTROL_ENABLED=False)
+    def test_disabled_admission_always_accepts(self):
+        get_queue_depth = self.set_queue_depth(100)
+        self.assertEqual(admission.check_admission(), admission.ACCEPT)
+        get_queue_depth.assert_not_called()
+
+    def upload(self):
+        with mock.patch('calls.views.enqueue_call') as enqueue_call:
+            enqueue_call.return_value.id = 'task-id'
+            response = self.client.post(reverse('callrawdata-list'), {
+                'audio_file': SimpleUploadedFile('call.wav', b'RIFF'),
+                'agent': self.agent.id,
+                'call_date': timezone.now().isoformat(),
+            }, format='multipart')
+        return response, enqueue_call
+
+    def test_rejected_upload_returns_429_with_retry_after(self):
+        self.set_queue_depth(20)
+        response, enqueue_call = self.upload()
+
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '30')
+        self.assertFalse(CallRawData.objects.exists())
+        enqueue_call.assert_not_called()
+
+    def test_deferred_upload_goes_to_backfill_lane(self):
+        self.set_queue_depth(10)
+        response, enqueue_call = self.upload()
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response['X-Admission-Decision'], admission.DEFER)
+        self.assertEqual(CallRawData.objects.get().priority, 'backfill')
+        enqueue_call.assert_called_once_with(response.data['id'], 'backfill')
+
+    def test_accepted_upload_keeps_requested_priority(self):
+        self.set_queue_depth(0)
+        response, enqueue_call = self.upload()
+
+        self.assertEqual(response['X-Admission-Decision'], admission.ACCEPT)
+        enqueue_call.assert_called_once_with(response.data['id'], 'live')
+
+    def test_missing_queue_counts_as_empty(self):
+        from amqp.exceptions import NotFound
+        from kombu.exceptions import ChannelError
+
+        connection = mock.Mock()
+        channel = connection.channel.return_value
+        # AMQP 브로커는 NotFound, Redis 브로커(kombu)는 reply_text가 NOT_FOUND인 ChannelError
+        redis_error = ChannelError('no queue')
+        redis_error.reply_text = 'NOT_FOUND - no queue'
+        for error in (NotFound('NOT_FOUND - no queue'), redis_error):
+            with self.subTest(error=type(error).__name__):
+                channel.queue_declare.side_effect = error
+                self.assertEqual(admission.get_message_count(connection, 'celery'), 0)
+
+        channel.queue_declare.side_effect = ChannelError('PRECONDITION_FAILED')
+        with self.assertRaises(ChannelError):
+            admission.get_message_count(connection, 'celery')
+        # 큐마다 연 채널은 오류가 나도 닫음
+        self.assertEqual(channel.close.call_count, 3)
+
+    def test_queue_depth_sums_queues_and_gives_up_on_broker_timeout(self):
+        from backend.celery import app
+
+        connection = mock.MagicMock()
+        connection.__enter__.return_value = connection
+        connection.channel.return_value.queue_declare.side_effect = lambda queue, passive: mock.Mock(
+            message_count={'celery': 3, 'audio': 4}[queue]
+        )
+        with mock.patch.object(app, 'connection_for_read', return_value=connection) as connection_for_read:
+            self.assertEqual(admission.get_queue_depth(['celery', 'audio']), 7)
+        connection_for_read.assert_called_once_with(connect_timeout=settings.ADMISSION_BROKER_TIMEOUT)
+        connection.ensure_connection.assert_called_once_with(max_retries=0)
+
+        connection.ensure_connection.side_effect = TimeoutError('timed out')
+        with mock.patch.object(app, 'connection_for_read', return_value=connection), \
+                self.assertLogs('calls', 'WARNING'):
+            self.assertIsNone(admission.get_queue_depth(['celery']))
+
+
+class KeysetCursorPaginationTests(TestCase):
+    """통화 목록 커서 페이지네이션의 순서, 잘못된 커서 처리, 페이지 크기 상한 확인"""
+
+    def setUp(self):
+        self.agent = create_agent()
+        self.client = APIClient()
+        self.client.force_authenticate(self.agent.user)
+        self.url = reverse('callrawdata-list')
+
+        # 정렬 첫 키(call_date)가 같은 통화가 여럿 있어야 id로 순서를 가르는지 확인 가능
+        now = timezone.now().replace(microsecond=0)
+        dates = [now] * 5 + [now - timedelta(hours=1)] * 2 + [now + timedelta(hours=1)]
+        calls = [
+            CallRawData.objects.create(agent=self.agent, call_date=call_date, audio_file='audio/test.wav')
+            for call_date in dates
+        ]
+        self.expected = [call.id for call in sorted(calls, key=lambda call: (call.call_date, call.id), reverse=True)]
+
+    def ids(self, response):
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_pages_follow_call_date_then_id_across_ties(self):
+        response = self.client.get(self.url, {'page_size': 3})
+        pages = [self.ids(response)]
+        # 커서가 앞으로 나아가지 않아도 끝나도록 페이지 수 제한
+        while response.data['next'] and len(pages) < len(self.expected):
+            response = self.client.get(response.data['next'])
+            pages.append(self.ids(response))
+
+        self.assertEqual([call_id for page in pages for call_id in page], self.expected)
+        self.assertEqual([len(page) for page in pages], [3, 3, 2])
+
+        # 마지막 페이지에서 이전 링크를 따라가면 같은 페이지를 역순으로 다시 얻음
+        previous_pages = []
+        while response.data['previous'] and len(previous_pages) < len(self.expected):
+            response = self.client.get(response.data['previous'])
+            previous_pages.append(self.ids(response))
+        self.assertEqual(previous_pages, pages[-2::-1])
+
+    def test_malformed_cursor_returns_not_found(self):
+        def encode(payload):
+            return base64.b64encode(json.dumps(payload).encode()).decode()
+
+        cursors = [
+            '!!!',  # base64 아님
+            base64.b64encode(b'\xff').decode(),  # UTF-8 아님
+            encode(['call_date', 'id']),  # 객체가 아님
+            encode({'p': [1]}),  # 정렬 필드 수와 다름
+            encode({'p': ['not-a-date', 1]}),
+            encode({'p': [timezone.now().isoformat(), 'abc']}),
+            encode({'p': [None, 1]}),
+            encode({'p': [[1], {'id': 1}]}),
+        ]
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(self.url, {'cursor': cursor}).status_code, 404)
+
+    @override_settings(API_MAX_PAGE_SIZE=4)
+    def test_page_size_is_clamped_to_max(self):
+        response = self.client.get(self.url, {'page_size': 50})
+        self.assertEqual(self.ids(response), self.expected[:4])
+        self.assertIsNotNone(response.data['next'])
+
+        self.assertEqual(len(self.ids(self.client.get(self.url, {'page_size': 2}))), 2)
+        # 잘못된 page_size는 기본 페이지 크기(PAGE_SIZE=10, 여기서는 전체 8건)
+        self.assertEqual(len(self.ids(self.client.get(self.url, {'page_size': 'many'}))), 8)
+
+
+COACHING_DATA = {'summary': '하루 요약', 'coaching_points': '코칭 포인트', 'strengths': '강점', 'areas_to_improve': '개선'}
+
+
+@override_settings(CELERY_TASK_ALWAYS_EAGER=True, CELERY_TASK_EAGER_PROPAGATES=True, COACHING_MAX_CONCURRENCY=2)
+class DailyCoachingFanOutTests(TestCase):
+    """일일 코칭 일괄 생성의 묶음 분배(chord)와 재실행 시 갱신 확인 (Celery eager 모드)"""
+
+    def setUp(self):
+        self.date = '2026-10-01'
+        self.agents = [create_agent(f'agent{index}', f'E{index:03d}') for index in range(5)]
+        for agent in self.agents:
+            AgentDailyStats.objects.create(agent=agent, date=self.date, call_count=1, completed_count=1)
+        # 처리 완료 통화가 없는 상담원은 대상이 아님
+        idle = create_agent('idle', 'E999')
+        AgentDailyStats.objects.create(agent=idle, date=self.date, call_count=1, pending_count=1)
+
+        generate_patch = mock.patch('calls.tasks.generate_daily_coaching', return_value=dict(COACHING_DATA))
+        self.generate = generate_patch.start()
+        self.addCleanup(generate_patch.stop)
+
+    def run_all(self):
+        """daily_coaching_all 실행 후 (반환값, 묶음별 결과, 집계 결과) 반환"""
+        summaries = []
+        summarize = tasks.summarize_daily_coaching.run
+
+        def record(batch_results, *args):
+            summaries.append((batch_results, summarize(batch_results, *args)))
+            return summaries[-1][1]
+
+        with mock.patch.object(tasks.summarize_daily_coaching, 'run', side_effect=record):
+            result = tasks.daily_coaching_all(self.date)
+        self.assertEqual(len(summaries), 1)
+        return (result, *summaries[0])
+
+    def test_agents_are_split_into_max_concurrency_batches(self):
+        result, batch_results, summary = self.run_all()
+
+        self.assertEqual((result['agent_count'], result['batch_count'], result['status']), (5, 2, 'dispatched'))
+        agent_ids = [agent.id for agent in self.agents]
+        self.assertEqual(
+            [[row['agent_id'] for row in batch] for batch in batch_results],
+            [agent_ids[0::2], agent_ids[1::2]]
+        )
+        self.assertEqual((summary['agent_count'], summary['completed'], summary['failed']), (5, 5, 0))
+        self.assertEqual(AgentCoaching.objects.filter(date=self.date).count(), 5)
+
+    def test_failed_agent_does_not_stop_its_batch(self):
+        failing = self.agents[0]
+        failing.user.first_name = '실패'
+        failing.user.save()
+
+        def generate(agent_name, *args):
+            if agent_name == '실패':
+                raise RuntimeError('LLM down')
+            return dict(COACHING_DATA)
+
+        self.generate.side_effect = generate
+        _, batch_results, summary = self.run_all()
+
+        self.assertEqual(summary['failed_agent_ids'], [failing.id])
+        self.assertEqual(summary['completed'], 4)
+        # 실패한 상담원과 같은 묶음의 나머지 상담원도 코칭 생성
+        self.assertEqual([row['status'] for row in batch_results[0]], ['failed', 'completed', 'completed'])
+        self.assertFalse(AgentCoaching.objects.filter(agent=failing).exists())
+
+    def test_rerun_updates_existing_coaching(self):
+        self.run_all()
+        coaching_ids = set(AgentCoaching.objects.values_list('id', flat=True))
+
+        self.generate.return_value = dict(COACHING_DATA, coaching_points='새 코칭 포인트')
+        _, _, summary = self.run_all()
+
+        self.assertEqual(summary['completed'], 5)
+        self.assertEqual(set(AgentCoaching.objects.values_list('id', flat=True)), coaching_ids)
+        self.assertEqual(
+            set(AgentCoaching.objects.values_list('coaching_points', flat=True)), {'새 코칭 포인트'}
+        )
+
+    def test_day_without_completed_calls_dispatches_nothing(self):
+        with mock.patch.object(tasks, 'chord') as chord:
+            result = tasks.daily_coaching_all('2026-09-01')
+        chord.assert_not_called()
+        self.assertEqual((result['agent_count'], result['status']), (0, 'completed'))
+
+
+class ModelRegistryTests(SimpleTestCase):
+    """모델 파일 변경 감지(stat → 해시 → 재로드) 확인"""
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        self.path = f"{directory}/model.pkl"
+        self.write(b'model-v1', mtime_ns=1_000_000_000)
+
+        self.loader = mock.Mock(side_effect=self.read)
+        self.registry = ModelRegistry(lambda: self.path, loader=self.loader)
+        sha_patch = mock.patch('calls.model_registry.file_sha256', wraps=file_sha256)
+        self.file_sha256 = sha_patch.start()
+        self.addCleanup(sha_patch.stop)
+
+    @staticmethod
+    def read(path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def write(self, content, mtime_ns):
+        with open(self.path, 'wb') as f:
+            f.write(content)
+        os.utime(self.path, ns=(mtime_ns, mtime_ns))
+
+    def test_unchanged_file_is_loaded_once(self):
+        model, version = self.registry.get()
+        self.assertEqual(model, b'model-v1')
+        self.assertEqual(version, file_sha256(self.path)[:12])
+
+        self.assertEqual(self.registry.get(), (model, version))
+        # 두 번째 조회는 stat만 확인 (해시 계산/로드 없음)
+        self.assertEqual((self.loader.call_count, self.file_sha256.call_count), (1, 1))
+
+    def test_touched_file_with_same_content_is_not_reloaded(self):
+        loaded = self.registry.get()
+        self.write(b'model-v1', mtime_ns=2_000_000_000)
+
+        self.assertEqual(self.registry.get(), loaded)
+        self.assertEqual((self.loader.call_count, self.file_sha256.call_count), (1, 2))
+        # 새 stat을 기억하므로 이후 조회는 다시 해시를 계산하지 않음
+        self.registry.get()
+        self.assertEqual(self.file_sha256.call_count, 2)
+
+    def test_changed_file_is_reloaded(self):
+        _, old_version = self.registry.get()
+        self.write(b'model-v2', mtime_ns=2_000_000_000)
+
+        model, version = self.registry.get()
+        self.assertEqual(model, b'model-v2')
+        self.assertNotEqual(version, old_version)
+        self.assertEqual(self.registry.version, version)
+        self.assertEqual(self.loader.call_count, 2)
+
+    def test_missing_file_keeps_loaded_model(self):
+        self.assertEqual(ModelRegistry(lambda: self.path + '.missing', loader=self.loader).get(), (None, None))
+
+        loaded = self.registry.get()
+        os.remove(self.path)
+        self.assertEqual(self.registry.get(), loaded)
+
+
+class RecordingModel:
+    """행마다 100 * 첫 특성 + 둘째 특성을 예측하고 받은 배치 크기를 기록하는 모델"""
+
+    def __init__(self):
+        self.batch_sizes = []
+
+    def predict(self, matrix):
+        self.batch_sizes.append(len(matrix))
+        return matrix[:, 0] * 100 + matrix[:, 1]
+
+
+class BatchScorerTests(SimpleTestCase):
+    """마이크로 배치 예측 결과가 각 호출자의 Future에 올바르게 돌아가는지 확인"""
+
+    def create_scorer(self, model, max_batch_size=4, max_wait_ms=500):
+        registry = mock.Mock()
+        registry.get.return_value = (model, 'v1')
+        return BatchScorer(registry, max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+
+    def test_batched_results_map_back_to_their_futures(self):
+        model = RecordingModel()
+        scorer = self.create_scorer(model)
+
+        futures = [scorer.submit([index, -index]) for index in range(10)]
+        results = [future.result(timeout=5) for future in futures]
+
+        self.assertEqual(results, [(99.0 * index, 'v1') for index in range(10)])
+        # 최대 max_wait_ms 동안 모아 max_batch_size개씩 한 번에 예측
+        self.assertEqual(model.batch_sizes, [4, 4, 2])
+
+    def test_concurrent_callers_get_their_own_scores(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        model = RecordingModel()
+        scorer = self.create_scorer(model, max_batch_size=64, max_wait_ms=50)
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(lambda index: scorer.predict([index, 1], timeout=5), range(32)))
+
+        self.assertEqual(results, [(100.0 * index + 1, 'v1') for index in range(32)])
+        self.assertEqual(sum(model.batch_sizes), 32)
+        self.assertLess(len(model.batch_sizes), 32)
+
+    def test_prediction_error_fails_every_future_in_batch(self):
+        model = mock.Mock()
+        model.predict.side_effect = ValueError('bad features')
+        scorer = self.create_scorer(model)
+
+        futures = [scorer.submit([index, 0]) for index in range(3)]
+        with self.assertLogs('calls', 'ERROR'):
+            for future in futures:
+                with self.assertRaisesRegex(ValueError, 'bad features'):
+                    future.result(timeout=5)
+
+    def test_missing_model_fails_futures(self):
+        scorer = self.create_scorer(None, max_wait_ms=0)
+        with self.assertLogs('calls', 'ERROR'):
+            with self.assertRaisesRegex(RuntimeError, 'not available'):
+                scorer.predict([1, 2], timeout=5)
+
+
+class FileResultCacheTests(SimpleTestCase):
+    """디스크 캐시의 LRU 정리(max_bytes의 90%까지)와 만료 확인"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+
+    def keys(self, count):
+        return [f"{index:02d}{'a' * 62}" for index in range(count)]
+
+    def entry_size(self):
+        probe = FileResultCache(tempfile.mkdtemp(dir=self.directory), max_bytes=10 ** 9)
+        probe.set('probe', 'x' * 1000)
+        return os.path.getsize(probe._path('probe'))
+
+    def stored_keys(self, cache, keys):
+        return [key for key in keys if os.path.exists(cache._path(key))]
+
+    def test_least_recently_used_entries_are_evicted_to_target(self):
+        entry_size = self.entry_size()
+        cache = FileResultCache(f"{self.directory}/cache", max_bytes=int(entry_size * 5.5))
+        keys = self.keys(6)
+        for index, key in enumerate(keys[:5]):
+            cache.set(key, 'x' * 1000)
+            os.utime(cache._path(key), (1000 + index, 1000 + index))
+
+        # 가장 오래된 항목도 조회하면 최근 사용 항목이 됨
+        self.assertEqual(cache.get(keys[0]), 'x' * 1000)
+        cache.set(keys[5], 'x' * 1000)
+
+        # 6개(한도 5.5개 초과) → 90%인 4.95개 이하가 될 때까지 오래 사용하지 않은 순으로 삭제
+        self.assertEqual(self.stored_keys(cache, keys), [keys[0], keys[3], keys[4], keys[5]])
+        total = sum(os.path.getsize(cache._path(key)) for key in self.stored_keys(cache, keys))
+        self.assertLessEqual(total, cache.max_bytes * EVICT_TARGET_RATIO)
+        self.assertEqual(cache._total_bytes, total)
+
+    def test_cache_within_limit_is_not_evicted(self):
+        cache = FileResultCache(self.directory, max_bytes=10 ** 6)
+        keys = self.keys(5)
+        for key in keys:
+            cache.set(key, {'content': '응답'})
+        self.assertEqual(cache.evict(), 0)
+        self.assertEqual(self.stored_keys(cache, keys), keys)
+
+    def test_expired_entry_is_a_miss(self):
+        cache = FileResultCache(self.directory, max_bytes=10 ** 6, ttl=60)
+        key = self.keys(1)[0]
+        cache.set(key, 'value')
+        self.assertEqual(cache.get(key), 'value')
+
+        with mock.patch('calls.cache.time.time', return_value=timezone.now().timestamp() + 61):
+            self.assertIsNone(cache.get(key))
+        self.assertFalse(os.path.exists(cache._path(key)))
+
+
+MESSAGES = [{'role': 'system', 'content': '평가자'}, {'role': 'user', 'content': '대화 내용'}]
+JSON_FORMAT = {'type': 'json_object'}
+
+
+@override_settings(CACHES=LOCAL_CACHES, LLM_CACHE_ENABLED=True, LLM_CIRCUIT_ENABLED=False)
+class LLMResponseCacheTests(SimpleTestCase):
+    """LLM 응답 캐시의 키 구성(모델 + 메시지 + 응답 형식)과 적중/미스 확인"""
+
+    def setUp(self):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir, ignore_errors=True)
+        settings_override = override_settings(LLM_CACHE_DIR=cache_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        # 프로세스 공용 캐시는 처음 사용할 때 LLM_CACHE_DIR로 만들어지므로 테스트마다 새로 생성
+        cache_patch = mock.patch('calls.llm._response_cache', None)
+        cache_patch.start()
+        self.addCleanup(cache_patch.stop)
+
+        self.client = mock.Mock()
+        self.client.chat.completions.create.side_effect = lambda **kwargs: mock.Mock(
+            choices=[mock.Mock(message=mock.Mock(content=f"{kwargs['model']} 응답 {self.api_calls()}"))],
+            usage=None
+        )
+
+    def api_calls(self):
+        return self.client.chat.completions.create.call_count
+
+    def complete(self, model='gpt-4o-mini', messages=MESSAGES, response_format=JSON_FORMAT, **kwargs):
+        return create_chat_completion(model, messages, response_format, client=self.client, **kwargs)
+
+    def test_key_depends_on_model_messages_and_response_format(self):
+        key = get_chat_cache_key('gpt-4o-mini', MESSAGES, JSON_FORMAT)
+        # 같은 내용이면 딕셔너리 키 순서와 관계없이 같은 키
+        reordered = [{'content': message['content'], 'role': message['role']} for message in MESSAGES]
+        self.assertEqual(get_chat_cache_key('gpt-4o-mini', reordered, dict(JSON_FORMAT)), key)
+
+        self.assertEqual(len({
+            key,
+            get_chat_cache_key('gpt-4o', MESSAGES, JSON_FORMAT),
+            get_chat_cache_key('gpt-4o-mini', MESSAGES[:1] + [{'role': 'user', 'content': '다른 대화'}], JSON_FORMAT),
+            get_chat_cache_key('gpt-4o-mini', MESSAGES, None),
+        }), 4)
+
+    def test_identical_request_hits_cache(self):
+        cache_stats = {}
+        first = self.complete(cache_stats=cache_stats)
+        second = self.complete(cache_stats=cache_stats)
+
+        self.assertEqual(second, first)
+        self.assertEqual(self.api_calls(), 1)
+        self.assertEqual(cache_stats, {'llm': {'hits': 1, 'misses': 1}})
+
+    def test_different_model_or_format_misses_cache(self):
+        cache_stats = {}
+        self.complete(cache_stats=cache_stats)
+        self.assertEqual(self.complete(model='gpt-4o', cache_stats=cache_stats), 'gpt-4o 응답 2')
+        self.complete(response_format=None, cache_stats=cache_stats)
+
+        self.assertEqual(self.api_calls(), 3)
+        self.assertEqual(cache_stats, {'llm': {'hits': 0, 'misses': 3}})
+
+    def test_use_cache_false_skips_lookup_but_stores_response(self):
+        self.complete()
+        refreshed = self.complete(use_cache=False)
+        self.assertEqual(self.api_calls(), 2)
+        # 새 응답으로 캐시가 갱신되어 다음 조회에서 사용됨
+        self.assertEqual(self.complete(), refreshed)
+        self.assertEqual(self.api_calls(), 2)
+
+    @override_settings(LLM_CACHE_ENABLED=False)
+    def test_disabled_cache_always_calls_api(self):
+        self.complete()
+        self.complete()
+        self.assertEqual(self.api_calls(), 2)
+
+
+@override_settings(COACHING_SUMMARY_TOKEN_BUDGET=30, COACHING_SUMMARY_MAX_LEVELS=3)
+@mock.patch('calls.tokens.get_encoding', return_value=None)
+class CoachingSummaryReduceTests(SimpleTestCase):
+    """
+    코칭용 통화 요약의 계층적 요약(map-reduce) 확인
+
+    tiktoken 대신 근사 토큰 수(2자당 1토큰)를 사용하므로 n자 문자열은 n/2 토큰입니다.
+    """
+
+    def setUp(self):
+        self.date = timezone.localdate()
+        self.chunks = []
+        llm_patch = mock.patch('calls.llm.acreate_chat_completion', side_effect=self.summarize)
+        self.acreate_chat_completion = llm_patch.start()
+        self.addCleanup(llm_patch.stop)
+        self.response_tokens = 5
+
+    async def summarize(self, model, messages, use_cache=True):
+        """묶음에 담긴 요약을 기록하고 response_tokens 토큰짜리 중간 요약 반환"""
+        lines = [line.strip()[2:] for line in messages[-1]['content'].splitlines() if line.strip().startswith('- ')]
+        self.chunks.append(lines)
+        return self.response(len(self.chunks))
+
+    def response(self, index):
+        return f"요약{index}".ljust(self.response_tokens * 2, '.')
+
+    def summaries(self, count, tokens=10):
+        return [f"통화{index}".ljust(tokens * 2, '.') for index in range(count)]
+
+    def test_summaries_within_budget_are_returned_as_is(self, _):
+        summaries = self.summaries(3)
+        self.assertEqual(reduce_call_summaries('상담원', self.date, summaries), summaries)
+        self.acreate_chat_completion.assert_not_called()
+
+    def test_summaries_over_budget_are_mapped_in_budget_chunks(self, _):
+        summaries = self.summaries(9)
+        reduced = reduce_call_summaries('상담원', self.date, summaries)
+
+        # 90토큰 → 30토큰 묶음 3개를 각각 5토큰으로 요약 (15토큰, 예산 이내)
+        self.assertEqual(self.chunks, [summaries[0:3], summaries[3:6], summaries[6:9]])
+        self.assertEqual(reduced, [self.response(1), self.response(2), self.response(3)])
+
+    def test_intermediate_summaries_over_budget_are_summarized_again(self, _):
+        self.response_tokens = 12
+        reduced = reduce_call_summaries('상담원', self.date, self.summaries(9))
+
+        # 1단계: 묶음 3개 → 36토큰 (예산 초과), 2단계: 12+12 / 12 두 묶음 → 24토큰
+        self.assertEqual([len(chunk) for chunk in self.chunks], [3, 3, 3, 2, 1])
+        self.assertEqual(self.chunks[3], [self.response(1), self.response(2)])
+        self.assertEqual(len(reduced), 2)
+
+    @override_settings(COACHING_SUMMARY_MAX_LEVELS=2)
+    def test_levels_are_capped(self, _):
+        self.response_tokens = 20
+        reduced = reduce_call_summaries('상담원', self.date, self.summaries(9))
+
+        # 중간 요약이 줄지 않아도 최대 단계 수에서 멈춤
+        self.assertEqual(len(self.chunks), 6)
+        self.assertEqual(len(reduced), 3)
+
+    def test_failed_chunk_falls_back_to_truncated_text(self, _):
+        summarize = self.summarize
+
+        async def fail_second(model, messages, use_cache=True):
+            result = await summarize(model, messages, use_cache)
+            if len(self.chunks) == 2:
+                raise RuntimeError('LLM down')
+            return result
+
+        self.acreate_chat_completion.side_effect = fail_second
+        summaries = self.summaries(9)
+        with self.assertLogs('calls', 'WARNING'):
+            reduced = reduce_call_summaries('상담원', self.date, summaries)
+
+        # 실패한 묶음은 원문을 이어 붙여 묶음당 몫(30 // 3 = 10토큰)으로 자름
+        self.assertEqual(reduced[1], "\n".join(summaries[3:6])[:20])
+        self.assertEqual((reduced[0], reduced[2]), (self.response(1), self.response(3)))
+
+
+ROUTING_RULES = [
+    {'name': 'short', 'model': 'small', 'max_tokens': 50, 'max_utterances': 5},
+    {'name': 'routine', 'model': 'small', 'max_tokens': 100, 'min_satisfaction': 4.0},
+    {'model': 'medium', 'min_utterances': 30},
+]
+
+
+@override_settings(LLM_ROUTING_RULES=ROUTING_RULES, LLM_ROUTING_DEFAULT_MODEL='large')
+@mock.patch('calls.routing.count_tokens', line_tokens)
+class EvaluationRoutingTests(SimpleTestCase):
+    """통화 지표에 따른 LLM 평가 모델 규칙 선택 확인 (대화 한 줄당 10토큰)"""
+
+    def route(self, utterances, satisfaction_score=None):
+        model, rule_name, _ = route_evaluation_model(conversation(utterances), satisfaction_score)
+        return model, rule_name
+
+    def test_rule_bounds_are_inclusive(self):
+        rule = {'min_tokens': 10, 'max_tokens': 20}
+        self.assertTrue(rule_matches(rule, {'transcript_tokens': 10}))
+        self.assertTrue(rule_matches(rule, {'transcript_tokens': 20}))
+        self.assertFalse(rule_matches(rule, {'transcript_tokens': 9}))
+        self.assertFalse(rule_matches(rule, {'transcript_tokens': 21}))
+
+    def test_condition_on_missing_metric_does_not_match(self):
+        self.assertFalse(rule_matches({'min_satisfaction': 4.0}, {'satisfaction_score': None}))
+        # 조건이 없는 지표는 값이 없어도 무관
+        self.assertTrue(rule_matches({'max_tokens': 100}, {'transcript_tokens': 50, 'satisfaction_score': None}))
+        self.assertTrue(rule_matches({'model': 'any'}, {}))
+
+    def test_first_matching_rule_wins(self):
+        # 짧은 통화는 만족도가 높아도(routine 조건 충족) 먼저 나온 short 규칙 사용
+        self.assertEqual(self.route(5, 4.5), ('small', 'short'))
+        self.assertEqual(self.route(6, 4.5), ('small', 'routine'))
+        self.assertEqual(self.route(10, 4.0), ('small', 'routine'))
+
+    def test_unmatched_call_uses_default_model(self):
+        self.assertEqual(self.route(6, 3.9), ('large', 'default'))
+        self.assertEqual(self.route(6), ('large', 'default'))
+        self.assertEqual(self.route(11, 4.5), ('large', 'default'))
+
+    def test_unnamed_rule_is_reported_by_index(self):
+        self.assertEqual(self.route(30), ('medium', 'rule-2'))
+
+    def test_metrics_are_returned(self):
+        _, _, metrics = route_evaluation_model(conversation(4), 3.5, call_id=1)
+        self.assertEqual(metrics, {'transcript_tokens': 40, 'utterance_count': 4, 'satisfaction_score': 3.5})
+
+
+class GroupStatsFilterTests(TestCase):
+    """여러 상담원/부서 통계 API의 대상(agent_ids, department)과 기간 필터 확인"""
+
+    def setUp(self):
+        self.first = create_agent('first', 'E001')
+        self.second = create_agent('second', 'E002')
+        self.other_team = create_agent('other', 'E003')
+        Agent.objects.filter(id=self.other_team.id).update(department='상담2팀')
+        self.idle = create_agent('idle', 'E004')
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.first.user)
+        self.url = reverse('agent-group-stats')
+
+        # 상담원별 3일치 통계 (하루 통화 수 = 상담원 번호, 만족도 = 상담원 번호)
+        for number, agent in enumerate((self.first, self.second, self.other_team), start=1):
+            for day in ('2026-09-30', '2026-10-01', '2026-10-02'):
+                AgentDailyStats.objects.create(
+                    agent=agent, date=day, call_count=number, completed_count=number,
+                    satisfaction_sum=number * number, satisfaction_count=number
+                )
+
+    def get(self, **params):
+        return self.client.get(self.url, {'start_date': '2026-10-01', 'end_date': '2026-10-02', **params})
+
+    def call_counts(self, response):
+        self.assertEqual(response.status_code, 200)
+        return {row['agent_id']: row['call_count'] for row in response.data['results']}
+
+    def test_agent_ids_select_agents(self):
+        response = self.get(agent_ids=f'{self.other_team.id},{self.first.id}')
+
+        self.assertEqual(self.call_counts(response), {self.first.id: 2, self.other_team.id: 6})
+        self.assertEqual([row['agent_id'] for row in response.data['results']], [self.first.id, self.other_team.id])
+        self.assertEqual(response.data['total']['agent_count'], 2)
+        self.assertEqual(response.data['total']['call_count'], 8)
+        # 상담원별 합계를 더해 계산한 평균 ((1*2 + 3*6) / 8)
+        self.assertEqual(response.data['total']['avg_satisfaction'], 2.5)
+
+    def test_unknown_ids_are_ignored_and_agents_without_stats_report_zero(self):
+        response = self.get(agent_ids=f'{self.second.id},,{self.idle.id},999999')
+
+        self.assertEqual(self.call_counts(response), {self.second.id: 4, self.idle.id: 0})
+        idle_row = response.data['results'][1]
+        self.assertIsNone(idle_row['avg_satisfaction'])
+        self.assertEqual(response.data['total']['agent_count'], 2)
+
+    def test_department_selects_its_agents(self):
+        self.assertEqual(
+            self.call_counts(self.get(department='상담1팀')),
+            {self.first.id: 2, self.second.id: 4, self.idle.id: 0}
+        )
+        self.assertEqual(self.call_counts(self.get(department='상담2팀')), {self.other_team.id: 6})
+        self.assertEqual(self.call_counts(self.get(department='없는 부서')), {})
+
+    def test_agent_ids_take_precedence_over_department(self):
+        response = self.get(agent_ids=str(self.other_team.id), department='상담1팀')
+        self.assertEqual(self.call_counts(response), {self.other_team.id: 6})
+
+    def test_period_bounds_are_inclusive(self):
+        response = self.client.get(self.url, {'agent_ids': str(self.first.id), 'start_date': '2026-09-30'})
+        self.assertEqual(self.call_counts(response), {self.first.id: 1})
+        self.assertEqual(response.data['period'], {'start_date': '2026-09-30', 'end_date': '2026-09-30'})
+
+        response = self.client.get(self.url, {
+            'agent_ids': str(self.first.id), 'start_date': '2026-09-30', 'end_date': '2026-10-02'
+        })
+        self.assertEqual(self.call_counts(response), {self.first.id: 3})
+
+    def test_invalid_parameters_are_rejected(self):
+        cases = [
+            {},
+            {'agent_ids': 'a,b'},
+            {'agent_ids': str(self.first.id), 'start_date': '2026-10-02', 'end_date': '2026-10-01'},
+            {'department': '상담1팀', 'start_date': '10/01/2026'},
+        ]
+        for params in cases:
+            with self.subTest(params=params):
+                self.assertEqual(self.client.get(self.url, params).status_code, 400)
@@ -0,0 +1,84 @@
+import logging
+import threading
+
+logger = logging.getLogger('calls')
+
+_encodings = {}
+_encodings_lock = threading.Lock()
+
+
+def get_encoding(model=None):
+    """
+    모델용 tiktoken 인코딩 반환
+
+    tiktoken이 설치되어 있지 않거나 인코딩 파일을 받을 수 없으면 None을 반환하며,
+    같은 모델에 대해 다시 시도하지 않습니다.
+    """
+    key = model or ''
+    if key not in _encodings:
+        with _encodings_lock:
+            if key not in _encodings:
+                encoding = None
+                try:
+                    import tiktoken
+                    try:
+                        encoding = tiktoken.encoding_for_model(model) if model else tiktoken.get_encoding('cl100k_base')
+                    except KeyError:
+                        encoding = tiktoken.get_encoding('cl100k_base')
+                except Exception as e:
+                    logger.warning(f"tiktoken unavailable, using approximate token counts: {str(e)}")
+                _encodings[key] = encoding
+    return _encodings[key]
+
+
+def count_tokens(text, model=None):
+    """텍스트의 토큰 수 (tiktoken이 없으면 근사치)"""
+    if not text:
+        return 0
+    encoding = get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    # 한국어는 대략 1~2자당 1토큰이므로 보수적으로 2자당 1토큰으로 계산
+    return (len(text) + 1) // 2
+
+
+def truncate_to_tokens(text, max_tokens, model=None):
+    """텍스트를 최대 max_tokens 토큰 이내로 자름"""
+    encoding = get_encoding(model)
+    if encoding is not None:
+        tokens = encoding.encode(text)
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[:max_tokens * 2]
+
+
+def chunk_by_token_budget(texts, budget, model=None):
+    """
+    순서를 유지하며 각 묶음의 토큰 합이 budget을 넘지 않도록 텍스트를 나눔
+
+    한 항목이 budget보다 크면 budget에 맞게 잘라 단독 묶음으로 만듭니다.
+    """
+    chunks = []
+    current = []
+    current_tokens = 0
+    for text in texts:
+        tokens = count_tokens(text, model)
+        if tokens > budget:
+            text = truncate_to_tokens(text, budget, model)
+            tokens = budget
+        if current and current_tokens + tokens > budget:
+            chunks.append(current)
+            current = []
+            current_tokens = 0
+        current.append(text)
+        current_tokens += tokens
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def record_token_usage(usage_stats, usage):
+    """API 응답의 usage를 입력/출력 토큰 수로 누적 기록"""
+    if usage_stats is None or usage is None:
+        return
+    usage_stats['input_tokens'] = usage_stats.get('input_tokens', 0) + (getattr(usage, 'prompt_tokens', 0) or 0)
+    usage_stats['output_tokens'] = usage_stats.get('output_tokens', 0) + (getattr(usage, 'completion_tokens', 0) or 0)
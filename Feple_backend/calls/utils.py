@@ -1,8 +1,8 @@
 import os
 import json
+import hashlib
 import logging
 import tempfile
-import subprocess
 from pathlib import Path
 from django.conf import settings
 
@@ -14,12 +14,30 @@ def ensure_directory_exists(directory_path):
     Path(directory_path).mkdir(parents=True, exist_ok=True)
 
 
-def get_audio_duration(file_path):
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """파일 내용의 SHA-256 해시 반환"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_audio_duration(file_path, audio=None):
     """오디오 파일의 재생 시간을 초 단위로 반환"""
     try:
-        from pydub import AudioSegment
-        audio = AudioSegment.from_file(file_path)
-        return len(audio) / 1000.0  # 밀리초를 초로 변환
+        # 이미 디코딩된 오디오가 있으면 재사용
+        if audio is not None:
+            return audio.duration
+
+        # 컨테이너 헤더에서 길이 조회 (전체 디코딩 없음)
+        from .audio import probe_audio_duration, decode_audio
+        duration = probe_audio_duration(file_path)
+        if duration is not None:
+            return duration
+
+        # 헤더에 길이 정보가 없는 형식은 디코딩하여 계산
+        return decode_audio(file_path).duration
     except Exception as e:
         logger.error(f"Error getting audio duration: {str(e)}")
         return None
@@ -42,19 +60,34 @@ def convert_audio_format(input_path, output_format='wav'):
         return None
 
 
-def extract_audio_features(file_path):
-    """오디오 파일에서 특성 추출 (침묵 비율, 볼륨 등)"""
-    try:
-        # 웨이브 파일로 변환
-        wav_path = convert_audio_format(file_path, 'wav')
-        if not wav_path:
+def extract_audio_features(file_path, audio=None, streaming=False):
+    """
+    오디오 파일에서 특성 추출 (침묵 비율, 볼륨 등)
+
+    audio 인자로 이미 디코딩된 DecodedAudio를 전달하면 다시 디코딩하지 않습니다.
+    streaming=True이면 파일 전체를 메모리에 올리지 않고 블록 단위로 계산합니다
+    (허용 오차는 audio.StreamingFeatureExtractor 참고).
+    """
+    if streaming:
+        try:
+            from .audio import extract_audio_features_streaming
+            return extract_audio_features_streaming(
+                file_path,
+                block_seconds=settings.AUDIO_STREAM_BLOCK_SECONDS
+            )
+        except Exception as e:
+            logger.error(f"Error extracting audio features (streaming): {str(e)}")
             return None
-            
+
+    try:
         # librosa 사용하여 특성 추출
         import librosa
         import numpy as np
-        
-        y, sr = librosa.load(wav_path)
+        from .audio import decode_audio
+
+        if audio is None:
+            audio = decode_audio(file_path)
+        y, sr = audio.samples, audio.sample_rate
         
         # 특성 계산
         rms = librosa.feature.rms(y=y)[0]
@@ -75,10 +108,6 @@ def extract_audio_features(file_path):
             'mfccs': [float(np.mean(mfcc)) for mfcc in mfccs],
             'silence_ratio': float(silence_ratio)
         }
-        
-        # 임시 파일 삭제
-        if os.path.exists(wav_path):
-            os.remove(wav_path)
             
         return features
     except Exception as e:
@@ -89,57 +118,54 @@ def extract_audio_features(file_path):
 def call_callytics(audio_path):
     """
     Callytics (callanalysis 모듈) 호출을 위한 함수
-    
-    실제 구현에서는 subprocess를 사용하여 별도 프로세스에서 호출하거나
-    직접 Python 모듈을 import하여 호출
+
+    모델을 메모리에 유지하는 상주 워커 풀에 작업을 전달하고 결과 JSON을 직접 받습니다.
     """
     try:
-        # 방법 1: 모듈 직접 호출 (만약 같은 프로세스에서 실행 가능하다면)
-        # import sys
-        # sys.path.append(os.path.join(settings.BASE_DIR, '..', 'callanalysis'))
-        # from main import process as callytics_process
-        # result = callytics_process(audio_path)
-        
-        # 방법 2: 서브프로세스로 호출
-        callanalysis_path = os.path.join(settings.BASE_DIR, '..', 'callanalysis')
-        process = subprocess.Popen(
-            ['python', 'main.py', audio_path],
-            cwd=callanalysis_path,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        
-        stdout, stderr = process.communicate()
-        
-        if process.returncode != 0:
-            logger.error(f"Error calling Callytics: {stderr.decode('utf-8')}")
-            return None
-            
-        # 결과 파일 읽기 (예시: Callytics가 결과를 JSON으로 출력한다고 가정)
-        try:
-            result = json.loads(stdout.decode('utf-8'))
-        except json.JSONDecodeError:
-            # 결과 파일 직접 읽기 (예시 경로)
-            result_path = os.path.join(callanalysis_path, '.temp', 'output.json')
-            if os.path.exists(result_path):
-                with open(result_path, 'r') as f:
-                    result = json.load(f)
-            else:
-                logger.error("No result file found from Callytics")
-                return None
-                
-        return result
+        from .callanalysis_pool import get_callanalysis_pool
+        return get_callanalysis_pool().process(audio_path)
     except Exception as e:
         logger.error(f"Error in call_callytics: {str(e)}")
         return None
 
 
+def get_local_day_range(start_date, end_date=None):
+    """
+    날짜 범위를 현재 시간대 기준 [시작 시각, 종료일 다음날 0시) datetime 범위로 변환
+
+    call_date__date 조회는 컬럼에 함수를 적용하여 인덱스를 쓰지 못하므로,
+    call_date__gte/__lt 범위 조회에 사용합니다.
+    """
+    from datetime import datetime, time, timedelta
+    from django.utils import timezone
+
+    tz = timezone.get_current_timezone()
+    end_date = end_date or start_date
+    start = timezone.make_aware(datetime.combine(start_date, time.min), tz)
+    end = timezone.make_aware(datetime.combine(end_date + timedelta(days=1), time.min), tz)
+    return start, end
+
+
+def get_utterances(speakers_data):
+    """
+    화자 분리 데이터의 발화를 시간순 목록으로 펼침
+
+    callanalysis 결과 형식({'speakers': [{'id': ..., 'utterances': [...]}]})의 발화에는
+    화자 ID를 'speaker' 키로 붙이고, 최상위 'utterances' 목록(구간 분할 결과 등)은 그대로 포함합니다.
+    """
+    utterances = list(speakers_data.get('utterances', []))
+    for speaker in speakers_data.get('speakers', []):
+        for utterance in speaker.get('utterances', []):
+            utterances.append(dict(utterance, speaker=utterance.get('speaker', speaker.get('id', 'unknown'))))
+    return sorted(utterances, key=lambda x: x.get('start', 0))
+
+
 def format_conversation_for_llm(speakers_data):
     """화자 분리 데이터를 LLM 프롬프트용으로 포맷팅"""
     formatted = ""
     
     # 화자별로 정렬된 발화 목록
-    utterances = sorted(speakers_data.get('utterances', []), key=lambda x: x.get('start', 0))
+    utterances = get_utterances(speakers_data)
     
     for utterance in utterances:
         speaker = utterance.get('speaker', 'unknown')
@@ -2,21 +2,42 @@ from django.shortcuts import render
 from rest_framework import viewsets, status, permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Count, Avg
+from rest_framework.exceptions import Throttled
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Avg, Max, Sum, Q, F
 from django.utils import timezone
 from django.shortcuts import get_object_or_404
+from django.utils.http import http_date
 from datetime import date
 
 from .models import (
     Agent, CallRawData, CallTranscript, 
-    CallAnalysis, AgentCoaching, ProcessingTask
+    CallAnalysis, AgentCoaching, ProcessingTask, AgentDailyStats
 )
 from .serializers import (
     AgentSerializer, CallRawDataSerializer, CallTranscriptSerializer,
     CallAnalysisSerializer, AgentCoachingSerializer, ProcessingTaskSerializer,
     CallDetailSerializer
 )
-from .tasks import process_call, daily_coaching
+from .tasks import enqueue_call, daily_coaching
+from .pipeline import get_stages, invalidate_stage_checkpoints
+from .admission import check_admission, DEFER, REJECT
+from .rollup import (
+    ROLLUP_FIELDS, get_rollup_sums, summarize_rollup, average_expression,
+    refresh_call_daily_stats, remove_call_daily_stats
+)
+from .dashboard import get_cached_overview, is_not_modified
+from .pagination import CallCursorPagination, CallRelatedCursorPagination, CoachingCursorPagination
+
+
+def parse_stats_period(query_params):
+    """start_date/end_date 파라미터(기본값: 오늘)를 날짜로 변환 (형식이 잘못되면 ValueError)"""
+    start_date = date.fromisoformat(query_params.get('start_date', date.today().isoformat()))
+    end_date = date.fromisoformat(query_params.get('end_date', start_date.isoformat()))
+    if start_date > end_date:
+        raise ValueError('시작일이 종료일보다 늦습니다.')
+    return start_date, end_date
 
 
 class AgentViewSet(viewsets.ModelViewSet):
@@ -44,9 +65,11 @@ class AgentViewSet(viewsets.ModelViewSet):
         if end_date:
             calls = calls.filter(call_date__lte=end_date)
             
-        page = self.paginate_queryset(calls)
+        # 깊은 페이지도 일정한 비용으로 조회하도록 (call_date, id) 커서 사용
+        paginator = CallCursorPagination()
+        page = paginator.paginate_queryset(calls, request, view=self)
         serializer = CallRawDataSerializer(page, many=True)
-        return self.get_paginated_response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=['get'])
     def coaching(self, request, pk=None):
@@ -62,9 +85,10 @@ class AgentViewSet(viewsets.ModelViewSet):
         if end_date:
             coaching = coaching.filter(date__lte=end_date)
             
-        page = self.paginate_queryset(coaching)
+        paginator = CoachingCursorPagination()
+        page = paginator.paginate_queryset(coaching, request, view=self)
         serializer = AgentCoachingSerializer(page, many=True)
-        return self.get_paginated_response(serializer.data)
+        return paginator.get_paginated_response(serializer.data)
 
     @action(detail=True, methods=['get'])
     def stats(self, request, pk=None):
@@ -72,74 +96,160 @@ class AgentViewSet(viewsets.ModelViewSet):
         agent = self.get_object()
         
         # 기간별 통계 (기본값: 오늘)
-        start_date = request.query_params.get('start_date', date.today().isoformat())
-        end_date = request.query_params.get('end_date', date.today().isoformat())
+        try:
+            start_date, end_date = parse_stats_period(request.query_params)
+        except ValueError as e:
+            return Response({'error': f'잘못된 기간입니다: {e}'}, status=status.HTTP_400_BAD_REQUEST)
         
-        # 통화 통계
-        calls = CallRawData.objects.filter(
+        # 일별 통계를 기간 합산 (조회 비용은 통화 수가 아니라 일 수에 비례)
+        stats = summarize_rollup(AgentDailyStats.objects.filter(
             agent=agent,
-            call_date__date__gte=start_date,
-            call_date__date__lte=end_date
-        )
+            date__gte=start_date,
+            date__lte=end_date
+        ).aggregate(**get_rollup_sums()))
         
-        # 분석 데이터가 있는 통화만 필터링
-        analyzed_calls = calls.filter(analysis__isnull=False)
-        
-        stats = {
-            'call_count': calls.count(),
-            'avg_satisfaction': analyzed_calls.aggregate(
-                avg_score=Avg('analysis__satisfaction_score')
-            )['avg_score'],
-            'completed_calls': calls.filter(status='completed').count(),
-            'pending_calls': calls.filter(status='pending').count(),
-            'processing_calls': calls.filter(status='processing').count(),
-            'avg_call_duration': calls.aggregate(
-                avg_duration=Avg('duration')
-            )['avg_duration'],
-            'period': {
-                'start_date': start_date,
-                'end_date': end_date,
-            }
+        stats['period'] = {
+            'start_date': start_date.isoformat(),
+            'end_date': end_date.isoformat(),
         }
         
         return Response(stats)
 
+    @action(detail=False, methods=['get'], url_path='stats')
+    def group_stats(self, request):
+        """
+        여러 상담원 또는 부서 전체의 통계를 한 번에 조회
+        
+        agent_ids(쉼표 구분) 또는 department 파라미터로 대상을 지정하며,
+        상담원별 통계와 전체 합계를 반환합니다.
+        """
+        try:
+            start_date, end_date = parse_stats_period(request.query_params)
+        except ValueError as e:
+            return Response({'error': f'잘못된 기간입니다: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # 대상 상담원
+        agents = Agent.objects.select_related('user').order_by('id')
+        agent_ids = request.query_params.get('agent_ids')
+        department = request.query_params.get('department')
+        if agent_ids:
+            try:
+                agents = agents.filter(id__in=[int(agent_id) for agent_id in agent_ids.split(',') if agent_id])
+            except ValueError:
+                return Response({'error': 'agent_ids는 쉼표로 구분된 숫자여야 합니다.'},
+                                status=status.HTTP_400_BAD_REQUEST)
+        elif department:
+            agents = agents.filter(department=department)
+        else:
+            return Response({'error': 'agent_ids 또는 department를 지정해주세요.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        agents = list(agents)
+        
+        # 상담원별 일별 통계를 한 번의 GROUP BY로 기간 합산
+        daily_stats = AgentDailyStats.objects.filter(
+            agent_id__in=[agent.id for agent in agents],
+            date__gte=start_date,
+            date__lte=end_date
+        )
+        rows = {
+            row.pop('agent_id'): row
+            for row in daily_stats.order_by().values('agent_id').annotate(**get_rollup_sums())
+        }
+        
+        empty = dict.fromkeys(ROLLUP_FIELDS, 0)
+        results = [
+            {'agent_id': agent.id, 'agent_name': agent.user.get_full_name(), **summarize_rollup(rows.get(agent.id, empty))}
+            for agent in agents
+        ]
+        
+        # 전체 합계 (상담원별 합계를 더해 평균 계산)
+        total = summarize_rollup({field: sum(row[field] for row in rows.values()) for field in ROLLUP_FIELDS})
+        total['agent_count'] = len(agents)
+        
+        return Response({
+            'results': results,
+            'total': total,
+            'period': {
+                'start_date': start_date.isoformat(),
+                'end_date': end_date.isoformat(),
+            }
+        })
+
 
 class CallRawDataViewSet(viewsets.ModelViewSet):
     """통화 데이터 API 엔드포인트"""
     queryset = CallRawData.objects.all()
     serializer_class = CallRawDataSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CallCursorPagination
 
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return CallDetailSerializer
         return CallRawDataSerializer
 
+    def create(self, request, *args, **kwargs):
+        """통화 업로드 (응답 헤더에 승인 제어 결과 포함)"""
+        response = super().create(request, *args, **kwargs)
+        response['X-Admission-Decision'] = self.admission_decision
+        return response
+
     def perform_create(self, serializer):
-        """통화 업로드 시 Celery 태스크 트리거"""
-        call_instance = serializer.save()
+        """
+        통화 업로드 시 Celery 태스크 트리거
+
+        priority(live/reprocess/backfill, 기본값 live)에 따라 등급별 큐 레인으로 처리됩니다.
+        큐 적체량과 처리 중 작업 수가 임계값을 넘으면 백필 등급으로 지연하거나
+        저장하지 않고 429(Retry-After)로 응답합니다.
+        """
+        decision = check_admission()
+        if decision == REJECT:
+            raise Throttled(
+                wait=settings.ADMISSION_RETRY_AFTER,
+                detail='처리 대기 중인 통화가 너무 많습니다. 잠시 후 다시 시도해주세요.'
+            )
+        self.admission_decision = decision
+
+        # 지연된 업로드는 저우선순위 백필 레인에서 처리
+        if decision == DEFER:
+            call_instance = serializer.save(priority='backfill')
+        else:
+            call_instance = serializer.save()
         
-        # 상태 업데이트
+        # 상태 업데이트 (일별 통계의 통화 수에 바로 반영)
         call_instance.status = 'processing'
-        call_instance.save()
+        call_instance.save(update_fields=['status', 'updated_at'])
+        refresh_call_daily_stats(call_instance)
         
         # 태스크 생성 및 트리거
         task = ProcessingTask.objects.create(
             call=call_instance,
             agent=call_instance.agent,
             task_type='transcription',
-            status='pending'
+            status='pending',
+            priority=call_instance.priority
         )
         
         # Celery 태스크 시작
-        result = process_call.delay(call_instance.id)
+        result = enqueue_call(call_instance.id, call_instance.priority)
         
         # 태스크 ID 저장
         task.task_id = result.id
         task.status = 'processing'
         task.save()
 
+    def perform_update(self, serializer):
+        """통화 수정 후 일별 통계 갱신 (상담원/통화 일시/통화 시간 변경 반영)"""
+        with transaction.atomic():
+            call_instance = serializer.save()
+            refresh_call_daily_stats(call_instance)
+
+    def perform_destroy(self, instance):
+        """통화가 반영한 값을 일별 통계에서 뺀 뒤 삭제"""
+        with transaction.atomic():
+            remove_call_daily_stats(instance)
+            instance.delete()
+
     @action(detail=True, methods=['get'])
     def status(self, request, pk=None):
         """특정 통화의 처리 상태 조회"""
@@ -170,48 +280,126 @@ class CallRawDataViewSet(viewsets.ModelViewSet):
         """특정 통화 재처리 요청"""
         call = self.get_object()
         
-        # 이미 처리 중인 태스크가 있는 경우
-        if ProcessingTask.objects.filter(call=call, status='processing').exists():
+        # 이미 처리 중이거나 재시도 대기 중인 태스크가 있는 경우
+        if ProcessingTask.objects.filter(call=call, status__in=('pending', 'processing')).exists():
             return Response(
                 {'error': '이미 처리 중인 작업이 있습니다.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # 상태 업데이트
+        # 우선순위 등급 (기본값: 재처리)
+        priority = request.data.get('priority', 'reprocess')
+        if priority not in dict(CallRawData.PRIORITY_CHOICES):
+            return Response(
+                {'error': f'알 수 없는 우선순위입니다: {priority}'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # use_cache=false이면 캐시된 전사/LLM 결과를 사용하지 않고, force=true이면 체크포인트를
+        # 무시하고 모든 단계를 처음부터 다시 계산
+        use_cache = str(request.data.get('use_cache', 'true')).lower() not in ('false', '0', 'no')
+        force = str(request.data.get('force', 'false')).lower() in ('true', '1', 'yes')
+        
+        # 다시 계산할 단계 (해당 단계에 의존하는 단계도 함께 다시 계산)
+        # 지정하지 않으면 완료된 통화와 캐시를 사용하지 않는 재처리는 모든 단계를 다시 계산하고,
+        # 그 밖에는 완료되지 않은 단계부터 이어서 처리
+        stages = request.data.get('stages')
+        if stages is not None and (not isinstance(stages, list) or not all(isinstance(name, str) for name in stages)):
+            return Response(
+                {'error': 'stages는 단계 이름 목록이어야 합니다.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if stages is None and (call.status == 'completed' or not use_cache):
+            stages = list(get_stages())
+        try:
+            redo_stages = invalidate_stage_checkpoints(call.id, stages) if stages else []
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # 상태 업데이트 (실패 통화를 다시 처리하는 경우 일별 통계의 실패 수에서 제외)
         call.status = 'processing'
-        call.save()
+        call.priority = priority
+        call.save(update_fields=['status', 'priority', 'updated_at'])
+        refresh_call_daily_stats(call)
         
         # 새 태스크 생성
         task = ProcessingTask.objects.create(
             call=call,
             agent=call.agent,
             task_type='transcription',
-            status='pending'
+            status='pending',
+            priority=priority
         )
         
         # Celery 태스크 시작
-        result = process_call.delay(call.id)
+        result = enqueue_call(call.id, priority, use_cache, force)
         
         # 태스크 ID 저장
         task.task_id = result.id
         task.status = 'processing'
         task.save()
         
-        return Response({'task_id': result.id, 'status': 'processing'})
+        return Response({'task_id': result.id, 'status': 'processing', 'stages': redo_stages})
+
+    @action(detail=False, methods=['get'])
+    def dead_letter(self, request):
+        """재시도를 모두 소진한 통화 목록 조회"""
+        calls = CallRawData.objects.filter(status='dead_letter').select_related('agent__user')
+
+        page = self.paginate_queryset(calls)
+        serializer = CallRawDataSerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['post'])
+    def requeue(self, request):
+        """재시도를 소진한 통화 일괄 재처리 요청 (call_ids 미지정 시 전체)"""
+        calls = CallRawData.objects.filter(status='dead_letter')
+
+        call_ids = request.data.get('call_ids')
+        if call_ids is not None and (
+            not isinstance(call_ids, list)
+            or not all(isinstance(call_id, int) and not isinstance(call_id, bool) for call_id in call_ids)
+        ):
+            return Response(
+                {'error': 'call_ids는 정수 목록이어야 합니다.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if call_ids:
+            calls = calls.filter(id__in=call_ids)
+
+        call_ids = list(calls.values_list('id', flat=True))
+        with transaction.atomic():
+            CallRawData.objects.filter(id__in=call_ids).update(
+                status='processing',
+                priority='reprocess',
+                updated_at=timezone.now()
+            )
+            
+            # 통화별 상태 변경분을 일별 통계에 반영
+            for call_id in call_ids:
+                refresh_call_daily_stats(call_id)
+
+        # 완료된 단계는 체크포인트에서 이어서 처리 (재처리 레인 사용)
+        for call_id in call_ids:
+            enqueue_call(call_id, 'reprocess')
+
+        return Response({'requeued': len(call_ids), 'call_ids': call_ids})
 
 
 class CallTranscriptViewSet(viewsets.ReadOnlyModelViewSet):
     """통화 전사 데이터 API 엔드포인트 (읽기 전용)"""
-    queryset = CallTranscript.objects.all()
+    queryset = CallTranscript.objects.select_related('call')
     serializer_class = CallTranscriptSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CallRelatedCursorPagination
 
 
 class CallAnalysisViewSet(viewsets.ReadOnlyModelViewSet):
     """통화 분석 결과 API 엔드포인트 (읽기 전용)"""
-    queryset = CallAnalysis.objects.all()
+    queryset = CallAnalysis.objects.select_related('call')
     serializer_class = CallAnalysisSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = CallRelatedCursorPagination
 
 
 class AgentCoachingViewSet(viewsets.ReadOnlyModelViewSet):
@@ -265,38 +453,63 @@ class DashboardViewSet(viewsets.ViewSet):
     
     @action(detail=False, methods=['get'])
     def overview(self, request):
-        """대시보드 개요 데이터"""
+        """대시보드 개요 데이터 (캐시 + ETag/Last-Modified 조건부 응답)"""
         # 기간 필터
-        days = int(request.query_params.get('days', 7))  # 기본값 7일
+        try:
+            days = int(request.query_params.get('days', 7))  # 기본값 7일 (오늘 포함)
+            if days < 1:
+                raise ValueError(days)
+        except ValueError:
+            return Response({'error': 'days는 1 이상의 정수여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        department = request.query_params.get('department', '')
         
-        # 기준 날짜
-        end_date = timezone.now()
-        start_date = end_date - timezone.timedelta(days=days)
-        
-        # 통화 통계
-        calls = CallRawData.objects.filter(
-            call_date__gte=start_date,
-            call_date__lte=end_date
+        entry = get_cached_overview(
+            {'days': days, 'department': department, 'date': timezone.localdate().isoformat()},
+            lambda: self._build_overview(days, department)
         )
+        headers = {
+            'ETag': entry['etag'],
+            'Last-Modified': http_date(entry['last_modified']),
+            'Cache-Control': 'private, no-cache',
+        }
+        if is_not_modified(request, entry['etag'], entry['last_modified']):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(entry['data'], headers=headers)
+
+    def _build_overview(self, days, department):
+        """일별 통계에서 개요 데이터 계산"""
+        # 기준 날짜 (일별 통계 단위 - 오늘을 포함한 최근 days일)
+        end_date = timezone.localdate()
+        start_date = end_date - timezone.timedelta(days=days - 1)
+        
+        agents = Agent.objects.all()
+        daily_stats = AgentDailyStats.objects.filter(date__gte=start_date, date__lte=end_date)
+        if department:
+            agents = agents.filter(department=department)
+            daily_stats = daily_stats.filter(agent__department=department)
         
-        # 분석된 통화
-        analyzed_calls = calls.filter(analysis__isnull=False)
+        # 기간 전체 통계 (일별 통계 합산)
+        totals = daily_stats.aggregate(**get_rollup_sums())
         
         # 상담원별 통계
-        agent_stats = Agent.objects.annotate(
-            call_count=Count('calls', filter=models.Q(calls__call_date__gte=start_date, calls__call_date__lte=end_date)),
-            avg_satisfaction=Avg('calls__analysis__satisfaction_score', filter=models.Q(calls__call_date__gte=start_date, calls__call_date__lte=end_date))
+        in_period = Q(daily_stats__date__gte=start_date, daily_stats__date__lte=end_date)
+        agent_stats = agents.annotate(
+            call_count=Sum('daily_stats__call_count', filter=in_period),
+            avg_satisfaction=average_expression(
+                Sum('daily_stats__satisfaction_sum', filter=in_period),
+                Sum('daily_stats__satisfaction_count', filter=in_period)
+            )
         )
         
         # 통계 데이터
-        stats = {
-            'total_calls': calls.count(),
-            'completed_analysis': analyzed_calls.count(),
-            'avg_satisfaction': analyzed_calls.aggregate(avg=Avg('analysis__satisfaction_score'))['avg'],
+        return {
+            'total_calls': totals['call_count'],
+            'completed_analysis': totals['satisfaction_count'],
+            'avg_satisfaction': summarize_rollup(totals)['avg_satisfaction'],
             'agents': {
-                'total': agent_stats.count(),
+                'total': agents.count(),
                 'top_performers': AgentSerializer(
-                    agent_stats.order_by('-avg_satisfaction')[:3], 
+                    agent_stats.select_related('user').order_by(F('avg_satisfaction').desc(nulls_last=True))[:3],
                     many=True
                 ).data
             },
@@ -306,5 +519,29 @@ class DashboardViewSet(viewsets.ViewSet):
                 'days': days
             }
         }
-        
-        return Response(stats)
+
+    @action(detail=False, methods=['get'])
+    def queue_wait(self, request):
+        """우선순위 등급/작업 유형별 큐 대기 시간 통계 (SLA 확인용)"""
+        try:
+            days = int(request.query_params.get('days', 1))  # 기본값 1일
+        except ValueError:
+            return Response({'error': 'days는 정수여야 합니다.'}, status=status.HTTP_400_BAD_REQUEST)
+        start_date = timezone.now() - timezone.timedelta(days=days)
+
+        rows = ProcessingTask.objects.filter(
+            created_at__gte=start_date,
+            queue_wait__isnull=False
+        ).values('priority', 'task_type').annotate(
+            count=Count('id'),
+            avg_wait=Avg('queue_wait'),
+            max_wait=Max('queue_wait')
+        ).order_by('priority', 'task_type')
+
+        return Response({
+            'results': list(rows),
+            'period': {
+                'start_date': start_date,
+                'days': days
+            }
+        })